@@ -0,0 +1,146 @@
+"""
+Archival of past events into the events_archive, conflicts_archive and
+event_exceptions_archive tables
+"""
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, exists, insert, literal, or_, select
+from sqlalchemy.orm import Session
+from app.models.database import (
+    SessionLocal, Event, Conflict, Entity, EventSession, EventException,
+    ArchivedEvent, ArchivedConflict, ArchivedEventException
+)
+from app.engine.interval_index import interval_indexes
+from app.utils.metrics import timed
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Events that ended more than ARCHIVE_AFTER_DAYS ago leave the hot events table.
+# Conflict checks only involve current and future events, so nothing on the hot
+# path needs them; they stay readable through GET /api/events/archive.
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "false").lower() == "true"
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+_EVENT_COLUMNS = [column.name for column in Event.__table__.columns]
+_CONFLICT_COLUMNS = [column.name for column in Conflict.__table__.columns]
+_EXCEPTION_COLUMNS = [column.name for column in EventException.__table__.columns]
+
+# Outcome of the latest background pass, reported by /health
+last_run: Dict = {}
+
+def _archivable(cutoff: datetime, owner_id: Optional[int], after_id: int, batch_size: int):
+    """
+    Next batch of (id, owner_id) rows to archive, in id order after after_id.
+    
+    A recurring series goes once its last occurrence ended before the cutoff,
+    counting occurrences its exceptions moved; series without an end stay
+    hot, as do events that sessions or entities still point at.
+    """
+    query = select(Event.id, Event.owner_id).where(
+        Event.id > after_id,
+        Event.end_time < cutoff,
+        or_(Event.recurrence_rule.is_(None), Event.recurrence_end < cutoff),
+        ~exists().where(EventException.event_id == Event.id, EventException.end_time >= cutoff),
+        ~exists().where(EventSession.event_id == Event.id),
+        ~exists().where(Entity.event_id == Event.id)
+    )
+    if owner_id is not None:
+        query = query.where(Event.owner_id == owner_id)
+    # Concurrent archivers in other workers skip the rows this one is moving
+    return query.order_by(Event.id).limit(batch_size).with_for_update(skip_locked=True)
+
+def _move_batch(db: Session, event_ids: list, now: datetime) -> int:
+    """
+    Copy the events, their exceptions and every conflict touching them to the
+    archive and delete them; returns conflicts moved
+    """
+    touching = or_(Conflict.event_id.in_(event_ids), Conflict.conflict_with_event_id.in_(event_ids))
+    moved = db.execute(insert(ArchivedConflict).from_select(
+        _CONFLICT_COLUMNS + ["archived_at"],
+        select(*Conflict.__table__.columns, literal(now)).where(touching)
+    )).rowcount
+    db.execute(delete(Conflict).where(touching))
+    
+    db.execute(insert(ArchivedEventException).from_select(
+        _EXCEPTION_COLUMNS + ["archived_at"],
+        select(*EventException.__table__.columns, literal(now)).where(EventException.event_id.in_(event_ids))
+    ))
+    db.execute(delete(EventException).where(EventException.event_id.in_(event_ids)))
+    
+    db.execute(insert(ArchivedEvent).from_select(
+        _EVENT_COLUMNS + ["archived_at"],
+        select(*Event.__table__.columns, literal(now)).where(Event.id.in_(event_ids))
+    ))
+    db.execute(delete(Event).where(Event.id.in_(event_ids)))
+    return moved
+
+@timed()
+def archive_events(
+    db: Session,
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    owner_id: Optional[int] = None,
+    now: Optional[datetime] = None
+) -> Dict:
+    """
+    Move events that ended more than older_than_days ago to the archive tables.
+    
+    Each batch is its own transaction, so locks stay short and an interrupted
+    run keeps the batches it finished. Bulk statements bypass the unit of work,
+    so the owners' interval indexes are invalidated by hand.
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=older_than_days)
+    events = conflicts = batches = 0
+    after_id = 0
+    
+    while True:
+        rows = db.execute(_archivable(cutoff, owner_id, after_id, batch_size)).all()
+        if not rows:
+            break
+        
+        conflicts += _move_batch(db, [row.id for row in rows], now)
+        for owner in {row.owner_id for row in rows}:
+            interval_indexes.invalidate(owner, db)
+        db.commit()
+        
+        events += len(rows)
+        batches += 1
+        after_id = rows[-1].id
+        if len(rows) < batch_size:
+            break
+    
+    return {"events": events, "conflicts": conflicts, "batches": batches, "cutoff": cutoff.isoformat()}
+
+def _archive_pass() -> Dict:
+    db = SessionLocal()
+    try:
+        return archive_events(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+async def run_archiver(interval_seconds: float = ARCHIVE_INTERVAL_SECONDS):
+    """Archive in the background every interval_seconds; each pass runs in a worker thread"""
+    while True:
+        began = datetime.utcnow()
+        try:
+            result = await run_in_threadpool(_archive_pass)
+            last_run.clear()
+            last_run.update(result, started_at=began.isoformat())
+            if result["events"]:
+                logger.info(f"Archived {result['events']} events and {result['conflicts']} conflicts")
+        except Exception as exc:
+            last_run.clear()
+            last_run.update(error=str(exc), started_at=began.isoformat())
+            logger.error(f"Archiving failed: {str(exc)}")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,339 @@
+"""
+Batch auto-scheduler for tentative events
+"""
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.database import Event, Conflict
+from app.engine.interval_index import IntervalTree, IntervalEntry, interval_indexes
+from app.engine.constraint_engine import ConstraintValidator
+from app.engine.scheduler_core import scan_calendar_conflicts
+from app.engine.recurrence import load_occurrences
+from app.engine.slot_finder import find_free_slots
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+AUTO_SCHEDULE_TIME_BUDGET_MS = int(os.getenv("AUTO_SCHEDULE_TIME_BUDGET_MS", "2000"))
+
+class AutoScheduler:
+    """
+    Assign non-overlapping times to movable events around fixed ones.
+    
+    A greedy pass places the longest events first at the free slot closest to
+    their requested start. Local search then re-places displaced events and
+    evicts movable events from a displaced event's requested slot whenever that
+    lowers the total displacement, until the time budget runs out.
+    """
+    
+    def __init__(
+        self,
+        fixed: List[IntervalEntry],
+        movable: List[IntervalEntry],
+        validator: Optional[ConstraintValidator] = None,
+        work_start_hour: int = 9,
+        work_end_hour: int = 18,
+        granularity_minutes: int = 15,
+        buffer_minutes: int = 0,
+        horizon_days: int = 14,
+        not_before: Optional[datetime] = None
+    ):
+        self.tree = IntervalTree(fixed)
+        self.requested: Dict[int, IntervalEntry] = {entry.id: entry for entry in movable}
+        self.placed: Dict[int, IntervalEntry] = {}
+        self.validator = validator
+        self.work_start_hour = work_start_hour
+        self.work_end_hour = work_end_hour
+        self.granularity_minutes = granularity_minutes
+        self.buffer = timedelta(minutes=buffer_minutes)
+        self.horizon = timedelta(days=horizon_days)
+        self.not_before = not_before or datetime.utcnow()
+        # An unscheduled event costs more than any placement inside the horizon
+        self.unscheduled_penalty = 2 * horizon_days * 24 * 60 + 1
+    
+    def cost(self, event_id: int) -> float:
+        """Displacement in minutes from the requested start, or the penalty if unscheduled"""
+        entry = self.placed.get(event_id)
+        if entry is None:
+            return self.unscheduled_penalty
+        return abs((entry.start_time - self.requested[event_id].start_time).total_seconds()) / 60
+    
+    def total_cost(self) -> float:
+        return sum(self.cost(event_id) for event_id in self.requested)
+    
+    def _allowed(self, entry: IntervalEntry) -> bool:
+        return self.validator is None or not self.validator.validate_event(entry)
+    
+    def _is_free(self, entry: IntervalEntry) -> bool:
+        return not self.tree.has_overlap(entry.start_time - self.buffer, entry.end_time + self.buffer)
+    
+    def _best_slot(self, event_id: int) -> Optional[IntervalEntry]:
+        """Closest allowed free slot to the requested time, keeping the event's duration"""
+        requested = self.requested[event_id]
+        if self._is_free(requested) and self._allowed(requested):
+            return requested
+        
+        duration = requested.end_time - requested.start_time
+        window_start = max(self.not_before, requested.start_time - self.horizon)
+        window_end = max(requested.start_time, window_start) + self.horizon
+        busy = self.tree.overlapping(window_start - self.buffer - duration, window_end + self.buffer)
+        slots = find_free_slots(
+            busy,
+            window_start,
+            window_end,
+            duration_minutes=duration.total_seconds() / 60,
+            work_start_hour=self.work_start_hour,
+            work_end_hour=self.work_end_hour,
+            granularity_minutes=self.granularity_minutes,
+            buffer_minutes=self.buffer.total_seconds() / 60,
+            limit=5,
+            preferred_start=requested.start_time
+        )
+        for start, end in slots:
+            candidate = IntervalEntry(event_id, start, end)
+            if self._allowed(candidate):
+                return candidate
+        return None
+    
+    def _place(self, entry: IntervalEntry):
+        self.placed[entry.id] = entry
+        self.tree.insert(entry)
+    
+    def _unplace(self, event_id: int):
+        if self.placed.pop(event_id, None) is not None:
+            self.tree.remove(event_id)
+    
+    def _try_replace(self, event_id: int) -> bool:
+        """Move one event to its best slot given everything else; True if that helped"""
+        before = self.cost(event_id)
+        previous = self.placed.get(event_id)
+        self._unplace(event_id)
+        slot = self._best_slot(event_id)
+        if slot is not None:
+            self._place(slot)
+        if self.cost(event_id) < before:
+            return True
+        self._unplace(event_id)
+        if previous is not None:
+            self._place(previous)
+        return False
+    
+    def _try_eject(self, event_id: int) -> bool:
+        """Put an event back at its requested time, re-placing the movable events in its way"""
+        requested = self.requested[event_id]
+        if not self._allowed(requested):
+            return False
+        
+        blockers = [
+            other.id
+            for other in self.tree.overlapping(requested.start_time - self.buffer, requested.end_time + self.buffer)
+            if other.id != event_id
+        ]
+        if not blockers or any(blocker not in self.requested for blocker in blockers):
+            return False  # nothing to gain, or blocked by a fixed event
+        
+        affected = [event_id] + blockers
+        previous = {affected_id: self.placed.get(affected_id) for affected_id in affected}
+        before = sum(self.cost(affected_id) for affected_id in affected)
+        
+        for affected_id in affected:
+            self._unplace(affected_id)
+        self._place(requested)
+        for blocker in sorted(blockers, key=self._duration_key):
+            slot = self._best_slot(blocker)
+            if slot is not None:
+                self._place(slot)
+        
+        if sum(self.cost(affected_id) for affected_id in affected) < before:
+            return True
+        
+        for affected_id in affected:
+            self._unplace(affected_id)
+        for entry in previous.values():
+            if entry is not None:
+                self._place(entry)
+        return False
+    
+    def _duration_key(self, event_id: int):
+        requested = self.requested[event_id]
+        return (-(requested.end_time - requested.start_time), requested.start_time, event_id)
+    
+    def run(self, time_budget_ms: int = AUTO_SCHEDULE_TIME_BUDGET_MS) -> Dict:
+        """Schedule every movable event; returns the greedy and final cost and the search effort"""
+        deadline = time.perf_counter() + time_budget_ms / 1000
+        
+        # Greedy seed: longest events first, each at its closest free slot
+        for event_id in sorted(self.requested, key=self._duration_key):
+            slot = self._best_slot(event_id)
+            if slot is not None:
+                self._place(slot)
+        greedy_cost = self.total_cost()
+        
+        passes = 0
+        moves = 0
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            passes += 1
+            displaced = sorted(
+                (event_id for event_id in self.requested if self.cost(event_id) > 0),
+                key=self.cost,
+                reverse=True
+            )
+            for event_id in displaced:
+                if time.perf_counter() >= deadline:
+                    break
+                if self._try_replace(event_id) or self._try_eject(event_id):
+                    improved = True
+                    moves += 1
+        
+        return {
+            "greedy_cost_minutes": round(greedy_cost, 2),
+            "total_displacement_minutes": round(self.total_cost() - self._unscheduled_cost(), 2),
+            "search_passes": passes,
+            "improving_moves": moves,
+            "converged": not improved
+        }
+    
+    def _unscheduled_cost(self) -> float:
+        return self.unscheduled_penalty * (len(self.requested) - len(self.placed))
+
+def _load_calendar(owner_id: int, db: Session, **options) -> Tuple[List[IntervalEntry], List[IntervalEntry]]:
+    """
+    The owner's fixed and movable (tentative) events.
+    
+    Non-tentative events stay where they are. Recurring events are never moved;
+    their occurrences around the movable events block time like fixed events.
+    """
+    rows = db.execute(
+        select(Event.id, Event.start_time, Event.end_time, Event.is_tentative).filter(
+            Event.owner_id == owner_id,
+            Event.recurrence_rule.is_(None)
+        )
+    ).all()
+    fixed = [IntervalEntry(row.id, row.start_time, row.end_time) for row in rows if not row.is_tentative]
+    movable = [IntervalEntry(row.id, row.start_time, row.end_time) for row in rows if row.is_tentative]
+    
+    if movable:
+        # Every slot the search can consider lies within a horizon of a requested start
+        horizon = timedelta(days=options.get("horizon_days", 14))
+        window_start = min(entry.start_time for entry in movable) - horizon
+        window_end = max(max(entry.end_time for entry in movable), options.get("not_before") or datetime.utcnow()) + 2 * horizon
+        occurrences = load_occurrences(db, owner_id, window_start, window_end)
+        # The tree is keyed by id, so occurrences get distinct negative ids
+        fixed.extend(
+            IntervalEntry(-position, occurrence.start_time, occurrence.end_time)
+            for position, occurrence in enumerate(occurrences, start=1)
+        )
+    return fixed, movable
+
+def plan_auto_schedule(
+    owner_id: int,
+    db: Session,
+    validator: Optional[ConstraintValidator] = None,
+    time_budget_ms: int = AUTO_SCHEDULE_TIME_BUDGET_MS,
+    **options
+) -> Dict:
+    """
+    Plan new times for the owner's tentative events without writing anything.
+    
+    Options are passed to AutoScheduler.
+    """
+    fixed, movable = _load_calendar(owner_id, db, **options)
+    return solve_auto_schedule(owner_id, fixed, movable, validator, time_budget_ms, **options)
+
+def solve_auto_schedule(
+    owner_id: int,
+    fixed: List[IntervalEntry],
+    movable: List[IntervalEntry],
+    validator: Optional[ConstraintValidator] = None,
+    time_budget_ms: int = AUTO_SCHEDULE_TIME_BUDGET_MS,
+    **options
+) -> Dict:
+    """Run the search over loaded events; CPU-bound and without database access"""
+    started = time.perf_counter()
+    scheduler = AutoScheduler(fixed, movable, validator, **options)
+    summary = scheduler.run(time_budget_ms)
+    
+    assignments = []
+    unscheduled = []
+    for entry in sorted(movable, key=lambda e: (e.start_time, e.id)):
+        placed = scheduler.placed.get(entry.id)
+        if placed is None:
+            unscheduled.append({"event_id": entry.id, "start_time": entry.start_time, "end_time": entry.end_time})
+            continue
+        assignments.append({
+            "event_id": entry.id,
+            "requested_start": entry.start_time,
+            "requested_end": entry.end_time,
+            "start_time": placed.start_time,
+            "end_time": placed.end_time,
+            "displacement_minutes": round(scheduler.cost(entry.id), 2)
+        })
+    
+    summary.update({
+        "tentative_events": len(movable),
+        "scheduled": len(assignments),
+        "moved": sum(1 for assignment in assignments if assignment["displacement_minutes"] > 0),
+        "unscheduled": len(unscheduled),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    })
+    logger.info(
+        f"Auto-schedule for owner {owner_id}: {len(assignments)}/{len(movable)} placed, "
+        f"{summary['total_displacement_minutes']} minutes displacement"
+    )
+    
+    return {"summary": summary, "assignments": assignments, "unscheduled": unscheduled}
+
+def apply_auto_schedule(owner_id: int, assignments: List[Dict], db: Session) -> Dict:
+    """
+    Write planned times, then refresh the owner's conflicts and tentative flags.
+    
+    Events left without conflicts are no longer tentative. The caller commits.
+    """
+    moved = [
+        {"id": assignment["event_id"], "start_time": assignment["start_time"], "end_time": assignment["end_time"]}
+        for assignment in assignments
+        if assignment["displacement_minutes"] > 0
+    ]
+    if moved:
+        db.execute(update(Event), moved)
+        # Bulk updates bypass the session hooks that maintain the index
+        interval_indexes.invalidate(owner_id, db)
+    
+    conflicts = scan_calendar_conflicts(owner_id, db)
+    
+    scheduled_ids = [assignment["event_id"] for assignment in assignments]
+    for offset in range(0, len(scheduled_ids), 500):
+        chunk = scheduled_ids[offset:offset + 500]
+        db.execute(
+            update(Event).where(
+                Event.id.in_(chunk),
+                Event.id.not_in(select(Conflict.event_id).filter(Conflict.event_id.in_(chunk)))
+            ).values(is_tentative=False).execution_options(synchronize_session=False)
+        )
+    
+    return conflicts
+
+async def plan_auto_schedule_async(
+    owner_id: int,
+    db: AsyncSession,
+    validator: Optional[ConstraintValidator] = None,
+    time_budget_ms: int = AUTO_SCHEDULE_TIME_BUDGET_MS,
+    **options
+) -> Dict:
+    """Async variant of plan_auto_schedule; the search runs in the threadpool, off the event loop"""
+    fixed, movable = await db.run_sync(lambda session: _load_calendar(owner_id, session, **options))
+    return await run_in_threadpool(
+        solve_auto_schedule, owner_id, fixed, movable, validator, time_budget_ms, **options
+    )
+
+async def apply_auto_schedule_async(owner_id: int, assignments: List[Dict], db: AsyncSession) -> Dict:
+    """Async variant of apply_auto_schedule"""
+    return await db.run_sync(lambda session: apply_auto_schedule(owner_id, assignments, session))
@@ -0,0 +1,107 @@
+"""
+Bulk event import pipeline
+"""
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from app.models.database import Event, Conflict
+from app.models.schemas import EventCreate
+from app.engine.interval_index import interval_indexes
+from app.engine.scheduler_core import scan_calendar_conflicts
+from app.engine.recurrence import series_end
+from typing import Dict, Iterable, Iterator, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _format_validation_error(exc: ValidationError) -> str:
+    """Flatten pydantic errors into a single message"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+def import_events(
+    records: Iterable[Tuple[int, Dict, str]],
+    owner_id: int,
+    db: Session,
+    batch_size: int = 1000
+) -> Iterator[Dict]:
+    """
+    Validate and insert parsed event records in bounded-size transactions.
+    
+    Yields one message per rejected record, a progress message per committed
+    batch and a final summary. Conflict detection runs once, after every batch
+    is in, over the imported events together with the existing calendar.
+    """
+    processed = 0
+    rejected = 0
+    inserted_ids: List[int] = []
+    batch: List[Dict] = []
+    
+    def write_batch():
+        ids = db.scalars(insert(Event).returning(Event.id), batch).all()
+        # Bulk inserts bypass the unit of work that keeps the index in sync
+        interval_indexes.invalidate(owner_id, db)
+        db.commit()
+        inserted_ids.extend(ids)
+        batch.clear()
+    
+    def progress():
+        return {"type": "progress", "processed": processed, "inserted": len(inserted_ids), "errors": rejected}
+    
+    for line_number, record, error in records:
+        processed += 1
+        if error is None:
+            try:
+                event = EventCreate(**record)
+                if event.start_time >= event.end_time:
+                    error = "Start time must be before end time"
+            except ValidationError as exc:
+                error = _format_validation_error(exc)
+            except TypeError:
+                error = "Invalid event record"
+        
+        if error is not None:
+            rejected += 1
+            yield {"type": "error", "line": line_number, "detail": error}
+            continue
+        
+        # Core inserts skip the mapper hook that stores the series span
+        recurrence_end = series_end(event.start_time, event.end_time, event.recurrence_rule) if event.recurrence_rule else None
+        batch.append({**event.dict(), "owner_id": owner_id, "is_tentative": False, "recurrence_end": recurrence_end})
+        if len(batch) >= batch_size:
+            write_batch()
+            yield progress()
+    
+    if batch:
+        write_batch()
+        yield progress()
+    
+    # One sort-and-sweep over the whole calendar instead of a scan per event
+    conflict_summary = scan_calendar_conflicts(owner_id, db)
+    
+    tentative = 0
+    for offset in range(0, len(inserted_ids), 500):
+        chunk = inserted_ids[offset:offset + 500]
+        conflicting = [
+            row[0] for row in db.query(Conflict.event_id).filter(Conflict.event_id.in_(chunk)).distinct()
+        ]
+        if conflicting:
+            db.query(Event).filter(Event.id.in_(conflicting)).update(
+                {Event.is_tentative: True}, synchronize_session=False
+            )
+            tentative += len(conflicting)
+    db.commit()
+    
+    logger.info(f"Imported {len(inserted_ids)} events for owner {owner_id}, {rejected} rejected")
+    
+    yield {
+        "type": "summary",
+        "processed": processed,
+        "inserted": len(inserted_ids),
+        "errors": rejected,
+        "tentative": tentative,
+        "conflicts": conflict_summary
+    }
@@ -3,14 +3,31 @@ Constraint validation engine
 """
 
 from app.models.database import Event
-from datetime import datetime
-from typing import List, Dict
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional
+import numpy as np
+
+# A constraint turned into ready-to-run predicates: `check` takes one event,
+# `check_many` takes (starts, ends, ids) NumPy arrays and returns a mask
+CompiledConstraint = namedtuple("CompiledConstraint", ["name", "message", "check", "check_many"])
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_US = timedelta(microseconds=1)
+_US_PER_MINUTE = 60 * 1_000_000
+_US_PER_HOUR = 60 * _US_PER_MINUTE
+
+def _to_epoch_us(times: List[datetime]) -> np.ndarray:
+    """Convert naive datetimes to int64 microseconds since the epoch"""
+    # Several times faster than np.array(times, dtype="datetime64[us]")
+    return np.fromiter(((moment - _EPOCH) // _ONE_US for moment in times), dtype=np.int64, count=len(times))
 
 class ConstraintValidator:
     """Validates scheduling constraints"""
     
     def __init__(self):
         self.constraints = []
+        self._plan: Optional[List[CompiledConstraint]] = None
     
     def add_constraint(self, constraint_type: str, params: dict):
         """Add a constraint"""
@@ -18,34 +35,134 @@ class ConstraintValidator:
             "type": constraint_type,
             "params": params
         })
+        self._plan = None
+    
+    def compile(self) -> List[CompiledConstraint]:
+        """Turn the constraint list into a plan of predicates, once per set of constraints"""
+        if self._plan is None:
+            compilers = {
+                "duration": self._compile_duration,
+                "time_window": self._compile_time_window,
+                "no_conflicts": self._compile_no_conflicts
+            }
+            self._plan = [
+                compilers[constraint["type"]](constraint["params"])
+                for constraint in self.constraints
+                if constraint["type"] in compilers
+            ]
+        return self._plan
     
     def validate_event(self, event: Event) -> List[Dict]:
         """Validate event against all constraints"""
-        violations = []
-        
-        for constraint in self.constraints:
-            if constraint["type"] == "duration":
-                if self._validate_duration(event, constraint["params"]):
-                    violations.append({
-                        "constraint": "duration",
-                        "message": "Event duration violates constraint"
-                    })
+        return [
+            {"constraint": step.name, "message": step.message}
+            for step in self.compile()
+            if step.check(event)
+        ]
+    
+    def validate_many(self, events: List[Event]) -> List[List[Dict]]:
+        """
+        Validate a batch of events at once, returning one violation list per event.
+        
+        Start and end times are converted to NumPy arrays of epoch microseconds
+        a single time, and each constraint is evaluated over the whole batch.
+        An index's arrays are kept with the compiled plan until its version
+        changes; a plain existing_events list is read again on every call.
+        """
+        if not events:
+            return []
+        
+        starts = _to_epoch_us([event.start_time for event in events])
+        ends = _to_epoch_us([event.end_time for event in events])
+        ids = np.array([event.id if event.id is not None else -1 for event in events], dtype=np.int64)
+        
+        violations = [[] for _ in events]
+        for step in self.compile():
+            for position in np.flatnonzero(step.check_many(starts, ends, ids)):
+                violations[position].append({"constraint": step.name, "message": step.message})
+        
+        return violations
+    
+    def _compile_duration(self, params: dict) -> CompiledConstraint:
+        def check(event: Event) -> bool:
+            return self._validate_duration(event, params)
+        
+        def check_many(starts, ends, ids):
+            min_duration = params.get("min_minutes", 0)
+            max_duration = params.get("max_minutes", float('inf'))
+            duration = (ends - starts) / _US_PER_MINUTE
+            return (duration < min_duration) | (duration > max_duration)
+        
+        return CompiledConstraint("duration", "Event duration violates constraint", check, check_many)
+    
+    def _compile_time_window(self, params: dict) -> CompiledConstraint:
+        def check(event: Event) -> bool:
+            return self._validate_time_window(event, params)
+        
+        def check_many(starts, ends, ids):
+            start_hours = (starts // _US_PER_HOUR) % 24
+            end_hours = (ends // _US_PER_HOUR) % 24
+            return (start_hours < params.get("start_hour", 0)) | (end_hours > params.get("end_hour", 24))
+        
+        return CompiledConstraint("time_window", "Event time violates allowed window", check, check_many)
+    
+    def _compile_no_conflicts(self, params: dict) -> CompiledConstraint:
+        # Arrays of an index's intervals, built once per plan and reused until the index changes.
+        # A plain existing_events list has no version to tell a change by, so it is read every call.
+        cached = [None]  # (key, sorted starts, sorted ends, ids, starts and ends in id order)
+        
+        def existing_arrays():
+            index = params.get("index")
+            key = None
+            if index is not None:
+                # Read before the snapshot, so a concurrent change only forces another rebuild
+                key = (id(index), index.version)
+                if cached[0] is not None and cached[0][0] == key:
+                    return cached[0][1:]
+                existing = list(index)
+            else:
+                existing = params.get("existing_events", [])
             
-            elif constraint["type"] == "time_window":
-                if self._validate_time_window(event, constraint["params"]):
-                    violations.append({
-                        "constraint": "time_window",
-                        "message": "Event time violates allowed window"
-                    })
+            existing_starts = _to_epoch_us([other.start_time for other in existing])
+            existing_ends = _to_epoch_us([other.end_time for other in existing])
+            existing_ids = np.array([getattr(other, "id", -1) for other in existing], dtype=np.int64)
+            by_id = np.argsort(existing_ids)
+            arrays = (
+                np.sort(existing_starts), np.sort(existing_ends),
+                existing_ids[by_id], existing_starts[by_id], existing_ends[by_id]
+            )
+            if key is not None:
+                cached[0] = (key, *arrays)
+            return arrays
+        
+        def check(event: Event) -> bool:
+            return self._validate_no_conflicts(event, params)
+        
+        def check_many(starts, ends, ids):
+            sorted_starts, sorted_ends, existing_ids, id_starts, id_ends = existing_arrays()
+            if not len(sorted_starts):
+                return np.zeros(len(starts), dtype=bool)
+            
+            # Existing intervals overlapping [start, end) are those starting before
+            # end, minus those (all of which start earlier still) ending by start
+            overlaps = (
+                np.searchsorted(sorted_starts, ends, side="left")
+                - np.searchsorted(sorted_ends, starts, side="right")
+            )
             
-            elif constraint["type"] == "no_conflicts":
-                if self._validate_no_conflicts(event, constraint["params"]):
-                    violations.append({
-                        "constraint": "no_conflicts",
-                        "message": "Event creates scheduling conflict"
-                    })
+            if params.get("index") is not None:
+                # An event already in the index must not conflict with its own stored interval
+                positions = np.minimum(np.searchsorted(existing_ids, ids), len(existing_ids) - 1)
+                self_overlap = (
+                    (existing_ids[positions] == ids)
+                    & (id_starts[positions] < ends)
+                    & (id_ends[positions] > starts)
+                )
+                overlaps = overlaps - self_overlap
+            
+            return overlaps > 0
         
-        return violations
+        return CompiledConstraint("no_conflicts", "Event creates scheduling conflict", check, check_many)
     
     def _validate_duration(self, event: Event, params: dict) -> bool:
         """Check if event duration meets constraints"""
@@ -68,6 +185,13 @@ class ConstraintValidator:
     
     def _validate_no_conflicts(self, event: Event, params: dict) -> bool:
         """Check if event creates conflicts with existing events"""
+        index = params.get("index")
+        if index is not None:
+            return any(
+                other_event.id != event.id
+                for other_event in index.overlapping(event.start_time, event.end_time)
+            )
+        
         existing_events = params.get("existing_events", [])
         
         for other_event in existing_events:
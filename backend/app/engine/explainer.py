@@ -3,33 +3,153 @@ Explainability engine for scheduling decisions
 """
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.database import Event, Conflict
+from app.engine.recurrence import Occurrence, iter_occurrences, load_exceptions
+from app.engine.scheduler_core import recurrence_horizon
+from app.utils.cache import TTLCache
+from app.utils.metrics import timed
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Iterator, List, Optional, Tuple
+import os
 
+# Explanations keyed on the conflict pair and both events' versions
+EXPLANATION_CACHE_SIZE = int(os.getenv("EXPLANATION_CACHE_SIZE", "20000"))
+EXPLANATION_CACHE_TTL_SECONDS = float(os.getenv("EXPLANATION_CACHE_TTL_SECONDS", "3600"))
+
+explanation_cache = TTLCache(maxsize=EXPLANATION_CACHE_SIZE, ttl=EXPLANATION_CACHE_TTL_SECONDS)
+
+def _version(event: Event) -> Optional[datetime]:
+    return event.updated_at or event.created_at
+
+@timed()
 def generate_explanation(event: Event, conflict: Conflict, db: Session) -> Dict:
     """
     Generate human-readable explanation for scheduling decision
     """
-    conflicting_event = db.query(Event).filter(
-        Event.id == conflict.conflict_with_event_id
-    ).first()
+    return _explain([conflict], db, {event.id: event})[0]
+
+@timed()
+def generate_explanations(
+    conflicts: List[Conflict],
+    db: Session,
+    known_events: Optional[Dict[int, Event]] = None
+) -> List[Dict]:
+    """Explain many conflicts at once, in the order given"""
+    return _explain(conflicts, db, known_events)
+
+def _explain(
+    conflicts: List[Conflict],
+    db: Session,
+    known_events: Optional[Dict[int, Event]] = None
+) -> List[Dict]:
+    """
+    Untimed body of both entry points, so each call is recorded as one span.
+    
+    Events not in known_events are loaded with one batched query, and
+    explanations are reused until either event of the pair changes. When
+    either event recurs, the pair is explained by its first overlapping
+    occurrences.
+    """
+    events = dict(known_events or {})
+    missing = {
+        event_id
+        for conflict in conflicts
+        for event_id in (conflict.event_id, conflict.conflict_with_event_id)
+        if event_id not in events
+    }
+    missing = list(missing)
+    for offset in range(0, len(missing), 500):
+        for loaded in db.query(Event).filter(Event.id.in_(missing[offset:offset + 500])):
+            events[loaded.id] = loaded
+    
+    # Recurring events are explained through their overlapping occurrences
+    series_ids = [event.id for event in events.values() if event.recurrence_rule is not None]
+    exceptions = load_exceptions(db, series_ids) if series_ids else {}
+    
+    explanations = []
+    for conflict in conflicts:
+        event = events.get(conflict.event_id)
+        conflicting_event = events.get(conflict.conflict_with_event_id)
+        if event is None or conflicting_event is None:
+            explanations.append({"explanation": "Could not generate explanation"})
+            continue
+        
+        key = (
+            event.id, _version(event), event.start_time, event.end_time, _exception_versions(exceptions, event.id),
+            conflicting_event.id, _version(conflicting_event), _exception_versions(exceptions, conflicting_event.id),
+            conflict.conflict_type, conflict.severity
+        )
+        explanation = explanation_cache.get(key)
+        if explanation is None:
+            explanation = _build_explanation(event, conflict, conflicting_event, exceptions)
+            explanation_cache.set(key, explanation)
+        explanations.append(explanation)
     
-    if not conflicting_event:
-        return {"explanation": "Could not generate explanation"}
+    return explanations
+
+def _exception_versions(exceptions: Dict[int, List], event_id: int) -> tuple:
+    return tuple(
+        (exception.original_start, exception.is_cancelled, exception.start_time, exception.end_time)
+        for exception in exceptions.get(event_id, ())
+    )
+
+def _timeline(event: Event, other: Event, exceptions: Dict[int, List], horizon: datetime) -> Iterator:
+    """The event itself, or the occurrences of a recurring event that can overlap other, by start time"""
+    if event.recurrence_rule is None:
+        return iter([Occurrence(event.id, event.start_time, event.end_time, None)])
+    # Against a single event only its own span needs expanding
+    window = (other.start_time, other.end_time) if other.recurrence_rule is None else (None, None)
+    return iter_occurrences(
+        event.id, event.start_time, event.end_time, event.recurrence_rule, *window,
+        exceptions.get(event.id, ()), unbounded_until=horizon
+    )
+
+def _first_overlap(first: Iterator, second: Iterator) -> Optional[Tuple]:
+    """Earliest overlapping pair of two start-ordered timelines, advancing whichever ends first"""
+    a, b = next(first, None), next(second, None)
+    while a is not None and b is not None:
+        if a.start_time < b.end_time and b.start_time < a.end_time:
+            return a, b
+        if a.end_time <= b.end_time:
+            a = next(first, None)
+        else:
+            b = next(second, None)
+    return None
+
+def _build_explanation(
+    event: Event,
+    conflict: Conflict,
+    conflicting_event: Event,
+    exceptions: Dict[int, List]
+) -> Dict:
+    # Two endless series are walked up to the horizon of the later one
+    horizon = recurrence_horizon(max(event.start_time, conflicting_event.start_time))
+    pair = _first_overlap(
+        _timeline(event, conflicting_event, exceptions, horizon),
+        _timeline(conflicting_event, event, exceptions, horizon)
+    )
+    if pair is None:
+        # The stored conflict is stale, e.g. the overlapping occurrence was cancelled
+        pair = (
+            Occurrence(event.id, event.start_time, event.end_time, None),
+            Occurrence(conflicting_event.id, conflicting_event.start_time, conflicting_event.end_time, None)
+        )
+    occurrence, other = pair
     
     # Calculate overlap details
-    overlap_start = max(event.start_time, conflicting_event.start_time)
-    overlap_end = min(event.end_time, conflicting_event.end_time)
+    overlap_start = max(occurrence.start_time, other.start_time)
+    overlap_end = max(min(occurrence.end_time, other.end_time), overlap_start)
     overlap_duration = (overlap_end - overlap_start).total_seconds() / 3600
     
-    explanation = {
+    return {
         "conflict_type": conflict.conflict_type,
         "severity": conflict.severity,
         "conflicting_event": {
             "title": conflicting_event.title,
-            "start_time": conflicting_event.start_time.isoformat(),
-            "end_time": conflicting_event.end_time.isoformat()
+            "start_time": other.start_time.isoformat(),
+            "end_time": other.end_time.isoformat(),
+            "recurrence_id": other.recurrence_id.isoformat() if other.recurrence_id else None
         },
         "overlap_details": {
             "overlap_start": overlap_start.isoformat(),
@@ -37,10 +157,24 @@ def generate_explanation(event: Event, conflict: Conflict, db: Session) -> Dict:
             "overlap_duration_hours": round(overlap_duration, 2)
         },
         "recommendation": generate_recommendation(conflict.severity, overlap_duration),
-        "suggested_actions": generate_suggested_actions(event, conflicting_event)
+        "suggested_actions": generate_suggested_actions(occurrence, other)
     }
-    
-    return explanation
+
+async def generate_explanation_async(event: Event, conflict: Conflict, db: AsyncSession) -> Dict:
+    """
+    Async variant of generate_explanation
+    """
+    return await db.run_sync(lambda session: generate_explanation(event, conflict, session))
+
+async def generate_explanations_async(
+    conflicts: List[Conflict],
+    db: AsyncSession,
+    known_events: Optional[Dict[int, Event]] = None
+) -> List[Dict]:
+    """
+    Async variant of generate_explanations
+    """
+    return await db.run_sync(lambda session: generate_explanations(conflicts, session, known_events))
 
 def generate_recommendation(severity: str, overlap_hours: float) -> str:
     """Generate recommendation based on conflict severity"""
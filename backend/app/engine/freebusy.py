@@ -0,0 +1,104 @@
+"""
+Free/busy bitmaps: one bit per fixed-size slot of a calendar
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.engine.interval_index import interval_indexes
+from app.engine.scheduler_core import get_busy_intervals
+from app.utils.cache import TTLCache
+from app.utils.metrics import timed
+from datetime import datetime, timedelta
+from typing import Dict, List
+import base64
+import numpy as np
+import os
+
+# Bitmaps keyed on owner, range and slot size, tagged with the owner's calendar revision
+FREEBUSY_CACHE_SIZE = int(os.getenv("FREEBUSY_CACHE_SIZE", "4096"))
+FREEBUSY_CACHE_TTL_SECONDS = float(os.getenv("FREEBUSY_CACHE_TTL_SECONDS", "3600"))
+MAX_FREEBUSY_SLOTS = 366 * 96  # a year of 15 minute slots, 4.5 KB per user
+MAX_FREEBUSY_USERS = int(os.getenv("MAX_FREEBUSY_USERS", "500"))
+
+freebusy_cache = TTLCache(maxsize=FREEBUSY_CACHE_SIZE, ttl=FREEBUSY_CACHE_TTL_SECONDS)
+
+def slot_count(start: datetime, end: datetime, slot_minutes: int) -> int:
+    """Slots needed to cover [start, end), the last one possibly running past end"""
+    return -((start - end) // timedelta(minutes=slot_minutes))
+
+def busy_bitmap(intervals: List, start: datetime, slot_minutes: int, slots: int) -> np.ndarray:
+    """
+    Packed bitmap with a bit set for every slot an interval touches.
+    
+    Bit i is slot i, most significant bit of each byte first, as np.packbits
+    lays it out; padding bits of the last byte are zero.
+    """
+    slot = timedelta(minutes=slot_minutes)
+    count = len(intervals)
+    first = np.fromiter(((interval.start_time - start) // slot for interval in intervals), dtype=np.int64, count=count)
+    # Rounded up, so a slot only partly taken counts as busy
+    last = np.fromiter((-((start - interval.end_time) // slot) for interval in intervals), dtype=np.int64, count=count)
+    
+    # Coverage counts from a difference array: +1 where an interval starts, -1 after it ends
+    steps = np.zeros(slots + 1, dtype=np.int32)
+    np.add.at(steps, np.clip(first, 0, slots), 1)
+    np.add.at(steps, np.clip(last, 0, slots), -1)
+    return np.packbits(np.cumsum(steps[:slots]) > 0)
+
+def _owner_bitmaps(
+    owner_ids: List[int],
+    db: Session,
+    start: datetime,
+    slot_minutes: int,
+    slots: int
+) -> List[np.ndarray]:
+    """Each owner's busy bitmap, reused from the cache while their revision holds"""
+    end = start + slots * timedelta(minutes=slot_minutes)
+    revisions = interval_indexes.backend.current_many(owner_ids, db)
+    bitmaps = []
+    for owner_id in owner_ids:
+        key = (owner_id, start, slot_minutes, slots)
+        cached = freebusy_cache.get(key)
+        if cached is not None and cached[0] == revisions[owner_id]:
+            bitmaps.append(cached[1])
+            continue
+        
+        intervals = get_busy_intervals(owner_id, db, start, end)
+        bitmap = busy_bitmap(intervals, start, slot_minutes, slots)
+        # Tagged with the revision read before building, so a concurrent change only forces a rebuild
+        freebusy_cache.set(key, (revisions[owner_id], bitmap))
+        bitmaps.append(bitmap)
+    return bitmaps
+
+@timed()
+def get_freebusy(
+    owner_ids: List[int],
+    db: Session,
+    start: datetime,
+    end: datetime,
+    slot_minutes: int = 15
+) -> Dict:
+    """
+    Free/busy of one or more owners over [start, end) as base64 bitmaps.
+    
+    busy has a bit set where any of the owners is busy and free where all of
+    them are free, so free is the bitwise AND of their free time.
+    """
+    slots = slot_count(start, end, slot_minutes)
+    bitmaps = _owner_bitmaps(list(dict.fromkeys(owner_ids)), db, start, slot_minutes, slots)
+    busy = np.bitwise_or.reduce(bitmaps) if len(bitmaps) > 1 else bitmaps[0]
+    free = ~busy & np.packbits(np.ones(slots, dtype=bool))
+    
+    return {
+        "start": start,
+        "end": start + slots * timedelta(minutes=slot_minutes),
+        "slot_minutes": slot_minutes,
+        "slots": slots,
+        "user_ids": owner_ids,
+        "busy": base64.b64encode(busy.tobytes()).decode(),
+        "free": base64.b64encode(free.tobytes()).decode()
+    }
+
+async def get_freebusy_async(owner_ids: List[int], db: AsyncSession, *args, **kwargs) -> Dict:
+    """Async variant of get_freebusy"""
+    return await db.run_sync(lambda session: get_freebusy(owner_ids, session, *args, **kwargs))
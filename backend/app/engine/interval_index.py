@@ -0,0 +1,472 @@
+"""
+Per-owner interval index for conflict detection
+"""
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session, attributes
+from app.models.database import Event, EventException
+from app.utils.revisions import RevisionBackend, revision_backend
+from collections import OrderedDict, defaultdict, namedtuple
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+import random
+import threading
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Memory bound of the cached trees, estimated per indexed event
+INTERVAL_INDEX_MAX_BYTES = int(os.getenv("INTERVAL_INDEX_MAX_BYTES", str(64 * 1024 * 1024)))
+ENTRY_BYTES = 400  # tree node, entry and index dict slot, measured with tracemalloc
+
+# Lightweight stand-in for an Event row; has the attributes that
+# has_time_overlap and calculate_conflict_severity read.
+IntervalEntry = namedtuple("IntervalEntry", ["id", "start_time", "end_time"])
+
+# An owner's recurring events and their exceptions, cached next to the tree so
+# occurrences can be expanded without querying. The entries have the attributes
+# expand_series and iter_occurrences read.
+SeriesEntry = namedtuple("SeriesEntry", ["id", "start_time", "end_time", "recurrence_rule", "recurrence_end"])
+ExceptionEntry = namedtuple("ExceptionEntry", ["original_start", "is_cancelled", "start_time", "end_time"])
+OwnerSeries = namedtuple("OwnerSeries", ["rows", "exceptions", "ids"])
+
+def _series_size(series: OwnerSeries) -> int:
+    return len(series.rows) + sum(len(exceptions) for exceptions in series.exceptions.values())
+
+class _Node:
+    """Treap node keyed by (start_time, id) and augmented with the max end_time of its subtree"""
+    
+    __slots__ = ("entry", "key", "priority", "left", "right", "max_end")
+    
+    def __init__(self, entry: IntervalEntry, priority: float):
+        self.entry = entry
+        self.key = (entry.start_time, entry.id)
+        self.priority = priority
+        self.left = None
+        self.right = None
+        self.max_end = entry.end_time
+
+def _pull(node: _Node) -> _Node:
+    """Recompute the max_end augmentation from the node's children"""
+    max_end = node.entry.end_time
+    if node.left is not None and node.left.max_end > max_end:
+        max_end = node.left.max_end
+    if node.right is not None and node.right.max_end > max_end:
+        max_end = node.right.max_end
+    node.max_end = max_end
+    return node
+
+def _split(node: Optional[_Node], key: tuple):
+    """Split a treap into (keys < key, keys >= key)"""
+    if node is None:
+        return None, None
+    if node.key < key:
+        left, right = _split(node.right, key)
+        node.right = left
+        return _pull(node), right
+    left, right = _split(node.left, key)
+    node.left = right
+    return left, _pull(node)
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    """Merge two treaps where every key in left is smaller than every key in right"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _pull(left)
+    right.left = _merge(left, right.left)
+    return _pull(right)
+
+class IntervalTree:
+    """
+    Augmented interval tree (randomized treap) over half-open [start, end) intervals.
+    
+    Insert and delete are O(log n); overlap queries are O(log n + k) and
+    report intervals with the same semantics as has_time_overlap.
+    """
+    
+    def __init__(self, entries=()):
+        self._root = None
+        self._entries: Dict[int, IntervalEntry] = {}
+        self._lock = threading.RLock()
+        # Bumped by every insert and remove, so derived data can tell it is outdated
+        self.version = 0
+        self._build(entries)
+    
+    def _build(self, entries):
+        """Build the tree in O(n log n) sort + O(n) Cartesian-tree construction"""
+        for entry in entries:
+            self._entries[entry.id] = entry
+        ordered = sorted(self._entries.values(), key=lambda e: (e.start_time, e.id))
+        
+        stack: List[_Node] = []
+        for entry in ordered:
+            node = _Node(entry, random.random())
+            last = None
+            while stack and stack[-1].priority < node.priority:
+                last = _pull(stack.pop())
+            node.left = last
+            if stack:
+                stack[-1].right = node
+            stack.append(node)
+        while len(stack) > 1:
+            _pull(stack.pop())
+        self._root = _pull(stack[0]) if stack else None
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, event_id: int) -> bool:
+        return event_id in self._entries
+    
+    def get(self, event_id: int) -> Optional[IntervalEntry]:
+        """The indexed interval of an event id, or None"""
+        return self._entries.get(event_id)
+    
+    def __iter__(self) -> Iterator[IntervalEntry]:
+        """Iterate a snapshot of the entries in (start_time, id) order"""
+        with self._lock:
+            return iter(list(self._in_order()))
+    
+    def _in_order(self) -> Iterator[IntervalEntry]:
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.entry
+            node = node.right
+    
+    def insert(self, entry: IntervalEntry):
+        """Insert an interval, replacing any existing entry with the same id"""
+        with self._lock:
+            if entry.id in self._entries:
+                self.remove(entry.id)
+            self._entries[entry.id] = entry
+            self.version += 1
+            left, right = _split(self._root, (entry.start_time, entry.id))
+            self._root = _merge(_merge(left, _Node(entry, random.random())), right)
+    
+    def remove(self, event_id: int) -> bool:
+        """Remove the interval for an event id; returns False if it was not indexed"""
+        with self._lock:
+            entry = self._entries.pop(event_id, None)
+            if entry is None:
+                return False
+            self.version += 1
+            left, rest = _split(self._root, (entry.start_time, entry.id))
+            _, right = _split(rest, (entry.start_time, entry.id + 1))
+            self._root = _merge(left, right)
+            return True
+    
+    def overlapping(self, start: datetime, end: datetime) -> List[IntervalEntry]:
+        """Return every interval overlapping [start, end), ordered by start time"""
+        result = []
+        with self._lock:
+            self._collect(self._root, start, end, result, False)
+        return result
+    
+    def has_overlap(self, start: datetime, end: datetime) -> bool:
+        """Check whether any interval overlaps [start, end)"""
+        result = []
+        with self._lock:
+            self._collect(self._root, start, end, result, True)
+        return bool(result)
+    
+    def _collect(self, node, start, end, result, first_only) -> bool:
+        """Append overlaps under node to result; returns True once a first_only search is satisfied"""
+        # Subtrees whose latest end is at or before start cannot overlap
+        if node is None or node.max_end <= start:
+            return False
+        if self._collect(node.left, start, end, result, first_only):
+            return True
+        entry = node.entry
+        if entry.start_time >= end:
+            # Everything to the right starts even later
+            return False
+        if entry.end_time > start:
+            result.append(entry)
+            if first_only:
+                return True
+        return self._collect(node.right, start, end, result, first_only)
+
+class IntervalIndexRegistry:
+    """
+    Process-local LRU registry of one IntervalTree per owner, bounded by memory.
+    
+    Trees are built lazily from the database and tagged with the owner's
+    calendar revision. Every committed change to an owner's events bumps the
+    revision, so a tree whose tag no longer matches was outdated by another
+    worker and is rebuilt. Committed ORM inserts, updates and deletes made by
+    this process are applied to the cached trees in place. Bulk statements that
+    bypass the unit of work must call invalidate() with their session for the
+    affected owners. Recurring events are not indexed; the owner's series and
+    their exceptions are cached beside the tree at the same revision, and
+    expanded per query window.
+    """
+    
+    def __init__(self, backend: Optional[RevisionBackend] = None, max_bytes: int = INTERVAL_INDEX_MAX_BYTES):
+        self.backend = backend or revision_backend
+        self.max_bytes = max_bytes
+        self._trees: "OrderedDict[int, tuple]" = OrderedDict()  # owner_id -> (revision, tree)
+        self._series: Dict[int, tuple] = {}  # owner_id -> (revision, OwnerSeries)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+    
+    def revision(self, owner_id: int, db: Session) -> int:
+        """The owner's revision the cached data must carry to be current for this session"""
+        # The caches reflect committed state; this session's own flushed changes join at commit
+        bumped = db.info.get(_REVISIONS_KEY, {}).get(owner_id)
+        return bumped[0] if bumped else self.backend.current(owner_id, db)
+    
+    def get(self, owner_id: int, db: Session, revision: Optional[int] = None) -> IntervalTree:
+        """Get the index for an owner, rebuilding it from the database if missing or stale"""
+        if revision is None:
+            revision = self.revision(owner_id, db)
+        with self._lock:
+            cached = self._trees.get(owner_id)
+            if cached is not None and cached[0] == revision:
+                self._trees.move_to_end(owner_id)
+                self.hits += 1
+                return cached[1]
+            if cached is not None:
+                self.stale += 1
+                del self._trees[owner_id]
+            self.misses += 1
+        
+        rows = db.query(Event.id, Event.start_time, Event.end_time).filter(
+            Event.owner_id == owner_id,
+            Event.recurrence_rule.is_(None)
+        ).all()
+        tree = IntervalTree(IntervalEntry(*row) for row in rows)
+        
+        with self._lock:
+            # Keep a tree someone else built from a newer revision meanwhile
+            current = self._trees.get(owner_id)
+            if current is None or current[0] < revision:
+                self._trees[owner_id] = (revision, tree)
+                self._trees.move_to_end(owner_id)
+                self._evict()
+        return tree
+    
+    def series(self, owner_id: int, db: Session, revision: Optional[int] = None) -> OwnerSeries:
+        """Get the owner's recurring events and their exceptions, reloading them if missing or stale"""
+        if revision is None:
+            revision = self.revision(owner_id, db)
+        with self._lock:
+            cached = self._series.get(owner_id)
+            if cached is not None and cached[0] == revision:
+                return cached[1]
+        
+        rows = [
+            SeriesEntry(*row)
+            for row in db.query(
+                Event.id, Event.start_time, Event.end_time, Event.recurrence_rule, Event.recurrence_end
+            ).filter(
+                Event.owner_id == owner_id,
+                Event.recurrence_rule.isnot(None)
+            )
+        ]
+        exceptions = defaultdict(list)
+        ids = [row.id for row in rows]
+        for offset in range(0, len(ids), 500):
+            for row in db.query(
+                EventException.event_id, EventException.original_start, EventException.is_cancelled,
+                EventException.start_time, EventException.end_time
+            ).filter(EventException.event_id.in_(ids[offset:offset + 500])):
+                exceptions[row.event_id].append(ExceptionEntry(*row[1:]))
+        series = OwnerSeries(rows, dict(exceptions), frozenset(ids))
+        
+        with self._lock:
+            current = self._series.get(owner_id)
+            if current is None or current[0] < revision:
+                self._series[owner_id] = (revision, series)
+                self._evict()
+        return series
+    
+    def _size(self) -> int:
+        entries = sum(len(tree) for _, tree in self._trees.values())
+        entries += sum(_series_size(series) for _, series in self._series.values())
+        return entries * ENTRY_BYTES
+    
+    def _evict(self):
+        """Drop least recently used trees, with their series, until the estimated size fits, keeping the newest"""
+        size = self._size()
+        while size > self.max_bytes and len(self._trees) > 1:
+            owner_id, (_, tree) = self._trees.popitem(last=False)
+            size -= len(tree) * ENTRY_BYTES
+            cached = self._series.pop(owner_id, None)
+            if cached is not None:
+                size -= _series_size(cached[1]) * ENTRY_BYTES
+            self.evictions += 1
+    
+    def apply(self, changes: List[tuple], revisions: Optional[Dict[int, tuple]] = None, stale_owners=()):
+        """
+        Apply committed (action, owner_id, entry) changes to the cached trees.
+        
+        Actions are "upsert", "delete", "series" for a recurring event, which
+        leaves the tree, and "touch", which only moves the revision on.
+        
+        revisions maps each owner to the (previous, new) revision of the commit
+        when the backend bumped them inside the transaction; otherwise the
+        revisions are bumped here. A tree is updated in place only if it was
+        at the previous revision, and dropped otherwise. Cached series are
+        dropped by any change to a recurring event or its exceptions.
+        """
+        owners = {owner_id for _, owner_id, _ in changes} | set(stale_owners)
+        if not owners:
+            return
+        with self._lock:
+            if revisions is None:
+                revisions = {
+                    owner_id: (revision - 1, revision)
+                    for owner_id, revision in self.backend.bump(owners).items()
+                }
+            for owner_id in stale_owners:
+                self._trees.pop(owner_id, None)
+                self._series.pop(owner_id, None)
+            for action, owner_id, entry in changes:
+                previous, latest = revisions.get(owner_id, (None, None))
+                series = self._series.get(owner_id)
+                if series is not None:
+                    if (
+                        series[0] not in (previous, latest)
+                        or action in ("series", "touch")
+                        or entry.id in series[1].ids
+                    ):
+                        del self._series[owner_id]
+                    else:
+                        self._series[owner_id] = (latest, series[1])
+                
+                cached = self._trees.get(owner_id)
+                if cached is None:
+                    continue
+                if cached[0] not in (previous, latest):
+                    del self._trees[owner_id]
+                    continue
+                if action == "upsert":
+                    cached[1].insert(entry)
+                elif action in ("delete", "series"):
+                    cached[1].remove(entry.id)
+                self._trees[owner_id] = (latest, cached[1])
+            self._evict()
+    
+    def invalidate(self, owner_id: Optional[int] = None, db: Optional[Session] = None):
+        """
+        Drop the cached index for one owner, or for all owners.
+        
+        Pass the session that wrote the bulk change so the owner's revision is
+        bumped when it commits and other workers drop their copies too.
+        """
+        with self._lock:
+            if owner_id is None:
+                self._trees.clear()
+                self._series.clear()
+            else:
+                self._trees.pop(owner_id, None)
+                self._series.pop(owner_id, None)
+        
+        if owner_id is not None and db is not None:
+            db.info.setdefault(_STALE_KEY, set()).add(owner_id)
+            if self.backend.transactional:
+                _bump_in_transaction(db, [owner_id])
+    
+    def touch(self, owner_id: int, db: Session):
+        """
+        Move the owner's revision on when the session commits, keeping the cached tree.
+        
+        For changes that leave the tree alone but outdate the cached series or
+        other per-revision caches, such as cancelling or moving an occurrence
+        of a recurring event.
+        """
+        db.info.setdefault(_PENDING_KEY, []).append(("touch", owner_id, None))
+        if self.backend.transactional:
+            _bump_in_transaction(db, [owner_id])
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__,
+                "owners": len(self._trees),
+                "series_owners": len(self._series),
+                "estimated_bytes": self._size(),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions
+            }
+
+interval_indexes = IntervalIndexRegistry()
+
+# Changes to other columns, such as is_tentative, leave the index and revision alone
+_INDEXED_ATTRIBUTES = ("owner_id", "start_time", "end_time", "recurrence_rule")
+
+_PENDING_KEY = "interval_index_changes"
+_REVISIONS_KEY = "interval_index_revisions"
+_STALE_KEY = "interval_index_stale_owners"
+
+def _bump_in_transaction(session: Session, owner_ids):
+    """Bump revisions inside the session's transaction, remembering the first previous one"""
+    tracked = session.info.setdefault(_REVISIONS_KEY, {})
+    for owner_id, revision in interval_indexes.backend.bump(owner_ids, session).items():
+        previous = tracked[owner_id][0] if owner_id in tracked else revision - 1
+        tracked[owner_id] = (previous, revision)
+
+@sa_event.listens_for(Session, "after_flush")
+def _collect_event_changes(session, flush_context):
+    """Record flushed Event changes until the transaction commits"""
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    flushed = len(pending)
+    
+    for obj in session.new:
+        if isinstance(obj, Event):
+            action = "series" if obj.recurrence_rule else "upsert"
+            pending.append((action, obj.owner_id, IntervalEntry(obj.id, obj.start_time, obj.end_time)))
+    
+    for obj in session.dirty:
+        if isinstance(obj, Event) and any(
+            attributes.get_history(obj, name).has_changes() for name in _INDEXED_ATTRIBUTES
+        ):
+            entry = IntervalEntry(obj.id, obj.start_time, obj.end_time)
+            for old_owner in attributes.get_history(obj, "owner_id").deleted or ():
+                if old_owner is not None and old_owner != obj.owner_id:
+                    pending.append(("delete", old_owner, entry))
+            # An event that became recurring leaves the index
+            pending.append(("series" if obj.recurrence_rule else "upsert", obj.owner_id, entry))
+    
+    for obj in session.deleted:
+        if isinstance(obj, Event):
+            pending.append(("delete", obj.owner_id, IntervalEntry(obj.id, None, None)))
+    
+    owners = {owner_id for _, owner_id, _ in pending[flushed:] if owner_id is not None}
+    if owners and interval_indexes.backend.transactional:
+        _bump_in_transaction(session, owners)
+
+@sa_event.listens_for(Session, "after_commit")
+def _apply_event_changes(session):
+    """Publish committed Event changes to the interval indexes"""
+    changes = session.info.pop(_PENDING_KEY, None) or []
+    revisions = session.info.pop(_REVISIONS_KEY, None)
+    stale_owners = session.info.pop(_STALE_KEY, None) or ()
+    if changes or stale_owners:
+        interval_indexes.apply(changes, revisions, stale_owners)
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_event_changes(session):
+    """Forget changes from a rolled back transaction"""
+    owners = {owner_id for _, owner_id, _ in session.info.pop(_PENDING_KEY, None) or ()}
+    owners |= session.info.pop(_STALE_KEY, None) or set()
+    session.info.pop(_REVISIONS_KEY, None)
+    # A tree built inside the transaction may hold its rolled back rows
+    for owner_id in owners:
+        interval_indexes.invalidate(owner_id)
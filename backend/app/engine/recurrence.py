@@ -0,0 +1,298 @@
+"""
+Recurrence rules and lazy occurrence expansion
+"""
+
+from sqlalchemy import event as sa_event, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.database import Event, EventException
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional
+import heapq
+
+# Supported subset of RFC 5545 RRULE: FREQ=DAILY|WEEKLY|MONTHLY with INTERVAL,
+# COUNT, UNTIL and (weekly only) BYDAY. Times are naive UTC like every event time.
+RecurrenceRule = namedtuple("RecurrenceRule", ["freq", "interval", "count", "until", "byday"])
+
+# One expanded occurrence; recurrence_id is the start the rule generated for it
+Occurrence = namedtuple("Occurrence", ["id", "start_time", "end_time", "recurrence_id"])
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+MAX_COUNT = 10000
+
+def _parse_until(value: str) -> datetime:
+    value = value.rstrip("Z")
+    for layout in ("%Y%m%dT%H%M%S", "%Y%m%d"):
+        try:
+            return datetime.strptime(value, layout)
+        except ValueError:
+            pass
+    return datetime.fromisoformat(value)
+
+@lru_cache(maxsize=4096)
+def parse_rule(text: str) -> RecurrenceRule:
+    """Parse an RRULE string such as FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10"""
+    parts = {}
+    for part in text.strip().upper().removeprefix("RRULE:").split(";"):
+        if part:
+            key, separator, value = part.partition("=")
+            if not separator or not value:
+                raise ValueError(f"Malformed recurrence rule part {part}")
+            parts[key] = value
+    
+    freq = parts.pop("FREQ", None)
+    if freq not in ("DAILY", "WEEKLY", "MONTHLY"):
+        raise ValueError("FREQ must be DAILY, WEEKLY or MONTHLY")
+    
+    try:
+        interval = int(parts.pop("INTERVAL", "1"))
+        count = int(parts.pop("COUNT")) if "COUNT" in parts else None
+        until = _parse_until(parts.pop("UNTIL")) if "UNTIL" in parts else None
+    except ValueError:
+        raise ValueError("INTERVAL and COUNT must be integers and UNTIL a date")
+    if interval < 1 or (count is not None and not 1 <= count <= MAX_COUNT):
+        raise ValueError(f"INTERVAL must be positive and COUNT between 1 and {MAX_COUNT}")
+    if count is not None and until is not None:
+        raise ValueError("COUNT and UNTIL cannot both be set")
+    
+    byday = None
+    if "BYDAY" in parts:
+        if freq != "WEEKLY":
+            raise ValueError("BYDAY is only supported with FREQ=WEEKLY")
+        days = parts.pop("BYDAY").split(",")
+        if any(day not in WEEKDAYS for day in days):
+            raise ValueError("BYDAY takes MO, TU, WE, TH, FR, SA or SU")
+        byday = tuple(sorted({WEEKDAYS.index(day) for day in days}))
+    
+    if parts:
+        raise ValueError(f"Unsupported recurrence rule parts: {', '.join(sorted(parts))}")
+    
+    return RecurrenceRule(freq, interval, count, until, byday)
+
+def _add_months(moment: datetime, months: int) -> Optional[datetime]:
+    """Same day and time `months` later, or None when that month is too short"""
+    month_index = moment.month - 1 + months
+    try:
+        return moment.replace(year=moment.year + month_index // 12, month=month_index % 12 + 1)
+    except ValueError:
+        return None
+
+def _original_starts(start: datetime, rule: RecurrenceRule, not_before: Optional[datetime]) -> Iterator[datetime]:
+    """
+    Occurrence starts in order, honoring COUNT and UNTIL.
+    
+    Jumps straight to about not_before instead of walking the series from its
+    first occurrence, so the cost depends on the window and not on its position.
+    """
+    jump = not_before is not None and not_before > start
+    
+    if rule.freq == "MONTHLY":
+        step = 0
+        # Short months are skipped, so with COUNT late days must be counted from the start
+        if jump and (rule.count is None or start.day <= 28):
+            months_between = (not_before.year - start.year) * 12 + not_before.month - start.month
+            step = max(months_between // rule.interval - 1, 0)
+        emitted = step
+        while True:
+            if rule.count is not None and emitted >= rule.count:
+                return
+            moment = _add_months(start, step * rule.interval)
+            step += 1
+            if moment is None:
+                continue
+            if rule.until is not None and moment > rule.until:
+                return
+            emitted += 1
+            yield moment
+    
+    if rule.byday is None:
+        period = timedelta(days=rule.interval * (7 if rule.freq == "WEEKLY" else 1))
+        index = max((not_before - start) // period, 0) if jump else 0
+        while rule.count is None or index < rule.count:
+            moment = start + index * period
+            if rule.until is not None and moment > rule.until:
+                return
+            yield moment
+            index += 1
+        return
+    
+    # Weekly on several days: weeks are counted from the Monday of the first one
+    period = timedelta(weeks=rule.interval)
+    anchor = start - timedelta(days=start.weekday())
+    first_week = [anchor + timedelta(days=day) for day in rule.byday if anchor + timedelta(days=day) >= start]
+    week = max((not_before - anchor) // period, 0) if jump else 0
+    emitted = 0 if week == 0 else len(first_week) + (week - 1) * len(rule.byday)
+    while True:
+        if week == 0:
+            moments = first_week
+        else:
+            moments = [anchor + week * period + timedelta(days=day) for day in rule.byday]
+        for moment in moments:
+            if rule.count is not None and emitted >= rule.count:
+                return
+            if rule.until is not None and moment > rule.until:
+                return
+            emitted += 1
+            yield moment
+        week += 1
+
+def is_occurrence(start: datetime, rule_text: str, moment: datetime) -> bool:
+    """Check whether the series generates an occurrence starting at moment"""
+    for candidate in _original_starts(start, parse_rule(rule_text), moment):
+        if candidate >= moment:
+            return candidate == moment
+    return False
+
+def series_end(start: datetime, end: datetime, rule_text: Optional[str]) -> Optional[datetime]:
+    """End of the series' last occurrence, or None if it repeats forever"""
+    if not rule_text:
+        return end
+    rule = parse_rule(rule_text)
+    if rule.count is None and rule.until is None:
+        return None
+    
+    not_before = None if rule.count is not None else rule.until - timedelta(days=31 * rule.interval)
+    last = None
+    for last in _original_starts(start, rule, not_before):
+        pass
+    return (last + (end - start)) if last is not None else start
+
+def iter_occurrences(
+    event_id: int,
+    start: datetime,
+    end: datetime,
+    rule_text: str,
+    window_start: Optional[datetime],
+    window_end: Optional[datetime],
+    exceptions: Iterable = (),
+    unbounded_until: Optional[datetime] = None
+) -> Iterator[Occurrence]:
+    """
+    Lazily yield the occurrences overlapping [window_start, window_end), by start time.
+    
+    Exceptions cancel or move single occurrences. Without a window_end, series
+    without COUNT or UNTIL are cut off at unbounded_until, which they then need;
+    a bounded window is always expanded in full.
+    """
+    rule = parse_rule(rule_text)
+    duration = end - start
+    if window_end is None and rule.count is None and rule.until is None:
+        window_end = unbounded_until
+    if window_end is None and rule.count is None and rule.until is None:
+        raise ValueError("Expanding an endless series needs a window end")
+    
+    def overlaps(occurrence_start, occurrence_end):
+        return (
+            (window_end is None or occurrence_start < window_end)
+            and (window_start is None or occurrence_end > window_start)
+        )
+    
+    exceptions = list(exceptions)
+    replaced = {exception.original_start for exception in exceptions}
+    moved = sorted(
+        Occurrence(event_id, exception.start_time, exception.end_time, exception.original_start)
+        for exception in exceptions
+        if not exception.is_cancelled
+        and exception.start_time is not None
+        and overlaps(exception.start_time, exception.end_time)
+    )
+    
+    def generated():
+        lower = window_start - duration if window_start is not None else None
+        for moment in _original_starts(start, rule, lower):
+            if window_end is not None and moment >= window_end:
+                return
+            if moment in replaced or not overlaps(moment, moment + duration):
+                continue
+            yield Occurrence(event_id, moment, moment + duration, moment)
+    
+    return heapq.merge(generated(), moved, key=lambda occurrence: occurrence.start_time)
+
+def load_exceptions(
+    db: Session,
+    event_ids: List[int],
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+    max_duration: timedelta = timedelta(0)
+) -> Dict[int, List[EventException]]:
+    """Exceptions of the given series that can affect the window, grouped by series"""
+    grouped = defaultdict(list)
+    for offset in range(0, len(event_ids), 500):
+        query = db.query(EventException).filter(EventException.event_id.in_(event_ids[offset:offset + 500]))
+        if window_end is not None:
+            query = query.filter(or_(EventException.original_start < window_end, EventException.start_time < window_end))
+        if window_start is not None:
+            query = query.filter(or_(
+                EventException.original_start > window_start - max_duration,
+                EventException.end_time > window_start
+            ))
+        for exception in query:
+            grouped[exception.event_id].append(exception)
+    return grouped
+
+def expand_series(
+    series: List,
+    exceptions: Dict[int, List],
+    window_start: Optional[datetime],
+    window_end: Optional[datetime],
+    unbounded_until: Optional[datetime] = None
+) -> List[Occurrence]:
+    """Occurrences of several series (rows with id, start/end time and recurrence_rule) in start order"""
+    return list(heapq.merge(
+        *(
+            iter_occurrences(
+                row.id, row.start_time, row.end_time, row.recurrence_rule,
+                window_start, window_end, exceptions.get(row.id, ()), unbounded_until
+            )
+            for row in series
+        ),
+        key=lambda occurrence: occurrence.start_time
+    ))
+
+def load_occurrences(
+    db: Session,
+    owner_id: int,
+    window_start: Optional[datetime],
+    window_end: Optional[datetime],
+    exclude_event_id: Optional[int] = None,
+    unbounded_until: Optional[datetime] = None
+) -> List[Occurrence]:
+    """
+    Occurrences of the owner's recurring events overlapping the window.
+    
+    Only series whose span reaches the window are loaded, and only their
+    occurrences inside it are generated.
+    """
+    query = db.query(Event.id, Event.start_time, Event.end_time, Event.recurrence_rule).filter(
+        Event.owner_id == owner_id,
+        Event.recurrence_rule.isnot(None)
+    )
+    if window_end is not None:
+        query = query.filter(Event.start_time < window_end)
+    if window_start is not None:
+        query = query.filter(or_(Event.recurrence_end.is_(None), Event.recurrence_end > window_start))
+    if exclude_event_id is not None:
+        query = query.filter(Event.id != exclude_event_id)
+    
+    series = query.all()
+    if not series:
+        return []
+    
+    max_duration = max(row.end_time - row.start_time for row in series)
+    exceptions = load_exceptions(db, [row.id for row in series], window_start, window_end, max_duration)
+    return expand_series(series, exceptions, window_start, window_end, unbounded_until)
+
+async def load_exceptions_async(db: AsyncSession, event_ids: List[int], *args) -> Dict[int, List[EventException]]:
+    """Async variant of load_exceptions"""
+    return await db.run_sync(lambda session: load_exceptions(session, event_ids, *args))
+
+@sa_event.listens_for(Event, "before_insert")
+@sa_event.listens_for(Event, "before_update")
+def _set_recurrence_end(mapper, connection, target):
+    """Keep the stored span of a series in step with its rule, for window queries"""
+    target.recurrence_end = (
+        series_end(target.start_time, target.end_time, target.recurrence_rule)
+        if target.recurrence_rule else None
+    )
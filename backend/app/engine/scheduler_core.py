@@ -2,37 +2,195 @@
 Core scheduling and constraint engine
 """
 
+from sqlalchemy import DateTime, and_, case, func, insert, update, or_, tuple_, type_coerce
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.database import Event, Conflict
+from app.engine.interval_index import interval_indexes, IntervalEntry
+from app.engine.slot_finder import find_free_slots
+from app.utils.metrics import timed
+from app.engine.recurrence import expand_series, iter_occurrences, load_exceptions, load_occurrences, parse_rule
 from datetime import datetime, timedelta
-from typing import List
+from typing import Dict, Iterator, List, Optional
+import heapq
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Serve overlap queries from the in-process interval index; when disabled
+# they are pushed down to the database instead
+USE_INTERVAL_INDEX = os.getenv("INTERVAL_INDEX_ENABLED", "true").lower() == "true"
+
+# Recurring events without COUNT or UNTIL are checked for conflicts this far ahead
+RECURRENCE_CONFLICT_HORIZON_DAYS = int(os.getenv("RECURRENCE_CONFLICT_HORIZON_DAYS", "365"))
+
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2}
+
+# Events read per participant at a time by the multi-owner slot search
+BUSY_STREAM_PAGE_SIZE = int(os.getenv("BUSY_STREAM_PAGE_SIZE", "256"))
+
+def query_overlapping_events(
+    db: Session,
+    owner_id: int,
+    start: datetime,
+    end: datetime,
+    exclude_event_id: Optional[int] = None
+) -> List[IntervalEntry]:
+    """
+    Fetch only the owner's non-recurring events overlapping [start, end) from the database
+    """
+    query = db.query(Event.id, Event.start_time, Event.end_time).filter(
+        Event.owner_id == owner_id,
+        Event.recurrence_rule.is_(None),
+        Event.start_time < end,
+        Event.end_time > start
+    )
+    if exclude_event_id is not None:
+        query = query.filter(Event.id != exclude_event_id)
+    
+    return [IntervalEntry(*row) for row in query.order_by(Event.start_time)]
+
+def recurrence_horizon(start: Optional[datetime] = None) -> datetime:
+    """Cut-off for expanding endless recurring events: the horizon past now, or past start if later"""
+    now = datetime.utcnow()
+    return max(now, start or now) + timedelta(days=RECURRENCE_CONFLICT_HORIZON_DAYS)
+
+def calendar_horizon(owner_id: int, db: Session) -> datetime:
+    """
+    How far the owner's endless series are expanded when their calendar is checked for conflicts.
+    
+    The horizon runs from the start of their latest endless series, and never
+    stops short of the end of their other events, so an event far in the
+    future still meets the occurrences it overlaps.
+    """
+    endless = and_(Event.recurrence_rule.isnot(None), Event.recurrence_end.is_(None))
+    latest_end, latest_endless_start = db.query(
+        # Typed by hand: SQLite hands CASE results back as strings
+        type_coerce(func.max(case((endless, None), else_=func.coalesce(Event.recurrence_end, Event.end_time))), DateTime),
+        type_coerce(func.max(case((endless, Event.start_time))), DateTime)
+    ).filter(Event.owner_id == owner_id).one()
+    horizon = recurrence_horizon(latest_endless_start)
+    return max(horizon, latest_end) if latest_end is not None else horizon
+
+def series_occurrences(
+    owner_id: int,
+    db: Session,
+    start: datetime,
+    end: datetime,
+    exclude_event_id: Optional[int] = None,
+    revision: Optional[int] = None
+) -> List:
+    """Occurrences of the owner's recurring events overlapping [start, end), by start time"""
+    if not USE_INTERVAL_INDEX:
+        return load_occurrences(db, owner_id, start, end, exclude_event_id=exclude_event_id)
+    
+    series = interval_indexes.series(owner_id, db, revision)
+    if not series.rows:
+        return []
+    return expand_series(
+        [
+            row for row in series.rows
+            if row.start_time < end
+            and (row.recurrence_end is None or row.recurrence_end > start)
+            and row.id != exclude_event_id
+        ],
+        series.exceptions, start, end
+    )
+
+def get_busy_intervals(
+    owner_id: int,
+    db: Session,
+    start: datetime,
+    end: datetime,
+    exclude_event_id: Optional[int] = None
+) -> List:
+    """
+    The owner's events and recurring occurrences overlapping [start, end), by start time.
+    
+    Occurrences of one series share the series id.
+    """
+    if USE_INTERVAL_INDEX:
+        # One revision lookup covers both caches, so a warm check runs at most that query
+        revision = interval_indexes.revision(owner_id, db)
+        singles = interval_indexes.get(owner_id, db, revision).overlapping(start, end)
+        if exclude_event_id is not None:
+            singles = [entry for entry in singles if entry.id != exclude_event_id]
+        occurrences = series_occurrences(owner_id, db, start, end, exclude_event_id, revision)
+    else:
+        singles = query_overlapping_events(db, owner_id, start, end, exclude_event_id)
+        occurrences = series_occurrences(owner_id, db, start, end, exclude_event_id)
+    if not occurrences:
+        return singles
+    return list(heapq.merge(singles, occurrences, key=lambda interval: interval.start_time))
+
+def _cross_overlaps(own: List, others: List) -> List[tuple]:
+    """Overlapping (own, other) pairs between two start-sorted interval lists"""
+    pairs = []
+    active = ([], [])  # min-heaps of (end_time, position, interval) per side
+    
+    tagged = heapq.merge(
+        ((interval.start_time, 0, interval) for interval in own),
+        ((interval.start_time, 1, interval) for interval in others),
+        key=lambda item: (item[0], item[1])
+    )
+    for position, (start_time, side, interval) in enumerate(tagged):
+        for heap in active:
+            while heap and heap[0][0] <= start_time:
+                heapq.heappop(heap)
+        for _, _, open_interval in active[1 - side]:
+            pairs.append((interval, open_interval) if side == 0 else (open_interval, interval))
+        heapq.heappush(active[side], (interval.end_time, position, interval))
+    
+    return pairs
+
+@timed()
 def check_conflicts(new_event: Event, db: Session) -> List[Conflict]:
     """
-    Check for scheduling conflicts with existing events
+    Check for scheduling conflicts with existing events.
+    
+    Recurring events are compared occurrence by occurrence, expanded only over
+    the time span in question; an event pair is reported once, with the highest
+    severity of its overlapping occurrences.
     """
-    conflicts = []
+    if new_event.recurrence_rule:
+        exceptions = load_exceptions(db, [new_event.id]).get(new_event.id, ()) if new_event.id else ()
+        # Only endless series need the horizon; the others end on their own
+        rule = parse_rule(new_event.recurrence_rule)
+        horizon = None if rule.count is not None or rule.until is not None else max(
+            calendar_horizon(new_event.owner_id, db), recurrence_horizon(new_event.start_time)
+        )
+        own = list(iter_occurrences(
+            new_event.id, new_event.start_time, new_event.end_time, new_event.recurrence_rule,
+            None, None, exceptions, unbounded_until=horizon
+        ))
+        if not own:
+            return []
+        span_end = max(occurrence.end_time for occurrence in own)
+    else:
+        own = [new_event]
+        span_end = new_event.end_time
     
-    # Get all events for the same user
-    existing_events = db.query(Event).filter(
-        Event.owner_id == new_event.owner_id,
-        Event.id != new_event.id
-    ).all()
+    # Only the owner's events and occurrences that overlap the new event's time span
+    others = get_busy_intervals(
+        new_event.owner_id, db, own[0].start_time, span_end, exclude_event_id=new_event.id
+    )
     
-    for existing_event in existing_events:
-        if has_time_overlap(new_event, existing_event):
-            conflict = Conflict(
-                event_id=new_event.id,
-                conflict_with_event_id=existing_event.id,
-                conflict_type="time_overlap",
-                severity=calculate_conflict_severity(new_event, existing_event)
-            )
-            conflicts.append(conflict)
+    worst = {}
+    for occurrence, existing_event in _cross_overlaps(own, others):
+        severity = calculate_conflict_severity(occurrence, existing_event)
+        if SEVERITY_RANK[severity] >= SEVERITY_RANK[worst.get(existing_event.id, "low")]:
+            worst[existing_event.id] = severity
     
-    return conflicts
+    return [
+        Conflict(
+            event_id=new_event.id,
+            conflict_with_event_id=other_id,
+            conflict_type="time_overlap",
+            severity=severity
+        )
+        for other_id, severity in worst.items()
+    ]
 
 def has_time_overlap(event1: Event, event2: Event) -> bool:
     """
@@ -53,6 +211,178 @@ def calculate_conflict_severity(event1: Event, event2: Event) -> str:
     else:
         return "high"
 
+def find_overlapping_pairs(intervals: List) -> List[tuple]:
+    """
+    Find every overlapping pair of intervals with a sort-and-sweep in O(n log n + k)
+    """
+    pairs = []
+    active = []  # min-heap of (end_time, position, interval) still open at the sweep line
+    
+    ordered = sorted(intervals, key=lambda interval: (interval.start_time, interval.id))
+    for position, interval in enumerate(ordered):
+        while active and active[0][0] <= interval.start_time:
+            heapq.heappop(active)
+        
+        for _, _, open_interval in active:
+            pairs.append((open_interval, interval))
+        
+        heapq.heappush(active, (interval.end_time, position, interval))
+    
+    return pairs
+
+def get_owner_intervals(owner_id: int, db: Session) -> List[IntervalEntry]:
+    """
+    Get all of the owner's non-recurring events as intervals sorted by start time
+    """
+    if USE_INTERVAL_INDEX:
+        return list(interval_indexes.get(owner_id, db))
+    
+    rows = db.query(Event.id, Event.start_time, Event.end_time).filter(
+        Event.owner_id == owner_id,
+        Event.recurrence_rule.is_(None)
+    ).order_by(Event.start_time, Event.id).all()
+    return [IntervalEntry(*row) for row in rows]
+
+def _write_conflict_rows(db: Session, existing: List, found: Dict) -> tuple:
+    """
+    Bulk-apply the difference between stored and detected time_overlap conflicts.
+    
+    existing holds (id, event_id, conflict_with_event_id, severity) rows and
+    found maps (event_id, conflict_with_event_id) to the detected severity.
+    Returns (rows added, rows updated, removed (event_id, conflict_with_event_id) pairs).
+    """
+    found = dict(found)
+    stale_ids = []
+    removed = []
+    severity_updates = []
+    for conflict_id, event_id, other_id, severity in existing:
+        new_severity = found.pop((event_id, other_id), None)
+        if new_severity is None:
+            stale_ids.append(conflict_id)
+            removed.append((event_id, other_id))
+        elif new_severity != severity:
+            severity_updates.append({"id": conflict_id, "severity": new_severity})
+    
+    new_rows = [
+        {
+            "event_id": event_id,
+            "conflict_with_event_id": other_id,
+            "conflict_type": "time_overlap",
+            "severity": severity
+        }
+        for (event_id, other_id), severity in found.items()
+    ]
+    
+    for offset in range(0, len(stale_ids), 500):
+        db.query(Conflict).filter(
+            Conflict.id.in_(stale_ids[offset:offset + 500])
+        ).delete(synchronize_session=False)
+    if severity_updates:
+        db.execute(update(Conflict), severity_updates)
+    if new_rows:
+        db.execute(insert(Conflict), new_rows)
+    
+    return len(new_rows), len(severity_updates), removed
+
+def sync_event_conflicts(event: Event, db: Session, removed: bool = False) -> List[Conflict]:
+    """
+    Incrementally update the stored conflicts of one event after its time range changed.
+    
+    Only rows involving this event are touched. The event is flagged tentative
+    while it has conflicts, and counterparts left without any conflict have
+    is_tentative cleared. Pass removed=True before deleting the event. The
+    event must be flushed; the caller commits.
+    """
+    conflicts = [] if removed else check_conflicts(event, db)
+    
+    found = {}
+    for conflict in conflicts:
+        found[(event.id, conflict.conflict_with_event_id)] = conflict.severity
+        found[(conflict.conflict_with_event_id, event.id)] = conflict.severity
+    
+    existing = db.query(
+        Conflict.id, Conflict.event_id, Conflict.conflict_with_event_id, Conflict.severity
+    ).filter(
+        Conflict.conflict_type == "time_overlap",
+        or_(Conflict.event_id == event.id, Conflict.conflict_with_event_id == event.id)
+    ).all()
+    
+    _, _, removed_pairs = _write_conflict_rows(db, existing, found)
+    
+    if not removed:
+        event.is_tentative = bool(conflicts)
+    
+    # Counterparts that just lost their last conflict are no longer tentative
+    former = {event_id for event_id, _ in removed_pairs if event_id != event.id}
+    if former:
+        still_conflicting = db.query(Conflict.event_id).filter(
+            Conflict.event_id.in_(former)
+        ).distinct()
+        cleared = former - {row[0] for row in still_conflicting}
+        if cleared:
+            db.query(Event).filter(Event.id.in_(cleared)).update(
+                {Event.is_tentative: False}, synchronize_session=False
+            )
+    
+    return conflicts
+
+@timed()
+def scan_calendar_conflicts(owner_id: int, db: Session) -> Dict:
+    """
+    Detect every time overlap in the owner's calendar and bulk-sync the conflicts table.
+    
+    Each overlapping pair is stored in both directions so per-event conflict
+    lookups see it. Existing rows for pairs that still overlap keep their id and
+    resolution; the caller commits the changes as a single transaction.
+    Recurring events take part with their occurrences, endless ones up to
+    calendar_horizon.
+    """
+    intervals = get_owner_intervals(owner_id, db)
+    occurrences = load_occurrences(db, owner_id, None, None, unbounded_until=calendar_horizon(owner_id, db))
+    if occurrences:
+        intervals = list(heapq.merge(intervals, occurrences, key=lambda interval: interval.start_time))
+    
+    # Occurrence pairs of the same two events count once, at their highest severity
+    worst = {}
+    for first, second in find_overlapping_pairs(intervals):
+        if first.id == second.id:
+            continue
+        pair = (min(first.id, second.id), max(first.id, second.id))
+        severity = calculate_conflict_severity(first, second)
+        if SEVERITY_RANK[severity] >= SEVERITY_RANK[worst.get(pair, "low")]:
+            worst[pair] = severity
+    
+    severity_counts = {"low": 0, "medium": 0, "high": 0}
+    found = {}
+    for (first_id, second_id), severity in worst.items():
+        severity_counts[severity] += 1
+        found[(first_id, second_id)] = severity
+        found[(second_id, first_id)] = severity
+    events_scanned = len({interval.id for interval in intervals})
+    
+    owner_event_ids = db.query(Event.id).filter(Event.owner_id == owner_id)
+    existing = db.query(
+        Conflict.id, Conflict.event_id, Conflict.conflict_with_event_id, Conflict.severity
+    ).filter(
+        Conflict.conflict_type == "time_overlap",
+        Conflict.event_id.in_(owner_event_ids.scalar_subquery())
+    ).all()
+    
+    added, updated, removed = _write_conflict_rows(db, existing, found)
+    
+    logger.info(
+        f"Conflict scan for owner {owner_id}: {events_scanned} events, {len(worst)} overlapping pairs"
+    )
+    
+    return {
+        "events_scanned": events_scanned,
+        "overlapping_pairs": len(worst),
+        "severity_counts": severity_counts,
+        "conflicts_added": added,
+        "conflicts_updated": updated,
+        "conflicts_removed": len(removed)
+    }
+
 def resolve_conflict(event: Event, suggested_start: datetime, suggested_end: datetime) -> bool:
     """
     Attempt to resolve a conflict by rescheduling
@@ -66,6 +396,158 @@ def resolve_conflict(event: Event, suggested_start: datetime, suggested_end: dat
     
     return True
 
+@timed()
+def find_free_time_slots(
+    owner_id: int,
+    db: Session,
+    duration_minutes: int = 60,
+    horizon_days: int = 30,
+    work_start_hour: int = 9,
+    work_end_hour: int = 18,
+    granularity_minutes: int = 15,
+    buffer_minutes: int = 0,
+    limit: int = 5,
+    preferred_start: Optional[datetime] = None,
+    window_start: Optional[datetime] = None
+) -> List[tuple]:
+    """
+    Find ranked free (start, end) slots in the owner's calendar
+    """
+    window_start = window_start or datetime.utcnow()
+    window_end = window_start + timedelta(days=horizon_days)
+    buffer = timedelta(minutes=buffer_minutes)
+    
+    # Busy intervals, recurring occurrences included, that can touch the horizon, sorted by start time
+    busy = get_busy_intervals(owner_id, db, window_start - buffer, window_end + buffer)
+    
+    return find_free_slots(
+        busy,
+        window_start,
+        window_end,
+        duration_minutes=duration_minutes,
+        work_start_hour=work_start_hour,
+        work_end_hour=work_end_hour,
+        granularity_minutes=granularity_minutes,
+        buffer_minutes=buffer_minutes,
+        limit=limit,
+        preferred_start=preferred_start
+    )
+
+def _stream_single_events(
+    owner_id: int,
+    db: Session,
+    start: datetime,
+    end: datetime,
+    page_size: int
+) -> Iterator[IntervalEntry]:
+    """The owner's non-recurring events overlapping [start, end) by start time, read in keyset pages"""
+    query = db.query(Event.id, Event.start_time, Event.end_time).filter(
+        Event.owner_id == owner_id,
+        Event.recurrence_rule.is_(None),
+        Event.start_time < end,
+        Event.end_time > start
+    )
+    position = None
+    while True:
+        page = query
+        if position is not None:
+            page = page.filter(tuple_(Event.start_time, Event.id) > tuple_(*position))
+        rows = page.order_by(Event.start_time, Event.id).limit(page_size).all()
+        for row in rows:
+            yield IntervalEntry(*row)
+        if len(rows) < page_size:
+            return
+        position = (rows[-1].start_time, rows[-1].id)
+
+def busy_timelines(
+    owner_ids: List[int],
+    db: Session,
+    start: datetime,
+    end: datetime,
+    page_size: int = BUSY_STREAM_PAGE_SIZE
+) -> List[Iterator]:
+    """
+    One lazy timeline per owner of their events and recurring occurrences
+    overlapping [start, end), each sorted by start time.
+    
+    The owners' recurring series and exceptions are loaded together up front.
+    Single events are read a page at a time as a timeline is consumed, so
+    memory grows with the number of owners rather than with their events.
+    """
+    series = db.query(
+        Event.id, Event.owner_id, Event.start_time, Event.end_time, Event.recurrence_rule
+    ).filter(
+        Event.owner_id.in_(owner_ids),
+        Event.recurrence_rule.isnot(None),
+        Event.start_time < end,
+        or_(Event.recurrence_end.is_(None), Event.recurrence_end > start)
+    ).all()
+    exceptions = {}
+    if series:
+        max_duration = max(row.end_time - row.start_time for row in series)
+        exceptions = load_exceptions(db, [row.id for row in series], start, end, max_duration)
+    
+    series_by_owner: Dict[int, List] = {}
+    for row in series:
+        series_by_owner.setdefault(row.owner_id, []).append(row)
+    
+    return [
+        heapq.merge(
+            _stream_single_events(owner_id, db, start, end, page_size),
+            *(
+                iter_occurrences(
+                    row.id, row.start_time, row.end_time, row.recurrence_rule,
+                    start, end, exceptions.get(row.id, ()), end
+                )
+                for row in series_by_owner.get(owner_id, ())
+            ),
+            key=lambda interval: interval.start_time
+        )
+        for owner_id in owner_ids
+    ]
+
+@timed()
+def find_common_free_slots(
+    owner_ids: List[int],
+    db: Session,
+    duration_minutes: int = 60,
+    horizon_days: int = 30,
+    work_start_hour: int = 9,
+    work_end_hour: int = 18,
+    granularity_minutes: int = 15,
+    buffer_minutes: int = 0,
+    limit: int = 5,
+    preferred_start: Optional[datetime] = None,
+    window_start: Optional[datetime] = None
+) -> List[tuple]:
+    """
+    Find free (start, end) slots that suit every owner at once.
+    
+    The owners' busy timelines are k-way merged with a heap into a single
+    timeline by start time, which the slot sweep consumes only as far as the
+    last slot it returns.
+    """
+    window_start = window_start or datetime.utcnow()
+    window_end = window_start + timedelta(days=horizon_days)
+    buffer = timedelta(minutes=buffer_minutes)
+    
+    timelines = busy_timelines(list(dict.fromkeys(owner_ids)), db, window_start - buffer, window_end + buffer)
+    busy = heapq.merge(*timelines, key=lambda interval: interval.start_time)
+    
+    return find_free_slots(
+        busy,
+        window_start,
+        window_end,
+        duration_minutes=duration_minutes,
+        work_start_hour=work_start_hour,
+        work_end_hour=work_end_hour,
+        granularity_minutes=granularity_minutes,
+        buffer_minutes=buffer_minutes,
+        limit=limit,
+        preferred_start=preferred_start
+    )
+
+@timed()
 def find_optimal_time_slot(
     event: Event,
     db: Session,
@@ -74,29 +556,46 @@ def find_optimal_time_slot(
     """
     Find optimal time slot for an event with no conflicts
     """
-    existing_events = db.query(Event).filter(
-        Event.owner_id == event.owner_id
-    ).order_by(Event.start_time).all()
-    
-    # Check next 30 days
-    current_time = datetime.utcnow()
+    # Earliest free slot in working hours (9 AM to 6 PM) over the next 30 days
+    slots = find_free_time_slots(
+        event.owner_id,
+        db,
+        duration_minutes=preferred_duration_minutes,
+        limit=1
+    )
     
-    for day_offset in range(30):
-        check_date = current_time + timedelta(days=day_offset)
-        
-        # Try different times of day
-        for hour in range(9, 18):  # 9 AM to 6 PM
-            start_time = check_date.replace(hour=hour, minute=0, second=0)
-            end_time = start_time + timedelta(minutes=preferred_duration_minutes)
-            
-            # Check if this slot is free
-            has_conflict = False
-            for existing_event in existing_events:
-                if not (end_time <= existing_event.start_time or start_time >= existing_event.end_time):
-                    has_conflict = True
-                    break
-            
-            if not has_conflict:
-                return (start_time, end_time)
-    
-    return None
+    return slots[0] if slots else None
+
+# Async variants for routes holding an AsyncSession. The engine stays synchronous
+# and runs on the session's own connection through run_sync, so database I/O is
+# awaited instead of blocking the event loop.
+
+async def check_conflicts_async(new_event: Event, db: AsyncSession) -> List[Conflict]:
+    """Async variant of check_conflicts"""
+    return await db.run_sync(lambda session: check_conflicts(new_event, session))
+
+async def sync_event_conflicts_async(event: Event, db: AsyncSession, removed: bool = False) -> List[Conflict]:
+    """Async variant of sync_event_conflicts"""
+    return await db.run_sync(lambda session: sync_event_conflicts(event, session, removed))
+
+async def scan_calendar_conflicts_async(owner_id: int, db: AsyncSession) -> Dict:
+    """Async variant of scan_calendar_conflicts"""
+    return await db.run_sync(lambda session: scan_calendar_conflicts(owner_id, session))
+
+async def find_free_time_slots_async(owner_id: int, db: AsyncSession, **options) -> List[tuple]:
+    """Async variant of find_free_time_slots; options are passed through"""
+    return await db.run_sync(lambda session: find_free_time_slots(owner_id, session, **options))
+
+async def find_common_free_slots_async(owner_ids: List[int], db: AsyncSession, **options) -> List[tuple]:
+    """Async variant of find_common_free_slots; options are passed through"""
+    return await db.run_sync(lambda session: find_common_free_slots(owner_ids, session, **options))
+
+async def find_optimal_time_slot_async(
+    event: Event,
+    db: AsyncSession,
+    preferred_duration_minutes: int = 60
+) -> tuple:
+    """Async variant of find_optimal_time_slot"""
+    return await db.run_sync(
+        lambda session: find_optimal_time_slot(event, session, preferred_duration_minutes)
+    )
@@ -0,0 +1,129 @@
+"""
+Session and room solver over bitset availability
+"""
+
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Entity types sessions can be placed into
+SPACE_ENTITY_TYPES = {"room", "venue", "hall", "stage", "space", "track"}
+
+SessionSpec = namedtuple("SessionSpec", ["id", "duration_minutes", "priority", "attendees"])
+RoomSpec = namedtuple("RoomSpec", ["id", "capacity"])
+Placement = namedtuple("Placement", ["session_id", "room_id", "start_time", "end_time"])
+
+class SlotGrid:
+    """
+    Fixed time slots covering [start, end).
+    
+    Bit i of an availability bitset stands for slot i, so "free for k slots
+    from i" checks are a handful of shifts and ANDs on Python ints.
+    """
+    
+    def __init__(self, start: datetime, end: datetime, slot_minutes: int = 15):
+        self.start = start
+        self.slot = timedelta(minutes=slot_minutes)
+        self.count = max(int((end - start) / self.slot), 0)
+        self.full = (1 << self.count) - 1
+    
+    def time_of(self, index: int) -> datetime:
+        return self.start + index * self.slot
+    
+    def slots_for(self, minutes: float) -> int:
+        """Number of slots needed to hold a duration, rounded up"""
+        return max(-(-timedelta(minutes=minutes) // self.slot), 1)
+    
+    def window_mask(self, work_start_hour: Optional[int], work_end_hour: Optional[int]) -> int:
+        """Bitset of the slots lying entirely inside the daily working window"""
+        if work_start_hour is None and work_end_hour is None:
+            return self.full
+        opens = timedelta(hours=work_start_hour or 0)
+        closes = timedelta(hours=work_end_hour or 24)
+        
+        mask = 0
+        for index in range(self.count):
+            begin = self.time_of(index)
+            midnight = begin.replace(hour=0, minute=0, second=0, microsecond=0)
+            if begin - midnight >= opens and begin + self.slot - midnight <= closes:
+                mask |= 1 << index
+        return mask
+
+def fit_starts(free: int, length: int) -> int:
+    """Bitset of slots where `length` consecutive free slots begin"""
+    runs = free
+    span = 1
+    # After each step bit i is set iff slots i .. i + span - 1 are all free
+    while span < length and runs:
+        step = min(span, length - span)
+        runs &= runs >> step
+        span += step
+    return runs
+
+def solve_sessions(
+    sessions: List[SessionSpec],
+    rooms: List[RoomSpec],
+    start: datetime,
+    end: datetime,
+    slot_minutes: int = 15,
+    work_start_hour: Optional[int] = None,
+    work_end_hour: Optional[int] = None
+) -> Tuple[List[Placement], Dict[int, str]]:
+    """
+    Pack sessions into rooms and time slots.
+    
+    Sessions are placed in priority order (1 first, longer and larger sessions
+    first within a priority), each at the earliest start in any room big enough
+    for its attendees, preferring the smallest such room on ties. Without rooms
+    every session shares a single implicit track. Returns the placements and a
+    reason for each session that could not be placed.
+    """
+    grid = SlotGrid(start, end, slot_minutes)
+    base = grid.window_mask(work_start_hour, work_end_hour)
+    
+    # Best fit: smallest rooms first, rooms without a capacity limit last
+    rooms = sorted(rooms or [RoomSpec(None, None)], key=lambda room: (room.capacity is None, room.capacity or 0))
+    free = [base] * len(rooms)
+    
+    placements = []
+    unscheduled = {}
+    ordered = sorted(sessions, key=lambda s: (s.priority, -s.duration_minutes, -(s.attendees or 0), s.id))
+    for session in ordered:
+        length = grid.slots_for(session.duration_minutes)
+        earliest_possible = fit_starts(base, length)
+        if not earliest_possible:
+            unscheduled[session.id] = "Session is longer than any available window"
+            continue
+        earliest_possible = (earliest_possible & -earliest_possible).bit_length() - 1
+        
+        best = None
+        fits_any_room = False
+        for position, room in enumerate(rooms):
+            if session.attendees and room.capacity is not None and room.capacity < session.attendees:
+                continue
+            fits_any_room = True
+            starts = fit_starts(free[position], length)
+            if not starts:
+                continue
+            first = (starts & -starts).bit_length() - 1
+            if best is None or first < best[0]:
+                best = (first, position)
+                if first == earliest_possible:
+                    break  # no room can do better than this
+        
+        if best is None:
+            unscheduled[session.id] = (
+                "No free slot long enough" if fits_any_room else "No room with enough capacity"
+            )
+            continue
+        
+        first, position = best
+        free[position] &= ~(((1 << length) - 1) << first)
+        placements.append(Placement(
+            session.id,
+            rooms[position].id,
+            grid.time_of(first),
+            grid.time_of(first) + timedelta(minutes=session.duration_minutes)
+        ))
+    
+    return placements, unscheduled
@@ -0,0 +1,134 @@
+"""
+In-memory what-if simulation of reschedules
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.engine.interval_index import IntervalTree, IntervalEntry, interval_indexes
+from app.engine.constraint_engine import ConstraintValidator
+from app.engine.scheduler_core import (
+    USE_INTERVAL_INDEX, get_owner_intervals, calculate_conflict_severity, series_occurrences
+)
+from app.engine.recurrence import Occurrence
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import bisect
+import heapq
+
+# Penalties used to rank candidates; lower scores are better
+SEVERITY_PENALTY = {"low": 1, "medium": 3, "high": 5}
+VIOLATION_PENALTY = 10
+
+class CalendarSnapshot:
+    """
+    One owner's calendar for evaluating hypothetical moves.
+    
+    Holds the owner's interval tree plus the occurrences of recurring events
+    inside the window the moves can reach. Moves are never written to the tree:
+    the moved event is overlaid by skipping its own entry, so the tree can be
+    the interval index's shared one. Loaded once; evaluating candidates never
+    touches the database.
+    """
+    
+    def __init__(self, tree: IntervalTree, occurrences: List[Occurrence] = ()):
+        self.tree = tree
+        # Occurrences share their series id, so they are kept out of the tree, sorted by start
+        self.occurrences = sorted(occurrences, key=lambda occurrence: occurrence.start_time)
+        self._occurrence_starts = [occurrence.start_time for occurrence in self.occurrences]
+        self._longest_occurrence = max(
+            (occurrence.end_time - occurrence.start_time for occurrence in self.occurrences),
+            default=timedelta(0)
+        )
+    
+    @classmethod
+    def load(cls, owner_id: int, db: Session, window_start: datetime, window_end: datetime) -> "CalendarSnapshot":
+        """Snapshot of the owner's calendar with recurring occurrences expanded inside [window_start, window_end)"""
+        if not USE_INTERVAL_INDEX:
+            return cls(
+                IntervalTree(get_owner_intervals(owner_id, db)),
+                series_occurrences(owner_id, db, window_start, window_end)
+            )
+        
+        # The index's cached tree and series, not a rebuild per request
+        revision = interval_indexes.revision(owner_id, db)
+        return cls(
+            interval_indexes.get(owner_id, db, revision),
+            series_occurrences(owner_id, db, window_start, window_end, revision=revision)
+        )
+    
+    @classmethod
+    async def load_async(cls, owner_id: int, db: AsyncSession, *args) -> "CalendarSnapshot":
+        return await db.run_sync(lambda session: cls.load(owner_id, session, *args))
+    
+    def _overlapping(self, start: datetime, end: datetime) -> List:
+        """Single events and occurrences overlapping [start, end)"""
+        low = bisect.bisect_left(self._occurrence_starts, start - self._longest_occurrence)
+        high = bisect.bisect_left(self._occurrence_starts, end)
+        occurrences = [occurrence for occurrence in self.occurrences[low:high] if occurrence.end_time > start]
+        return list(heapq.merge(
+            self.tree.overlapping(start, end), occurrences, key=lambda interval: interval.start_time
+        ))
+    
+    def conflicts_for(self, event_id: int, start: datetime, end: datetime) -> List[Dict]:
+        """Conflicts event_id would have if it occupied [start, end)"""
+        moved = IntervalEntry(event_id, start, end)
+        return [
+            {
+                "event_id": other.id,
+                "recurrence_id": getattr(other, "recurrence_id", None),
+                "start_time": other.start_time,
+                "end_time": other.end_time,
+                "severity": calculate_conflict_severity(moved, other)
+            }
+            for other in self._overlapping(start, end)
+            if other.id != event_id
+        ]
+    
+    def evaluate(
+        self,
+        event_id: int,
+        candidates: List[Tuple[datetime, datetime]],
+        validator: Optional[ConstraintValidator] = None
+    ) -> List[Dict]:
+        """
+        Score candidate (start, end) times for an event, best first.
+        
+        Each result lists the conflicts the move would create, the current
+        conflicts it would resolve and any constraint violations. event_id
+        must be a single event; recurring events are moved an occurrence at a
+        time through exceptions.
+        """
+        current = self.tree.get(event_id)
+        current_conflicts = {
+            (conflict["event_id"], conflict["recurrence_id"])
+            for conflict in self.conflicts_for(event_id, current.start_time, current.end_time)
+        }
+        
+        moves = [IntervalEntry(event_id, start, end) for start, end in candidates]
+        violations = validator.validate_many(moves) if validator is not None else [[] for _ in moves]
+        
+        results = []
+        for position, (move, move_violations) in enumerate(zip(moves, violations)):
+            conflicts = self.conflicts_for(event_id, move.start_time, move.end_time)
+            conflicting_ids = {(conflict["event_id"], conflict["recurrence_id"]) for conflict in conflicts}
+            score = (
+                sum(SEVERITY_PENALTY[conflict["severity"]] for conflict in conflicts)
+                + VIOLATION_PENALTY * len(move_violations)
+            )
+            results.append({
+                "candidate": position,
+                "start_time": move.start_time,
+                "end_time": move.end_time,
+                "score": score,
+                "conflicts": conflicts,
+                "new_conflicts": len(conflicting_ids - current_conflicts),
+                "resolved_conflicts": len(current_conflicts - conflicting_ids),
+                "violations": move_violations,
+                "displacement_minutes": round(
+                    abs((move.start_time - current.start_time).total_seconds()) / 60, 2
+                )
+            })
+        
+        # Ties go to the smaller move
+        results.sort(key=lambda result: (result["score"], result["displacement_minutes"], result["candidate"]))
+        return results
@@ -0,0 +1,119 @@
+"""
+Sweep-line free slot finder
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Optional, Tuple
+import heapq
+
+Slot = Tuple[datetime, datetime]
+
+def iter_merged_busy(busy: Iterable, buffer: timedelta = timedelta(0)) -> Iterator[Slot]:
+    """
+    Lazily merge busy intervals (sorted by start_time) into disjoint (start, end) pairs,
+    padding each one with the buffer on both sides
+    """
+    current = None
+    for interval in busy:
+        start = interval.start_time - buffer
+        end = interval.end_time + buffer
+        if current is not None and start <= current[1]:
+            if end > current[1]:
+                current[1] = end
+            continue
+        if current is not None:
+            yield current[0], current[1]
+        current = [start, end]
+    if current is not None:
+        yield current[0], current[1]
+
+def merge_busy_intervals(busy: Iterable, buffer: timedelta = timedelta(0)) -> List[Slot]:
+    """Merged busy intervals as a list; see iter_merged_busy"""
+    return list(iter_merged_busy(busy, buffer))
+
+def _align_up(moment: datetime, granularity: timedelta) -> datetime:
+    """Round a datetime up to the next multiple of granularity since midnight"""
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    steps = -((midnight - moment) // granularity)
+    return midnight + steps * granularity
+
+def find_free_slots(
+    busy: Iterable,
+    window_start: datetime,
+    window_end: datetime,
+    duration_minutes: int = 60,
+    work_start_hour: int = 9,
+    work_end_hour: int = 18,
+    granularity_minutes: int = 15,
+    buffer_minutes: int = 0,
+    limit: int = 5,
+    preferred_start: Optional[datetime] = None
+) -> List[Slot]:
+    """
+    Find free slots of the given duration inside working hours.
+    
+    Busy intervals are merged as they are read and the gaps between them are
+    swept in a single pass, so busy can be a lazy stream that is only consumed
+    up to the last slot needed. Candidates start on multiples of
+    granularity_minutes, keep buffer_minutes clear of every busy interval and
+    end by work_end_hour.
+    Returns the earliest `limit` slots, or the `limit` slots closest to
+    preferred_start when one is given.
+    """
+    duration = timedelta(minutes=duration_minutes)
+    granularity = timedelta(minutes=granularity_minutes)
+    if duration <= timedelta(0) or granularity <= timedelta(0) or limit <= 0:
+        return []
+    
+    merged = iter_merged_busy(busy, timedelta(minutes=buffer_minutes))
+    head = next(merged, None)  # earliest merged busy interval not yet passed
+    ranked = []  # bounded heap of (-distance, -start timestamp, slot), worst candidate first
+    slots: List[Slot] = []
+    
+    day = window_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < window_end:
+        day_open = max(day + timedelta(hours=work_start_hour), window_start)
+        day_close = min(day + timedelta(hours=work_end_hour), window_end)
+        cursor = _align_up(day_open, granularity)
+        
+        while cursor + duration <= day_close:
+            # Skip busy intervals that finished before the cursor
+            while head is not None and head[1] <= cursor:
+                head = next(merged, None)
+            
+            if head is not None and head[0] <= cursor:
+                # Cursor sits inside a busy interval; jump past it
+                cursor = _align_up(head[1], granularity)
+                continue
+            
+            gap_end = day_close
+            if head is not None and head[0] < gap_end:
+                gap_end = head[0]
+            
+            while cursor + duration <= gap_end:
+                slot = (cursor, cursor + duration)
+                if preferred_start is None:
+                    slots.append(slot)
+                    if len(slots) >= limit:
+                        return slots
+                else:
+                    distance = abs((cursor - preferred_start).total_seconds())
+                    if len(ranked) == limit and cursor > preferred_start and distance >= -ranked[0][0]:
+                        # Every later slot is even further from the preference
+                        return [slot for _, _, slot in sorted(ranked, reverse=True)]
+                    item = (-distance, -cursor.timestamp(), slot)
+                    if len(ranked) < limit:
+                        heapq.heappush(ranked, item)
+                    elif item > ranked[0]:
+                        heapq.heapreplace(ranked, item)
+                cursor += granularity
+            
+            if gap_end >= day_close:
+                break
+            cursor = _align_up(gap_end, granularity)
+        
+        day += timedelta(days=1)
+    
+    if preferred_start is None:
+        return slots
+    return [slot for _, _, slot in sorted(ranked, reverse=True)]
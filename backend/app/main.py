@@ -5,15 +5,31 @@ Intelligent event scheduling and conflict resolution system
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.datastructures import MutableHeaders
+import asyncio
 import logging
-from app.models.database import init_db, get_db
+import os
+import time
+from app.models.database import init_db, get_db, async_engine, pool_status
 from app.routes import auth, events
+from app.utils.query_counter import start_counting
+from app.utils import metrics
+from app.utils.auth import principal_cache, password_pool
+from app.engine.interval_index import interval_indexes
+from app.engine.freebusy import freebusy_cache
+from app.engine import archiver
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Debug mode enforces per-route query budgets
+DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+
+# Per-route latency, in-flight and query metrics, served at /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
 # Initialize FastAPI app
 app = FastAPI(
     title="ChronoAI API",
@@ -30,12 +46,123 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Both middlewares are plain ASGI rather than BaseHTTPMiddleware: they never
+# touch receive, so routes such as /bulk can read the request body while their
+# response is already streaming.
+
+class QueryBudgetMiddleware:
+    """Check the request's query count against the route's budget"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # The counter is attached by RequestMetricsMiddleware, which wraps this middleware
+        counter = scope["state"]["query_counter"]
+        replaced = False
+        
+        async def send_checked(message):
+            nonlocal replaced
+            if replaced:
+                return
+            if message["type"] == "http.response.start":
+                if counter.exceeded():
+                    logger.error(
+                        f"Query budget exceeded on {scope['method']} {scope['path']}: "
+                        f"{counter.count} queries, budget {counter.budget}"
+                    )
+                    replaced = True
+                    response = JSONResponse(
+                        status_code=500,
+                        content={"detail": f"Query budget exceeded: {counter.count} > {counter.budget}"},
+                        headers={"X-Query-Count": str(counter.count)}
+                    )
+                    await response(scope, receive, send)
+                    return
+                MutableHeaders(scope=message)["X-Query-Count"] = str(counter.count)
+            await send(message)
+        
+        await self.app(scope, receive, send_checked)
+
+def _route_template(scope) -> str:
+    """Path template of the matched route, so path parameters do not explode label cardinality"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class RequestMetricsMiddleware:
+    """
+    Count queries for every request and record latency and database work per route.
+    
+    A streamed response is measured up to its last chunk.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        counter = start_counting()
+        scope.setdefault("state", {})["query_counter"] = counter
+        if not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        
+        # The route is only known once routing ran, so in-flight requests are tracked by method
+        method = scope["method"]
+        in_progress = metrics.http_requests_in_progress.labels(method)
+        in_progress.inc()
+        began = time.perf_counter()
+        status_code = 500
+        
+        async def send_tracked(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_tracked)
+        finally:
+            elapsed = time.perf_counter() - began
+            in_progress.dec()
+            route = _route_template(scope)
+            metrics.http_requests.labels(method, route, str(status_code)).inc()
+            metrics.http_request_duration.labels(method, route).observe(elapsed)
+            metrics.db_queries_per_request.labels(route).observe(counter.count)
+            metrics.db_query_time_per_request.labels(route).observe(counter.elapsed)
+
+# Count queries per request and fail requests that exceed their budget
+if DEBUG:
+    app.add_middleware(QueryBudgetMiddleware)
+
+# Added last so it wraps the query budget middleware and sees the whole request
+if METRICS_ENABLED or DEBUG:
+    app.add_middleware(RequestMetricsMiddleware)
+
 # Initialize database
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup"""
     init_db()
     logger.info("Database initialized")
+    if archiver.ARCHIVE_ENABLED:
+        app.state.archiver = asyncio.create_task(archiver.run_archiver())
+        logger.info(f"Archiving events older than {archiver.ARCHIVE_AFTER_DAYS} days")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background work and close pooled connections"""
+    if getattr(app.state, "archiver", None) is not None:
+        app.state.archiver.cancel()
+    password_pool.shutdown()
+    await async_engine.dispose()
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
@@ -47,9 +174,24 @@ async def health_check():
     """Health check endpoint"""
     return JSONResponse(
         status_code=200,
-        content={"status": "healthy", "service": "ChronoAI Backend"}
+        content={
+            "status": "healthy",
+            "service": "ChronoAI Backend",
+            "auth_cache": principal_cache.stats(),
+            "password_pool": password_pool.stats(),
+            "interval_index": interval_indexes.stats(),
+            "freebusy_cache": freebusy_cache.stats(),
+            "archiver": {"enabled": archiver.ARCHIVE_ENABLED, "last_run": archiver.last_run},
+            "database_pools": pool_status()
+        }
     )
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Metrics of this worker process in the Prometheus text format"""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -2,22 +2,108 @@
 Database configuration and models
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import create_engine, event, inspect, make_url, text, Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index, JSON, UniqueConstraint
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from app.utils.db_pool import PoolMetrics, timed_pool_class
 from datetime import datetime
 import os
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./chronoai.db")
 
+# Connection pool settings, applied to both the sync and the async engine
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# SQLite connection pragmas
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+pool_metrics = {
+    "sync": PoolMetrics(max_overflow=DB_MAX_OVERFLOW),
+    "async": PoolMetrics(max_overflow=DB_MAX_OVERFLOW)
+}
+
+def _is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+def _pool_options(url: str, pool_class, metrics: PoolMetrics) -> dict:
+    """Sized, pre-pinged and timed queue pool options; in-memory SQLite keeps its single shared connection"""
+    if _is_memory_sqlite(url):
+        return {}
+    return {
+        "poolclass": timed_pool_class(pool_class, metrics),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING
+    }
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Let readers proceed alongside a writer (WAL) and make writers wait for
+    the lock instead of failing immediately with "database is locked"
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+    cursor.close()
+
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=False
+    echo=False,
+    **_pool_options(DATABASE_URL, QueuePool, pool_metrics["sync"])
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async drivers used by the request path for each database backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql"
+}
+
+def to_async_url(url: str) -> str:
+    """Swap the driver of a database URL for its async counterpart"""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    **_pool_options(ASYNC_DATABASE_URL, AsyncAdaptedQueuePool, pool_metrics["async"])
+)
+
+if make_url(DATABASE_URL).get_backend_name() == "sqlite":
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+if make_url(ASYNC_DATABASE_URL).get_backend_name() == "sqlite":
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+def pool_status() -> dict:
+    """Checkout latency and utilization of both connection pools"""
+    return {
+        "sync": pool_metrics["sync"].stats(engine.pool),
+        "async": pool_metrics["async"].stats(async_engine.pool)
+    }
+
+# Objects stay loaded after commit so routes can serialize them without lazy loads
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 # Models
@@ -49,27 +135,188 @@ class Event(Base):
     owner_id = Column(Integer, ForeignKey("users.id"))
     is_tentative = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # RRULE subset (FREQ=DAILY|WEEKLY|MONTHLY, INTERVAL, COUNT, UNTIL, BYDAY);
+    # start_time/end_time are the first occurrence
+    recurrence_rule = Column(String, nullable=True)
+    # End of the last occurrence, NULL while the series repeats forever
+    recurrence_end = Column(DateTime, nullable=True)
     
     owner = relationship("User", back_populates="events")
-    conflicts = relationship("Conflict", back_populates="event")
+    conflicts = relationship("Conflict", back_populates="event", foreign_keys="Conflict.event_id")
+    
+    __table_args__ = (
+        # Serves per-owner overlap queries (start_time < :end AND end_time > :start)
+        # and covers the id/start/end scans used to build interval indexes
+        Index("ix_events_owner_time", "owner_id", "start_time", "end_time"),
+        # Finds an owner's recurring series without scanning their single events
+        Index(
+            "ix_events_owner_series", "owner_id", "start_time",
+            sqlite_where=text("recurrence_rule IS NOT NULL"),
+            postgresql_where=text("recurrence_rule IS NOT NULL")
+        ),
+    )
 
 class Conflict(Base):
     """Conflict model for tracking scheduling conflicts"""
     __tablename__ = "conflicts"
     
     id = Column(Integer, primary_key=True, index=True)
-    event_id = Column(Integer, ForeignKey("events.id"))
-    conflict_with_event_id = Column(Integer, ForeignKey("events.id"))
+    event_id = Column(Integer, ForeignKey("events.id"), index=True)
+    conflict_with_event_id = Column(Integer, ForeignKey("events.id"), index=True)
     conflict_type = Column(String)  # time_overlap, participant_conflict, resource_conflict
     severity = Column(String)  # low, medium, high
     resolution = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    event = relationship("Event", back_populates="conflicts")
+    event = relationship("Event", back_populates="conflicts", foreign_keys=[event_id])
+
+class CalendarRevision(Base):
+    """Per-owner counter bumped by every committed change to the owner's events"""
+    __tablename__ = "calendar_revisions"
+    
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    revision = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class CalendarShare(Base):
+    """Lets grantee see the free/busy time of owner's calendar; granted by the owner"""
+    __tablename__ = "calendar_shares"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
+    grantee_id = Column(Integer, ForeignKey("users.id"), index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint("owner_id", "grantee_id", name="uq_calendar_shares_pair"),
+    )
+
+class EventException(Base):
+    """Cancelled or moved occurrence of a recurring event"""
+    __tablename__ = "event_exceptions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id"), index=True)
+    original_start = Column(DateTime)  # start the rule generated for the occurrence
+    is_cancelled = Column(Boolean, default=False)
+    start_time = Column(DateTime, nullable=True)
+    end_time = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint("event_id", "original_start", name="uq_event_exceptions_occurrence"),
+    )
+
+class Entity(Base):
+    """Resource attached to an event, such as a room or venue"""
+    __tablename__ = "entities"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id"), index=True)
+    entity_type = Column(String)  # room, venue, hall, stage, ...
+    name = Column(String)
+    capacity = Column(Integer, nullable=True)
+    meta = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class EventSession(Base):
+    """Session of an event, placed into a room and time slot by the session solver"""
+    __tablename__ = "event_sessions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id"), index=True)
+    title = Column(String)
+    duration = Column(Integer)  # minutes
+    priority = Column(Integer, default=1)  # 1 is the most important
+    attendees = Column(Integer, nullable=True)
+    meta = Column(JSON, nullable=True)
+    entity_id = Column(Integer, ForeignKey("entities.id"), nullable=True)
+    start_time = Column(DateTime, nullable=True)
+    end_time = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class ArchivedEvent(Base):
+    """Past event moved out of the events table by the archiver, keeping its original id"""
+    __tablename__ = "events_archive"
+    
+    # SQLite can hand a deleted event's id out again, so archive rows have their own key
+    archive_id = Column(Integer, primary_key=True)
+    id = Column(Integer, index=True)
+    title = Column(String)
+    description = Column(Text, nullable=True)
+    start_time = Column(DateTime)
+    end_time = Column(DateTime)
+    event_type = Column(String)
+    location = Column(String, nullable=True)
+    owner_id = Column(Integer, ForeignKey("users.id"))
+    is_tentative = Column(Boolean, default=False)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime, nullable=True)
+    recurrence_rule = Column(String, nullable=True)
+    recurrence_end = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+    
+    # No foreign key: a conflict moves with either of its events, the other may still be hot
+    conflicts = relationship(
+        "ArchivedConflict",
+        primaryjoin="ArchivedEvent.id == foreign(ArchivedConflict.event_id)",
+        viewonly=True
+    )
+    exceptions = relationship(
+        "ArchivedEventException",
+        primaryjoin="ArchivedEvent.id == foreign(ArchivedEventException.event_id)",
+        viewonly=True
+    )
+    
+    __table_args__ = (
+        Index("ix_events_archive_owner_time", "owner_id", "start_time", "id"),
+    )
+
+class ArchivedConflict(Base):
+    """Conflict moved to the archive together with an archived event"""
+    __tablename__ = "conflicts_archive"
+    
+    archive_id = Column(Integer, primary_key=True)
+    id = Column(Integer)
+    event_id = Column(Integer, index=True)
+    conflict_with_event_id = Column(Integer)
+    conflict_type = Column(String)
+    severity = Column(String)
+    resolution = Column(Text, nullable=True)
+    created_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+class ArchivedEventException(Base):
+    """Exception moved to the archive together with its finished recurring series"""
+    __tablename__ = "event_exceptions_archive"
+    
+    archive_id = Column(Integer, primary_key=True)
+    id = Column(Integer)
+    event_id = Column(Integer, index=True)
+    original_start = Column(DateTime)
+    is_cancelled = Column(Boolean, default=False)
+    start_time = Column(DateTime, nullable=True)
+    end_time = Column(DateTime, nullable=True)
+    created_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
 
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
+    
+    # create_all does not add columns to existing tables either
+    existing_columns = {column["name"] for column in inspect(engine).get_columns("events")}
+    added_columns = {"updated_at": "DATETIME", "recurrence_rule": "VARCHAR", "recurrence_end": "DATETIME"}
+    for name, column_type in added_columns.items():
+        if name not in existing_columns:
+            with engine.begin() as connection:
+                connection.execute(text(f"ALTER TABLE events ADD COLUMN {name} {column_type}"))
+    
+    # create_all skips indexes on tables that already exist
+    for table in (Event.__table__, Conflict.__table__):
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 def get_db():
     """Get database session"""
@@ -78,3 +325,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """Get async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
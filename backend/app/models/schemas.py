@@ -2,10 +2,25 @@
 Pydantic schemas for request/response validation
 """
 
-from pydantic import BaseModel, EmailStr
-from datetime import datetime
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from app.engine.recurrence import parse_rule
+from datetime import datetime, timezone
 from typing import Optional, List
 
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Store and compare all event times as naive UTC"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def normalize_rule(value: Optional[str]) -> Optional[str]:
+    """Validate a recurrence rule and store it in canonical upper case without the RRULE: prefix"""
+    if value is None or not value.strip():
+        return None
+    value = value.strip().upper().removeprefix("RRULE:")
+    parse_rule(value)
+    return value
+
 # User schemas
 class UserBase(BaseModel):
     email: EmailStr
@@ -31,6 +46,10 @@ class EventBase(BaseModel):
     end_time: datetime
     event_type: str  # conference, hackathon, tournament, workshop
     location: Optional[str] = None
+    recurrence_rule: Optional[str] = None  # e.g. FREQ=WEEKLY;BYDAY=MO,WE;COUNT=20
+    
+    _normalize_times = field_validator("start_time", "end_time")(to_naive_utc)
+    _normalize_rule = field_validator("recurrence_rule")(normalize_rule)
 
 class EventCreate(EventBase):
     pass
@@ -43,12 +62,19 @@ class EventUpdate(BaseModel):
     event_type: Optional[str] = None
     location: Optional[str] = None
     is_tentative: Optional[bool] = None
+    recurrence_rule: Optional[str] = None  # an empty string stops the event from recurring
+    
+    _normalize_times = field_validator("start_time", "end_time")(to_naive_utc)
+    _normalize_rule = field_validator("recurrence_rule")(normalize_rule)
 
 class Event(EventBase):
     id: int
     owner_id: int
     is_tentative: bool
     created_at: datetime
+    updated_at: Optional[datetime] = None
+    # Set on occurrences expanded from a recurring event: the start the rule generated
+    recurrence_id: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -74,6 +100,71 @@ class Conflict(ConflictBase):
     class Config:
         from_attributes = True
 
+# Resolve the forward reference to Conflict
+EventWithConflicts.model_rebuild()
+
+# Recurrence exception schemas
+class EventExceptionCreate(BaseModel):
+    original_start: datetime
+    is_cancelled: bool = False
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    
+    _normalize_times = field_validator("original_start", "start_time", "end_time")(to_naive_utc)
+    
+    @model_validator(mode="after")
+    def _check_override(self):
+        if not self.is_cancelled and (self.start_time is None or self.end_time is None):
+            raise ValueError("A moved occurrence needs start_time and end_time")
+        if self.start_time is not None and self.end_time is not None and self.start_time >= self.end_time:
+            raise ValueError("start_time must be before end_time")
+        return self
+
+class EventException(BaseModel):
+    id: int
+    event_id: int
+    original_start: datetime
+    is_cancelled: bool
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class ArchivedEvent(EventWithConflicts):
+    archived_at: datetime
+    exceptions: List[EventException] = []
+
+# Calendar sharing schemas
+class CalendarShareCreate(BaseModel):
+    email: EmailStr  # user allowed to see the current user's free/busy time
+
+class CalendarShare(BaseModel):
+    id: int
+    owner_id: int
+    grantee_id: int
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+# What-if schemas
+class WhatIfCandidate(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    
+    _normalize_times = field_validator("start_time", "end_time")(to_naive_utc)
+
+class WhatIfRequest(BaseModel):
+    event_id: int
+    candidates: List[WhatIfCandidate] = Field(..., min_length=1, max_length=500)
+    # Optional constraints each candidate is checked against
+    work_start_hour: Optional[int] = Field(None, ge=0, le=23)
+    work_end_hour: Optional[int] = Field(None, ge=1, le=24)
+    min_duration_minutes: Optional[int] = Field(None, ge=0)
+    max_duration_minutes: Optional[int] = Field(None, gt=0)
+
 # Token schemas
 class Token(BaseModel):
     access_token: str
@@ -81,3 +172,66 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     email: Optional[str] = None
+
+# Auto-schedule schemas
+class AutoScheduleRequest(BaseModel):
+    work_start_hour: int = Field(9, ge=0, le=23)
+    work_end_hour: int = Field(18, ge=1, le=24)
+    granularity_minutes: int = Field(15, gt=0, le=24 * 60)
+    buffer_minutes: int = Field(0, ge=0, le=24 * 60)
+    horizon_days: int = Field(14, gt=0, le=366)
+    min_duration_minutes: Optional[int] = Field(None, ge=0)
+    max_duration_minutes: Optional[int] = Field(None, gt=0)
+    time_budget_ms: Optional[int] = Field(None, gt=0, le=5000)
+    apply: bool = False
+
+# Entity and session schemas
+class EntityItem(BaseModel):
+    name: str
+    capacity: Optional[int] = Field(None, gt=0)
+    meta: Optional[dict] = None
+
+class EntityCreate(BaseModel):
+    entity_type: str
+    entities: List[EntityItem] = Field(..., min_length=1)
+
+class Entity(BaseModel):
+    id: int
+    event_id: int
+    entity_type: str
+    name: str
+    capacity: Optional[int] = None
+    meta: Optional[dict] = None
+    
+    class Config:
+        from_attributes = True
+
+class SessionItem(BaseModel):
+    title: str
+    duration: int = Field(..., gt=0)  # minutes
+    priority: int = Field(1, ge=1)
+    attendees: Optional[int] = Field(None, ge=0)
+    meta: Optional[dict] = None
+
+class SessionCreate(BaseModel):
+    sessions: List[SessionItem] = Field(..., min_length=1)
+
+class Session(BaseModel):
+    id: int
+    event_id: int
+    title: str
+    duration: int
+    priority: int
+    attendees: Optional[int] = None
+    meta: Optional[dict] = None
+    entity_id: Optional[int] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class ScheduleOptions(BaseModel):
+    slot_minutes: int = Field(15, gt=0, le=24 * 60)
+    work_start_hour: Optional[int] = Field(None, ge=0, le=23)
+    work_end_hour: Optional[int] = Field(None, ge=1, le=24)
@@ -3,12 +3,13 @@ Authentication routes
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
-from app.models.database import get_db, User
+from app.models.database import get_async_db, User
 from app.models.auth import LoginRequest, SignupRequest, AuthResponse
 from app.utils.auth import (
-    hash_password, verify_password, create_access_token,
+    hash_password_async, verify_password_async, create_access_token,
     get_current_user
 )
 import logging
@@ -17,12 +18,12 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/signup", response_model=AuthResponse)
-async def signup(request: SignupRequest, db: Session = Depends(get_db)):
+async def signup(request: SignupRequest, db: AsyncSession = Depends(get_async_db)):
     """
     User signup endpoint
     """
     # Check if user already exists
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await db.scalar(select(User).filter(User.email == request.email))
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -30,7 +31,7 @@ async def signup(request: SignupRequest, db: Session = Depends(get_db)):
         )
     
     # Check username
-    user = db.query(User).filter(User.username == request.username).first()
+    user = await db.scalar(select(User).filter(User.username == request.username))
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -38,7 +39,7 @@ async def signup(request: SignupRequest, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = hash_password(request.password)
+    hashed_password = await hash_password_async(request.password)
     new_user = User(
         email=request.email,
         username=request.username,
@@ -47,8 +48,8 @@ async def signup(request: SignupRequest, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Create access token
     access_token = create_access_token(
@@ -68,18 +69,18 @@ async def signup(request: SignupRequest, db: Session = Depends(get_db)):
     )
 
 @router.post("/login", response_model=AuthResponse)
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """
     User login endpoint
     """
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await db.scalar(select(User).filter(User.email == request.email))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
     
-    if not verify_password(request.password, user.hashed_password):
+    if not await verify_password_async(request.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
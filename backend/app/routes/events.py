@@ -2,14 +2,48 @@
 Events routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.models.database import get_db, Event, User, Conflict
-from app.models.schemas import Event as EventSchema, EventCreate, EventUpdate, EventWithConflicts
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, delete, or_, select, tuple_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Iterator, List, Optional
+from app.models.database import (
+    get_async_db, SessionLocal, AsyncSessionLocal, Event, User, Conflict, Entity, EventSession,
+    EventException as EventExceptionModel, ArchivedEvent as ArchivedEventModel, CalendarShare
+)
+from app.models.schemas import (
+    Event as EventSchema, EventCreate, EventUpdate, EventWithConflicts, WhatIfRequest, AutoScheduleRequest,
+    Entity as EntitySchema, EntityCreate, Session as SessionSchema, SessionCreate, ScheduleOptions, to_naive_utc,
+    EventException as EventExceptionSchema, EventExceptionCreate, Conflict as ConflictSchema,
+    ArchivedEvent as ArchivedEventSchema, CalendarShare as CalendarShareSchema, CalendarShareCreate
+)
 from app.utils.auth import get_current_user
-from app.engine.scheduler_core import check_conflicts, resolve_conflict
-from app.engine.explainer import generate_explanation
+from app.utils.query_counter import query_budget
+from app.utils.fast_json import FastJSONResponse, column_rows
+from app.engine.scheduler_core import (
+    resolve_conflict, find_free_time_slots_async, find_common_free_slots_async, scan_calendar_conflicts_async,
+    sync_event_conflicts_async
+)
+from app.engine.explainer import generate_explanation_async, generate_explanations_async
+from app.engine.bulk_import import import_events
+from app.engine.constraint_engine import ConstraintValidator
+from app.engine.simulator import CalendarSnapshot
+from app.engine.auto_scheduler import (
+    AUTO_SCHEDULE_TIME_BUDGET_MS, plan_auto_schedule_async, apply_auto_schedule_async
+)
+from app.engine.session_solver import SPACE_ENTITY_TYPES, SessionSpec, RoomSpec, solve_sessions
+from app.engine.recurrence import expand_series, is_occurrence, load_exceptions_async
+from app.engine.freebusy import MAX_FREEBUSY_SLOTS, MAX_FREEBUSY_USERS, get_freebusy_async, slot_count
+from app.engine.interval_index import interval_indexes
+from app.utils.importers import iter_lines, iter_ndjson, iter_ics
+from itertools import islice
+import anyio
+import base64
+import heapq
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,7 +52,7 @@ router = APIRouter()
 @router.post("/create", response_model=EventSchema)
 async def create_event(
     event: EventCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -36,38 +70,686 @@ async def create_event(
         owner_id=current_user.id
     )
     
-    # Check for conflicts
-    conflicts = check_conflicts(new_event, db)
-    if conflicts:
-        new_event.is_tentative = True
-    
     db.add(new_event)
-    db.commit()
-    db.refresh(new_event)
+    await db.flush()
+    
+    # Store conflicts and flag the event tentative if there are any
+    await sync_event_conflicts_async(new_event, db)
+    
+    await db.commit()
+    await db.refresh(new_event)
     
     return new_event
 
-@router.get("/list", response_model=List[EventWithConflicts])
+def _encode_cursor(start_time: datetime, event_id: int) -> str:
+    """Opaque keyset cursor for the (start_time, id) position after this event"""
+    payload = json.dumps({"s": start_time.isoformat(), "i": event_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor back into (start_time, id)"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(payload["s"]), int(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def _list_events_query(
+    owner_id: int,
+    range_start: Optional[datetime],
+    range_end: Optional[datetime],
+    after: Optional[tuple],
+    query=None
+):
+    """
+    Owner's events overlapping the range, in keyset order after the given position.
+    
+    Recurring events match when any part of their series span does. A column
+    SELECT can be passed as query to filter that instead of loading Event objects.
+    """
+    if query is None:
+        # Conflicts for the whole page come from one extra SELECT ... WHERE event_id IN (...)
+        query = select(Event).options(selectinload(Event.conflicts))
+    query = query.filter(Event.owner_id == owner_id)
+    if range_start is not None:
+        query = query.filter(or_(
+            Event.end_time > range_start,
+            and_(
+                Event.recurrence_rule.isnot(None),
+                or_(Event.recurrence_end.is_(None), Event.recurrence_end > range_start)
+            )
+        ))
+    if range_end is not None:
+        query = query.filter(Event.start_time < range_end)
+    if after is not None:
+        query = query.filter(tuple_(Event.start_time, Event.id) > tuple_(*after))
+    return query.order_by(Event.start_time, Event.id)
+
+# Response fields read straight from the table by the fast path, in schema order
+_FAST_EVENT_FIELDS = [name for name in EventWithConflicts.model_fields if name in Event.__table__.c]
+_FAST_CONFLICT_FIELDS = list(ConflictSchema.model_fields)
+
+def _fast_event_page(
+    db: Session,
+    owner_id: int,
+    range_start: Optional[datetime],
+    range_end: Optional[datetime],
+    after: Optional[tuple],
+    limit: int
+) -> List[dict]:
+    """
+    Up to limit + 1 events shaped like EventWithConflicts, built from column tuples.
+    
+    Two queries, no ORM objects and no validation: the values come from our own tables.
+    """
+    columns = [Event.__table__.c[name] for name in _FAST_EVENT_FIELDS]
+    rows = column_rows(db, _list_events_query(
+        owner_id, range_start, range_end, after, select(*columns)
+    ).limit(limit + 1))
+    if not rows:
+        return rows
+    
+    by_id = {}
+    for row in rows:
+        row["recurrence_id"] = None
+        row["conflicts"] = []
+        by_id[row["id"]] = row
+    conflict_columns = [Conflict.__table__.c[name] for name in _FAST_CONFLICT_FIELDS]
+    for conflict in column_rows(db, select(*conflict_columns).where(
+        Conflict.event_id.in_(list(by_id))
+    ).order_by(Conflict.id)):
+        by_id[conflict["event_id"]]["conflicts"].append(conflict)
+    return rows
+
+async def _expand_event_list(
+    db: AsyncSession,
+    owner_id: int,
+    range_start: datetime,
+    range_end: datetime,
+    limit: int
+) -> List:
+    """First `limit` events and recurring occurrences overlapping [from, to), by start time"""
+    base = _list_events_query(owner_id, range_start, range_end, None)
+    singles = (await db.scalars(base.filter(Event.recurrence_rule.is_(None)).limit(limit))).all()
+    series = (await db.scalars(base.filter(Event.recurrence_rule.isnot(None)))).all()
+    if not series:
+        return list(singles)
+    
+    exceptions = await load_exceptions_async(
+        db, [row.id for row in series], range_start, range_end,
+        max(row.end_time - row.start_time for row in series)
+    )
+    by_id = {row.id: EventWithConflicts.model_validate(row) for row in series}
+    occurrences = (
+        by_id[occurrence.id].model_copy(update={
+            "start_time": occurrence.start_time,
+            "end_time": occurrence.end_time,
+            "recurrence_id": occurrence.recurrence_id
+        })
+        for occurrence in expand_series(series, exceptions, range_start, range_end)
+    )
+    merged = heapq.merge(singles, occurrences, key=lambda item: (item.start_time, item.id))
+    return list(islice(merged, limit))
+
+@router.get("/list", response_model=List[EventWithConflicts], dependencies=[Depends(query_budget(3))])
 async def list_events(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    range_start: Optional[datetime] = Query(None, alias="from"),
+    range_end: Optional[datetime] = Query(None, alias="to"),
+    cursor: Optional[str] = None,
+    limit: int = Query(500, gt=0, le=5000),
+    stream: bool = False,
+    expand: bool = False,
+    fast: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List events for current user, optionally limited to those overlapping [from, to).
+    
+    Results are ordered by start time and paginated with a keyset cursor; when
+    more events remain the X-Next-Cursor header holds the cursor for the next
+    page. With stream=true every matching event is streamed as one JSON array,
+    fetched page by page so memory stays bounded. With expand=true recurring
+    events are replaced by their occurrences inside [from, to), each carrying
+    its recurrence_id; both bounds are required and results are not paginated.
+    With fast=true a page is built from column values and encoded directly,
+    without loading ORM objects or validating the response; the JSON is the same.
+    """
+    range_start = to_naive_utc(range_start)
+    range_end = to_naive_utc(range_end)
+    after = _decode_cursor(cursor) if cursor else None
+    owner_id = current_user.id
+    
+    if expand:
+        if range_start is None or range_end is None or stream or cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="expand requires from and to and does not support stream or cursor"
+            )
+        # Series, their conflicts and their exceptions take up to three more queries
+        query_budget(6)(request)
+        return await _expand_event_list(db, owner_id, range_start, range_end, limit)
+    
+    if fast:
+        if stream or expand:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="fast does not support stream or expand"
+            )
+        rows = await db.run_sync(
+            lambda session: _fast_event_page(session, owner_id, range_start, range_end, after, limit)
+        )
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = _encode_cursor(rows[-1]["start_time"], rows[-1]["id"])
+        return FastJSONResponse(rows, headers=headers)
+    
+    if stream:
+        async def generate():
+            async with AsyncSessionLocal() as stream_db:
+                position = after
+                separator = "["
+                while True:
+                    page = (await stream_db.scalars(
+                        _list_events_query(owner_id, range_start, range_end, position).limit(limit)
+                    )).all()
+                    for event in page:
+                        yield separator + EventWithConflicts.model_validate(event).model_dump_json()
+                        separator = ","
+                    if len(page) < limit:
+                        break
+                    position = (page[-1].start_time, page[-1].id)
+                    # Drop the page from the identity map before fetching the next one
+                    stream_db.expunge_all()
+                yield "[]" if separator == "[" else "]"
+        
+        return StreamingResponse(generate(), media_type="application/json")
+    
+    events = (await db.scalars(
+        _list_events_query(owner_id, range_start, range_end, after).limit(limit + 1)
+    )).all()
+    if len(events) > limit:
+        events = events[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(events[-1].start_time, events[-1].id)
+    
+    return events
+
+async def _require_calendar_access(user_ids: List[int], db: AsyncSession, current_user: User):
+    """
+    Raise 403 unless the current user may see the free/busy time of every user id.
+    
+    Users see their own calendar and those of active users who shared theirs
+    with them. Unknown ids are refused exactly like calendars that were not
+    shared, so the response does not tell which user ids exist.
+    """
+    others = set(user_ids) - {current_user.id}
+    if not others:
+        return
+    shared = set((await db.scalars(
+        select(CalendarShare.owner_id).join(User, User.id == CalendarShare.owner_id).filter(
+            CalendarShare.grantee_id == current_user.id,
+            CalendarShare.owner_id.in_(others),
+            User.is_active
+        )
+    )).all())
+    if shared != others:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to view the calendars of users: {', '.join(str(user_id) for user_id in sorted(others - shared))}"
+        )
+
+@router.get("/archive", response_model=List[ArchivedEventSchema], dependencies=[Depends(query_budget(4))])
+async def list_archived_events(
+    response: Response,
+    range_start: Optional[datetime] = Query(None, alias="from"),
+    range_end: Optional[datetime] = Query(None, alias="to"),
+    cursor: Optional[str] = None,
+    limit: int = Query(500, gt=0, le=5000),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    List all events for current user
+    List the current user's archived events, optionally limited to those overlapping [from, to).
+    
+    Finished recurring series come back as their series row with its exceptions.
+    Paginated like /list, with the cursor for the next page in X-Next-Cursor.
     """
-    events = db.query(Event).filter(Event.owner_id == current_user.id).all()
+    range_start = to_naive_utc(range_start)
+    range_end = to_naive_utc(range_end)
+    
+    query = select(ArchivedEventModel).options(
+        selectinload(ArchivedEventModel.conflicts), selectinload(ArchivedEventModel.exceptions)
+    ).filter(ArchivedEventModel.owner_id == current_user.id)
+    if range_start is not None:
+        # A series spans from its first occurrence to the end of its last one
+        query = query.filter(or_(
+            ArchivedEventModel.end_time > range_start, ArchivedEventModel.recurrence_end > range_start
+        ))
+    if range_end is not None:
+        query = query.filter(ArchivedEventModel.start_time < range_end)
+    if cursor:
+        query = query.filter(
+            tuple_(ArchivedEventModel.start_time, ArchivedEventModel.id) > tuple_(*_decode_cursor(cursor))
+        )
+    
+    events = (await db.scalars(
+        query.order_by(ArchivedEventModel.start_time, ArchivedEventModel.id).limit(limit + 1)
+    )).all()
+    if len(events) > limit:
+        events = events[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(events[-1].start_time, events[-1].id)
+    
     return events
 
-@router.get("/{event_id}", response_model=EventWithConflicts)
+@router.get("/free-slots")
+async def get_free_slots(
+    duration_minutes: int = Query(60, gt=0, le=24 * 60),
+    horizon_days: int = Query(30, gt=0, le=366),
+    work_start_hour: int = Query(9, ge=0, le=23),
+    work_end_hour: int = Query(18, ge=1, le=24),
+    granularity_minutes: int = Query(15, gt=0, le=24 * 60),
+    buffer_minutes: int = Query(0, ge=0, le=24 * 60),
+    limit: int = Query(5, gt=0, le=100),
+    preferred_start: Optional[datetime] = None,
+    user_ids: Optional[List[int]] = Query(None, max_length=MAX_FREEBUSY_USERS),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Suggest free time slots in the current user's calendar.
+    
+    With user_ids (repeat the parameter) the slots are free for all of those
+    users at once, for example every participant of a workshop session. As
+    with /freebusy, other users must have shared their calendar with the
+    current user.
+    """
+    if work_start_hour >= work_end_hour:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Working hours must start before they end"
+        )
+    
+    options = dict(
+        duration_minutes=duration_minutes,
+        horizon_days=horizon_days,
+        work_start_hour=work_start_hour,
+        work_end_hour=work_end_hour,
+        granularity_minutes=granularity_minutes,
+        buffer_minutes=buffer_minutes,
+        limit=limit,
+        preferred_start=to_naive_utc(preferred_start)
+    )
+    if user_ids:
+        await _require_calendar_access(user_ids, db, current_user)
+        slots = await find_common_free_slots_async(user_ids, db, **options)
+    else:
+        slots = await find_free_time_slots_async(current_user.id, db, **options)
+    
+    return [
+        {"start_time": start_time, "end_time": end_time}
+        for start_time, end_time in slots
+    ]
+
+@router.get("/freebusy")
+async def get_freebusy(
+    range_start: datetime = Query(..., alias="from"),
+    range_end: datetime = Query(..., alias="to"),
+    slot_minutes: int = Query(15, gt=0, le=24 * 60),
+    user_ids: Optional[List[int]] = Query(None, max_length=MAX_FREEBUSY_USERS),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Free/busy bitmaps over [from, to), one bit per slot of slot_minutes.
+    
+    Without user_ids this is the current user's calendar. With several
+    user_ids (repeat the parameter) busy marks the slots where any of them is
+    busy and free the slots where all of them are free; other users must have
+    shared their calendar with the current user (POST /shares). Bitmaps are
+    base64, slot 0 in the most significant bit of the first byte.
+    """
+    range_start = to_naive_utc(range_start)
+    range_end = to_naive_utc(range_end)
+    if range_start >= range_end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start time must be before end time"
+        )
+    if slot_count(range_start, range_end, slot_minutes) > MAX_FREEBUSY_SLOTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range covers more than {MAX_FREEBUSY_SLOTS} slots"
+        )
+    
+    owner_ids = user_ids or [current_user.id]
+    await _require_calendar_access(owner_ids, db, current_user)
+    return await get_freebusy_async(owner_ids, db, range_start, range_end, slot_minutes)
+
+@router.post("/shares", response_model=CalendarShareSchema)
+async def share_calendar(
+    request: CalendarShareCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Let another user see the current user's free/busy time through /freebusy and /free-slots
+    """
+    grantee = await db.scalar(select(User).filter(User.email == request.email, User.is_active))
+    if not grantee:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    if grantee.id == current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot share a calendar with its owner"
+        )
+    
+    share = await db.scalar(select(CalendarShare).filter(
+        CalendarShare.owner_id == current_user.id, CalendarShare.grantee_id == grantee.id
+    ))
+    if share is None:
+        share = CalendarShare(owner_id=current_user.id, grantee_id=grantee.id)
+        db.add(share)
+        await db.commit()
+    
+    return share
+
+@router.get("/shares")
+async def list_calendar_shares(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Users the current user shares their calendar with, and users sharing theirs with the current user
+    """
+    shares = (await db.scalars(select(CalendarShare).filter(or_(
+        CalendarShare.owner_id == current_user.id, CalendarShare.grantee_id == current_user.id
+    )).order_by(CalendarShare.id))).all()
+    
+    return {
+        "shared_with": [CalendarShareSchema.model_validate(share) for share in shares if share.owner_id == current_user.id],
+        "shared_with_me": [CalendarShareSchema.model_validate(share) for share in shares if share.grantee_id == current_user.id]
+    }
+
+@router.delete("/shares/{grantee_id}")
+async def revoke_calendar_share(
+    grantee_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stop sharing the current user's calendar with a user
+    """
+    result = await db.execute(delete(CalendarShare).where(
+        CalendarShare.owner_id == current_user.id, CalendarShare.grantee_id == grantee_id
+    ))
+    if not result.rowcount:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Share not found"
+        )
+    await db.commit()
+    
+    return {"message": "Calendar share revoked"}
+
+@router.post("/conflicts/scan")
+async def scan_conflicts(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Detect every conflict in the current user's calendar and store the results
+    """
+    summary = await scan_calendar_conflicts_async(current_user.id, db)
+    await db.commit()
+    
+    return summary
+
+@router.get("/explanations", dependencies=[Depends(query_budget(3))])
+async def explain_conflicts_in_range(
+    range_start: Optional[datetime] = Query(None, alias="from"),
+    range_end: Optional[datetime] = Query(None, alias="to"),
+    limit: int = Query(1000, gt=0, le=5000),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Explain every conflict of the current user's events overlapping [from, to)
+    """
+    query = select(Conflict, Event).join(Event, Conflict.event_id == Event.id).filter(
+        Event.owner_id == current_user.id
+    )
+    if range_start is not None:
+        query = query.filter(Event.end_time > to_naive_utc(range_start))
+    if range_end is not None:
+        query = query.filter(Event.start_time < to_naive_utc(range_end))
+    rows = (await db.execute(query.order_by(Event.start_time, Conflict.id).limit(limit))).all()
+    
+    conflicts = [conflict for conflict, _ in rows]
+    explanations = await generate_explanations_async(
+        conflicts, db, {event.id: event for _, event in rows}
+    )
+    
+    return [
+        {
+            "conflict_id": conflict.id,
+            "event_id": conflict.event_id,
+            "conflict_with_event_id": conflict.conflict_with_event_id,
+            "explanation": explanation
+        }
+        for conflict, explanation in zip(conflicts, explanations)
+    ]
+
+@router.post("/what-if")
+async def simulate_reschedules(
+    request: WhatIfRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Score candidate reschedules of an event against a snapshot of the calendar.
+    
+    Occurrences of recurring events count as conflicts, but a recurring event
+    cannot be the one moved. Nothing is written; apply the chosen option with
+    PUT /{event_id}.
+    """
+    event = await db.scalar(select(Event).filter(Event.id == request.event_id))
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    
+    if event.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this event"
+        )
+    
+    if event.recurrence_rule is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="What-if does not support recurring events; move an occurrence with POST /{event_id}/exceptions"
+        )
+    
+    if any(candidate.start_time >= candidate.end_time for candidate in request.candidates):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start time must be before end time"
+        )
+    
+    validator = ConstraintValidator()
+    if request.work_start_hour is not None or request.work_end_hour is not None:
+        validator.add_constraint("time_window", {
+            "start_hour": request.work_start_hour or 0,
+            "end_hour": request.work_end_hour or 24
+        })
+    if request.min_duration_minutes is not None or request.max_duration_minutes is not None:
+        validator.add_constraint("duration", {
+            "min_minutes": request.min_duration_minutes or 0,
+            "max_minutes": request.max_duration_minutes or float('inf')
+        })
+    
+    # Recurring occurrences are only expanded where the event is now or could move to
+    window_start = min([event.start_time] + [candidate.start_time for candidate in request.candidates])
+    window_end = max([event.end_time] + [candidate.end_time for candidate in request.candidates])
+    snapshot = await CalendarSnapshot.load_async(current_user.id, db, window_start, window_end)
+    results = snapshot.evaluate(
+        event.id,
+        [(candidate.start_time, candidate.end_time) for candidate in request.candidates],
+        validator
+    )
+    
+    return {
+        "event_id": event.id,
+        "current": {"start_time": event.start_time, "end_time": event.end_time},
+        "results": results
+    }
+
+@router.post("/auto-schedule")
+async def auto_schedule_events(
+    request: AutoScheduleRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Assign non-conflicting times to all of the current user's tentative events.
+    
+    Returns the plan only, unless apply=true.
+    """
+    if request.work_start_hour >= request.work_end_hour:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Working hours must start before they end"
+        )
+    
+    validator = ConstraintValidator()
+    if request.min_duration_minutes is not None or request.max_duration_minutes is not None:
+        validator.add_constraint("duration", {
+            "min_minutes": request.min_duration_minutes or 0,
+            "max_minutes": request.max_duration_minutes or float('inf')
+        })
+    
+    plan = await plan_auto_schedule_async(
+        current_user.id,
+        db,
+        validator=validator,
+        time_budget_ms=request.time_budget_ms or AUTO_SCHEDULE_TIME_BUDGET_MS,
+        work_start_hour=request.work_start_hour,
+        work_end_hour=request.work_end_hour,
+        granularity_minutes=request.granularity_minutes,
+        buffer_minutes=request.buffer_minutes,
+        horizon_days=request.horizon_days
+    )
+    
+    if request.apply:
+        plan["conflicts"] = await apply_auto_schedule_async(current_user.id, plan["assignments"], db)
+        await db.commit()
+    
+    return plan
+
+class _BodyReader:
+    """
+    Hands the request body to the import thread chunk by chunk as it arrives.
+    
+    generate() runs in a worker thread (StreamingResponse iterates sync
+    generators in the threadpool), so each chunk is awaited on the event loop.
+    """
+    
+    def __init__(self, request: Request):
+        self._stream = request.stream()
+    
+    async def _next(self) -> Optional[bytes]:
+        try:
+            return await self._stream.__anext__()
+        except StopAsyncIteration:
+            return None
+    
+    def chunks(self) -> Iterator[bytes]:
+        while True:
+            chunk = anyio.from_thread.run(self._next)
+            if chunk is None:
+                return
+            if chunk:
+                yield chunk
+
+class _UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that streams while the route is still reading the request body.
+    
+    The stock response also listens for a disconnect on receive, which would
+    take body messages away from the generator. This one never reads receive:
+    a client leaving mid-upload ends the import through request.stream()
+    raising ClientDisconnect, and once the body is in the import runs to the end.
+    """
+    
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        async for chunk in self.body_iterator:
+            if not isinstance(chunk, bytes):
+                chunk = chunk.encode(self.charset)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+@router.post("/bulk")
+async def bulk_import_events(
+    request: Request,
+    input_format: Optional[str] = Query(None, alias="format", pattern="^(ndjson|ics)$"),
+    batch_size: int = Query(1000, gt=0, le=10000),
+    default_event_type: str = "custom",
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Import events from an NDJSON or iCalendar (.ics) body.
+    
+    Progress, per-row errors and a final summary are streamed back as NDJSON.
+    """
+    if input_format is None:
+        content_type = request.headers.get("content-type", "")
+        input_format = "ics" if "calendar" in content_type else "ndjson"
+    
+    owner_id = current_user.id
+    body = _BodyReader(request)
+    
+    def generate():
+        db = SessionLocal()
+        try:
+            lines = iter_lines(body.chunks())
+            if input_format == "ics":
+                records = iter_ics(lines, default_event_type)
+            else:
+                records = iter_ndjson(lines)
+            
+            for message in import_events(records, owner_id, db, batch_size):
+                yield json.dumps(message, default=str) + "\n"
+        except Exception as exc:
+            db.rollback()
+            logger.error(f"Bulk import aborted: {str(exc)}")
+            yield json.dumps({"type": "error", "detail": "Import aborted"}) + "\n"
+        finally:
+            db.close()
+    
+    return _UploadStreamingResponse(generate(), media_type="application/x-ndjson")
+
+@router.get("/{event_id}", response_model=EventWithConflicts, dependencies=[Depends(query_budget(3))])
 async def get_event(
     event_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get a specific event
     """
-    event = db.query(Event).filter(Event.id == event_id).first()
+    event = await db.scalar(select(Event).options(selectinload(Event.conflicts)).filter(Event.id == event_id))
     if not event:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -86,13 +768,13 @@ async def get_event(
 async def update_event(
     event_id: int,
     event_update: EventUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Update an event
     """
-    event = db.query(Event).filter(Event.id == event_id).first()
+    event = await db.scalar(select(Event).filter(Event.id == event_id))
     if not event:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -106,24 +788,40 @@ async def update_event(
         )
     
     # Update fields
-    for field, value in event_update.dict(exclude_unset=True).items():
+    updates = event_update.dict(exclude_unset=True)
+    for field, value in updates.items():
         setattr(event, field, value)
     
-    db.commit()
-    db.refresh(event)
+    if event.start_time >= event.end_time:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start time must be before end time"
+        )
+    
+    # Exceptions are tied to the starts the old rule generated
+    if "recurrence_rule" in updates or ("start_time" in updates and event.recurrence_rule):
+        await db.execute(delete(EventExceptionModel).where(EventExceptionModel.event_id == event_id))
+    
+    # Only a changed time range or recurrence can add or remove conflicts
+    if updates.keys() & {"start_time", "end_time", "recurrence_rule"}:
+        await db.flush()
+        await sync_event_conflicts_async(event, db)
+    
+    await db.commit()
+    await db.refresh(event)
     
     return event
 
 @router.delete("/{event_id}")
 async def delete_event(
     event_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Delete an event
     """
-    event = db.query(Event).filter(Event.id == event_id).first()
+    event = await db.scalar(select(Event).filter(Event.id == event_id))
     if not event:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -136,21 +834,25 @@ async def delete_event(
             detail="Not authorized to delete this event"
         )
     
-    db.delete(event)
-    db.commit()
+    await sync_event_conflicts_async(event, db, removed=True)
+    await db.execute(delete(EventSession).where(EventSession.event_id == event_id))
+    await db.execute(delete(Entity).where(Entity.event_id == event_id))
+    await db.execute(delete(EventExceptionModel).where(EventExceptionModel.event_id == event_id))
+    await db.delete(event)
+    await db.commit()
     
     return {"message": "Event deleted successfully"}
 
 @router.get("/{event_id}/conflicts")
 async def get_event_conflicts(
     event_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get conflicts for a specific event
     """
-    event = db.query(Event).filter(Event.id == event_id).first()
+    event = await db.scalar(select(Event).filter(Event.id == event_id))
     if not event:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -163,22 +865,56 @@ async def get_event_conflicts(
             detail="Not authorized to access this event"
         )
     
-    conflicts = db.query(Conflict).filter(Conflict.event_id == event_id).all()
+    conflicts = (await db.scalars(select(Conflict).filter(Conflict.event_id == event_id))).all()
     return conflicts
 
+@router.get("/{event_id}/explanations", dependencies=[Depends(query_budget(4))])
+async def explain_event_conflicts(
+    event_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Explain every conflict of a specific event
+    """
+    event = await db.scalar(select(Event).filter(Event.id == event_id))
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    
+    if event.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this event"
+        )
+    
+    conflicts = (await db.scalars(select(Conflict).filter(Conflict.event_id == event_id))).all()
+    explanations = await generate_explanations_async(conflicts, db, {event.id: event})
+    
+    return [
+        {
+            "conflict_id": conflict.id,
+            "conflict_with_event_id": conflict.conflict_with_event_id,
+            "explanation": explanation
+        }
+        for conflict, explanation in zip(conflicts, explanations)
+    ]
+
 @router.post("/{event_id}/resolve-conflict")
 async def resolve_event_conflict(
     event_id: int,
     conflict_id: int,
     new_start_time: str,
     new_end_time: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Resolve a conflict by rescheduling event
     """
-    event = db.query(Event).filter(Event.id == event_id).first()
+    event = await db.scalar(select(Event).filter(Event.id == event_id))
     if not event:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -191,33 +927,289 @@ async def resolve_event_conflict(
             detail="Not authorized to update this event"
         )
     
-    conflict = db.query(Conflict).filter(Conflict.id == conflict_id).first()
+    conflict = await db.scalar(select(Conflict).filter(Conflict.id == conflict_id))
     if not conflict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conflict not found"
         )
     
-    # Update event times
     try:
-        from datetime import datetime
-        event.start_time = datetime.fromisoformat(new_start_time)
-        event.end_time = datetime.fromisoformat(new_end_time)
-        event.is_tentative = False
-        
-        db.commit()
-        db.refresh(event)
-        
-        # Generate explanation
-        explanation = generate_explanation(event, conflict, db)
-        
-        return {
-            "message": "Conflict resolved",
-            "event": event,
-            "explanation": explanation
-        }
+        new_start = to_naive_utc(datetime.fromisoformat(new_start_time))
+        new_end = to_naive_utc(datetime.fromisoformat(new_end_time))
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid datetime format"
         )
+    
+    if new_start >= new_end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start time must be before end time"
+        )
+    
+    # Update event times
+    event.start_time = new_start
+    event.end_time = new_end
+    event.is_tentative = False
+    
+    await db.flush()
+    
+    # Generate explanation before the resolved conflict row is removed
+    explanation = await generate_explanation_async(event, conflict, db)
+    
+    await sync_event_conflicts_async(event, db)
+    await db.commit()
+    await db.refresh(event)
+    
+    return {
+        "message": "Conflict resolved",
+        "event": event,
+        "explanation": explanation
+    }
+
+async def _get_owned_event(event_id: int, db: AsyncSession, current_user: User, action: str) -> Event:
+    """Load an event, raising 404 if it is missing and 403 if it belongs to someone else"""
+    event = await db.scalar(select(Event).filter(Event.id == event_id))
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    
+    if event.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to {action} this event"
+        )
+    
+    return event
+
+@router.post("/{event_id}/exceptions", response_model=EventExceptionSchema)
+async def add_exception(
+    event_id: int,
+    exception: EventExceptionCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Cancel or move one occurrence of a recurring event, replacing any earlier
+    exception for the same occurrence
+    """
+    event = await _get_owned_event(event_id, db, current_user, "update")
+    if not event.recurrence_rule:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Event does not recur"
+        )
+    
+    if not is_occurrence(event.start_time, event.recurrence_rule, exception.original_start):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="original_start is not an occurrence of this event"
+        )
+    
+    values = exception.dict()
+    if values["is_cancelled"]:
+        values.update(start_time=None, end_time=None)
+    
+    stored = await db.scalar(select(EventExceptionModel).filter(
+        EventExceptionModel.event_id == event_id,
+        EventExceptionModel.original_start == exception.original_start
+    ))
+    if stored is None:
+        stored = EventExceptionModel(event_id=event_id, **values)
+        db.add(stored)
+    else:
+        for field, value in values.items():
+            setattr(stored, field, value)
+    
+    await db.flush()
+    await sync_event_conflicts_async(event, db)
+    # Occurrences changed without touching the event row; outdate the owner's free/busy
+    await db.run_sync(lambda session: interval_indexes.touch(event.owner_id, session))
+    await db.commit()
+    
+    return stored
+
+@router.get("/{event_id}/exceptions", response_model=List[EventExceptionSchema])
+async def list_exceptions(
+    event_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List the cancelled and moved occurrences of a recurring event
+    """
+    await _get_owned_event(event_id, db, current_user, "access")
+    
+    return (await db.scalars(
+        select(EventExceptionModel).filter(EventExceptionModel.event_id == event_id).order_by(EventExceptionModel.original_start)
+    )).all()
+
+@router.post("/{event_id}/entities")
+async def add_entities(
+    event_id: int,
+    request: EntityCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Attach entities such as rooms or venues to an event
+    """
+    await _get_owned_event(event_id, db, current_user, "update")
+    
+    entities = [
+        Entity(event_id=event_id, entity_type=request.entity_type, **item.dict())
+        for item in request.entities
+    ]
+    db.add_all(entities)
+    await db.commit()
+    
+    return {"entities": [EntitySchema.model_validate(entity) for entity in entities]}
+
+@router.get("/{event_id}/entities")
+async def list_entities(
+    event_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List the entities of an event
+    """
+    await _get_owned_event(event_id, db, current_user, "access")
+    
+    entities = (await db.scalars(
+        select(Entity).filter(Entity.event_id == event_id).order_by(Entity.id)
+    )).all()
+    return {"entities": [EntitySchema.model_validate(entity) for entity in entities]}
+
+@router.post("/{event_id}/sessions")
+async def add_sessions(
+    event_id: int,
+    request: SessionCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Add sessions to an event
+    """
+    await _get_owned_event(event_id, db, current_user, "update")
+    
+    sessions = [EventSession(event_id=event_id, **item.dict()) for item in request.sessions]
+    db.add_all(sessions)
+    await db.commit()
+    
+    return {"sessions": [SessionSchema.model_validate(session) for session in sessions]}
+
+@router.get("/{event_id}/sessions")
+async def list_sessions(
+    event_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List the sessions of an event
+    """
+    await _get_owned_event(event_id, db, current_user, "access")
+    
+    sessions = (await db.scalars(
+        select(EventSession).filter(EventSession.event_id == event_id).order_by(EventSession.id)
+    )).all()
+    return {"sessions": [SessionSchema.model_validate(session) for session in sessions]}
+
+def _schedule_items(sessions: List[EventSession], rooms: dict) -> List[dict]:
+    """Scheduled sessions in time order, shaped for the schedule view"""
+    scheduled = sorted(
+        (session for session in sessions if session.start_time is not None),
+        key=lambda session: (session.start_time, session.entity_id or 0)
+    )
+    return [
+        {
+            "session_id": session.id,
+            "session_title": session.title,
+            "priority": session.priority,
+            "entity_id": session.entity_id,
+            "venue": rooms[session.entity_id].name if session.entity_id in rooms else None,
+            "start_time": session.start_time,
+            "end_time": session.end_time
+        }
+        for session in scheduled
+    ]
+
+@router.post("/{event_id}/generate-schedule")
+async def generate_schedule(
+    event_id: int,
+    options: Optional[ScheduleOptions] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Place the event's sessions into its rooms within the event's time range.
+    
+    Higher priority sessions are placed first; sessions that do not fit are
+    listed with the reason.
+    """
+    event = await _get_owned_event(event_id, db, current_user, "update")
+    options = options or ScheduleOptions()
+    if (options.work_start_hour or 0) >= (options.work_end_hour or 24):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Working hours must start before they end"
+        )
+    
+    sessions = (await db.scalars(select(EventSession).filter(EventSession.event_id == event_id))).all()
+    entities = (await db.scalars(select(Entity).filter(Entity.event_id == event_id))).all()
+    rooms = {entity.id: entity for entity in entities if (entity.entity_type or "").lower() in SPACE_ENTITY_TYPES}
+    
+    # CPU-bound; keep it off the event loop
+    placements, unscheduled = await run_in_threadpool(
+        solve_sessions,
+        [SessionSpec(session.id, session.duration, session.priority, session.attendees) for session in sessions],
+        [RoomSpec(room.id, room.capacity) for room in rooms.values()],
+        event.start_time,
+        event.end_time,
+        options.slot_minutes,
+        options.work_start_hour,
+        options.work_end_hour
+    )
+    
+    placed = {placement.session_id: placement for placement in placements}
+    for session in sessions:
+        placement = placed.get(session.id)
+        session.entity_id = placement.room_id if placement else None
+        session.start_time = placement.start_time if placement else None
+        session.end_time = placement.end_time if placement else None
+    await db.commit()
+    
+    titles = {session.id: session.title for session in sessions}
+    return {
+        "schedule": _schedule_items(sessions, rooms),
+        "unscheduled": [
+            {"session_id": session_id, "session_title": titles[session_id], "reason": reason}
+            for session_id, reason in unscheduled.items()
+        ],
+        "summary": {
+            "sessions": len(sessions),
+            "rooms": len(rooms),
+            "scheduled": len(placements),
+            "unscheduled": len(unscheduled)
+        }
+    }
+
+@router.get("/{event_id}/schedule")
+async def get_schedule(
+    event_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the last generated schedule of an event
+    """
+    await _get_owned_event(event_id, db, current_user, "access")
+    
+    sessions = (await db.scalars(select(EventSession).filter(EventSession.event_id == event_id))).all()
+    entities = (await db.scalars(select(Entity).filter(Entity.event_id == event_id))).all()
+    
+    return {"schedule": _schedule_items(sessions, {entity.id: entity for entity in entities})}
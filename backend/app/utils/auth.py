@@ -9,8 +9,13 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime, timedelta
 from typing import Optional
 import os
+import time
+from sqlalchemy import event as sa_event, select
 from sqlalchemy.orm import Session
-from app.models.database import User, get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.database import User, get_async_db
+from app.utils.cache import TTLCache
+from app.utils.worker_pool import BoundedWorkerPool
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -22,6 +27,34 @@ ACCESS_TOKEN_EXPIRE_DAYS = 30
 
 security = HTTPBearer()
 
+# bcrypt costs ~250 ms of CPU, so it runs on a small dedicated pool instead of the event loop
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_POOL_MAX_QUEUE = int(os.getenv("PASSWORD_POOL_MAX_QUEUE", "64"))
+
+password_pool = BoundedWorkerPool("password-hash", PASSWORD_POOL_WORKERS, PASSWORD_POOL_MAX_QUEUE)
+
+# Verified token -> user snapshot, so authenticated requests skip the users query.
+# Changes committed through this process's sessions evict the snapshot at once;
+# a user deactivated or deleted by another worker (or outside the ORM) stays
+# authenticated there until the snapshot expires, so the TTL bounds that window.
+# Set AUTH_CACHE_TTL_SECONDS=0 to read the user on every request.
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "10"))
+
+principal_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL_SECONDS)
+
+class CachedUser:
+    """Read-only snapshot of the User columns routes read from current_user"""
+    
+    __slots__ = ("id", "email", "username", "full_name", "is_active", "created_at")
+    
+    def __init__(self, user: User):
+        for field in self.__slots__:
+            object.__setattr__(self, field, getattr(user, field))
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("CachedUser is read-only")
+
 def hash_password(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
@@ -30,6 +63,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the password pool; raises 503 when the pool is saturated"""
+    return await password_pool.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password pool; raises 503 when the pool is saturated"""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -44,9 +85,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     
     return encoded_jwt
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get current authenticated user"""
     token = credentials.credentials
@@ -66,12 +107,50 @@ def get_current_user(
             detail="Invalid token"
         )
     
-    user = db.query(User).filter(User.email == email).first()
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
     
-    if user is None:
+    db_user = await db.scalar(select(User).filter(User.email == email))
+    
+    if db_user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
+    if not db_user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is disabled"
+        )
+    
+    # Never keep a snapshot past the token's own expiry
+    user = CachedUser(db_user)
+    expires_in = payload.get("exp", 0) - time.time()
+    principal_cache.set(token, user, ttl=expires_in)
+    
     return user
+
+def invalidate_cached_user(user_id: int):
+    """Drop every cached snapshot of a user"""
+    principal_cache.discard_where(lambda token, user: user.id == user_id)
+
+_CHANGED_USERS_KEY = "changed_user_ids"
+
+@sa_event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    """Remember users updated or deleted in this transaction"""
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            session.info.setdefault(_CHANGED_USERS_KEY, set()).add(obj.id)
+
+@sa_event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    """Evict snapshots of users changed (for example deactivated) by the committed transaction"""
+    for user_id in session.info.pop(_CHANGED_USERS_KEY, ()):
+        invalidate_cached_user(user_id)
+
+@sa_event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop(_CHANGED_USERS_KEY, None)
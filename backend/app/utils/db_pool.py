@@ -0,0 +1,73 @@
+"""
+Connection pool instrumentation
+"""
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from collections import deque
+from typing import Dict
+import threading
+import time
+
+class PoolMetrics:
+    """Checkout latency and timeout counters for one connection pool"""
+    
+    def __init__(self, max_overflow: int = 0, window: int = 1024):
+        self.max_overflow = max_overflow
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)  # latest checkout waits, for percentiles
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def record(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._recent.append(wait)
+    
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+    
+    def stats(self, pool) -> Dict:
+        """Counters plus the pool's current occupancy"""
+        with self._lock:
+            recent = sorted(self._recent)
+            stats = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_checkout_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "p95_checkout_ms": round(recent[min(int(len(recent) * 0.95), len(recent) - 1)] * 1000, 3) if recent else 0.0,
+                "max_checkout_ms": round(self.max_wait * 1000, 3)
+            }
+        
+        if hasattr(pool, "checkedout"):
+            capacity = pool.size() + max(self.max_overflow, 0)
+            stats.update({
+                "pool_size": pool.size(),
+                "max_overflow": self.max_overflow,
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "utilization": round(pool.checkedout() / capacity, 3) if capacity else 0.0
+            })
+        return stats
+
+def timed_pool_class(base, metrics: PoolMetrics):
+    """
+    Subclass a queue pool class so every checkout is timed into metrics.
+    
+    The subclass survives engine.dispose(), which recreates the pool from its class.
+    """
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = base.connect(self)
+        except PoolTimeoutError:
+            metrics.record_timeout()
+            raise
+        metrics.record(time.perf_counter() - started)
+        return connection
+    
+    return type(f"Timed{base.__name__}", (base,), {"connect": connect, "metrics": metrics})
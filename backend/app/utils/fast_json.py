@@ -0,0 +1,45 @@
+"""
+JSON encoding for large responses built from plain column values
+"""
+
+from fastapi import Response
+from sqlalchemy.orm import Session
+from datetime import date, datetime
+from typing import Any, List
+import json
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library encoder is used instead
+    orjson = None
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(value: Any) -> bytes:
+    """
+    Compact UTF-8 JSON, with datetimes in ISO 8601 like pydantic writes them.
+    
+    Nothing is validated: the value must already hold only dicts, lists,
+    strings, numbers, booleans, None and naive datetimes.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(Response):
+    """Response encoded with dumps, skipping FastAPI's response model validation"""
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def column_rows(db: Session, statement) -> List[dict]:
+    """Rows of a column SELECT as dicts keyed by column name, without loading ORM objects"""
+    # On the connection, so the ORM's result processing is skipped as well
+    result = db.connection().execute(statement)
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
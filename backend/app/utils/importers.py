@@ -0,0 +1,167 @@
+"""
+Streaming parsers for bulk event imports
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import codecs
+import json
+import re
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """
+    Split a stream of UTF-8 byte chunks into lines ending in "\\n", as a file would.
+    
+    Only the unfinished last line is held back, so a body is parsed as it
+    arrives; invalid bytes become replacement characters.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    partial = []
+    for chunk in chunks:
+        *lines, tail = decoder.decode(chunk).split("\n")
+        if lines:
+            lines[0] = "".join(partial) + lines[0]
+            partial.clear()
+            for line in lines:
+                yield line + "\n"
+        if tail:
+            partial.append(tail)
+    
+    last = "".join(partial) + decoder.decode(b"", final=True)
+    if last:
+        yield last
+
+# Each parser yields (line_number, record, error); exactly one of record/error is set
+
+def iter_ndjson(lines: Iterable[str]) -> Iterator[Tuple[int, Dict, str]]:
+    """Parse newline-delimited JSON, one event object per line"""
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, record, None
+
+def _unfold(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """Join folded iCalendar content lines (continuations start with a space or tab)"""
+    current = None
+    current_number = 0
+    for line_number, line in enumerate(lines, start=1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current_number, current
+        current, current_number = line, line_number
+    if current is not None:
+        yield current_number, current
+
+def _unescape_text(value: str) -> str:
+    """Undo iCalendar TEXT escaping"""
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+def _parse_ics_datetime(value: str, params: Dict[str, str]) -> datetime:
+    """Parse a DTSTART/DTEND value into a naive UTC datetime"""
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d")
+    
+    if value.endswith("Z"):
+        return datetime.strptime(value[:-1], "%Y%m%dT%H%M%S")
+    
+    moment = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    if "TZID" in params:
+        try:
+            zone = ZoneInfo(params["TZID"].strip('"'))
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown TZID {params['TZID']}")
+        moment = moment.replace(tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+def _parse_ics_duration(value: str) -> timedelta:
+    """Parse an iCalendar DURATION such as PT1H30M or P1D"""
+    match = re.fullmatch(
+        r"([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?", value
+    )
+    if not match:
+        raise ValueError(f"Invalid DURATION {value}")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = timedelta(
+        weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0),
+        minutes=int(minutes or 0), seconds=int(seconds or 0)
+    )
+    return -duration if sign == "-" else duration
+
+def iter_ics(lines: Iterable[str], default_event_type: str = "custom") -> Iterator[Tuple[int, Dict, str]]:
+    """Parse VEVENT components from an iCalendar stream into event records"""
+    properties = None
+    begin_line = 0
+    nested = 0  # depth of sub-components such as VALARM inside the current VEVENT
+    
+    for line_number, line in _unfold(lines):
+        if not line:
+            continue
+        name_part, _, value = line.partition(":")
+        name, *raw_params = name_part.split(";")
+        name = name.upper()
+        params = {}
+        for raw in raw_params:
+            key, _, param_value = raw.partition("=")
+            params[key.upper()] = param_value
+        
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            properties, begin_line, nested = {}, line_number, 0
+        elif properties is None:
+            continue
+        elif name == "BEGIN":
+            nested += 1
+        elif name == "END" and nested:
+            nested -= 1
+        elif name == "END" and value.upper() == "VEVENT":
+            yield _vevent_to_record(begin_line, properties, default_event_type)
+            properties = None
+        elif not nested and name not in properties:
+            properties[name] = (value, params)
+
+def _vevent_to_record(line_number: int, properties: Dict, default_event_type: str) -> Tuple[int, Dict, str]:
+    """Map VEVENT properties onto EventCreate fields"""
+    try:
+        if "DTSTART" not in properties:
+            raise ValueError("VEVENT has no DTSTART")
+        start_time = _parse_ics_datetime(*properties["DTSTART"])
+        
+        if "DTEND" in properties:
+            end_time = _parse_ics_datetime(*properties["DTEND"])
+        elif "DURATION" in properties:
+            end_time = start_time + _parse_ics_duration(properties["DURATION"][0])
+        elif properties["DTSTART"][1].get("VALUE") == "DATE" or len(properties["DTSTART"][0]) == 8:
+            end_time = start_time + timedelta(days=1)
+        else:
+            raise ValueError("VEVENT has neither DTEND nor DURATION")
+    except ValueError as exc:
+        return line_number, None, str(exc)
+    
+    def text(name):
+        return _unescape_text(properties[name][0]) if name in properties else None
+    
+    categories = text("CATEGORIES")
+    event_type = text("X-CHRONOAI-EVENT-TYPE") or (categories.split(",")[0].strip().lower() if categories else None)
+    
+    record = {
+        "title": text("SUMMARY") or "Untitled event",
+        "description": text("DESCRIPTION"),
+        "location": text("LOCATION"),
+        "start_time": start_time,
+        "end_time": end_time,
+        "event_type": event_type or default_event_type,
+        "recurrence_rule": properties["RRULE"][0] if "RRULE" in properties else None
+    }
+    return line_number, record, None
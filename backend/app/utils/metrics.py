@@ -0,0 +1,202 @@
+"""
+In-process metrics exposed in the Prometheus text format
+"""
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List, Optional, Sequence, Tuple
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """A metric family; one series per distinct tuple of label values"""
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+    
+    def _new_series(self):
+        raise NotImplementedError
+    
+    def labels(self, *values: str):
+        """The series for these label values, created on first use"""
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(values, self._new_series())
+        return series
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, series in sorted(self._series.items()):
+            lines.extend(self._render_series(values, series))
+        return lines
+
+class _Value:
+    __slots__ = ("value", "lock")
+    
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0):
+        with self.lock:
+            self.value += amount
+    
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+class Counter(_Metric):
+    kind = "counter"
+    
+    def _new_series(self):
+        return _Value()
+    
+    def _render_series(self, values, series):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_number(series.value)}"]
+
+class Gauge(_Metric):
+    kind = "gauge"
+    
+    def _new_series(self):
+        return _Value()
+    
+    def _render_series(self, values, series):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_number(series.value)}"]
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "total", "count", "lock")
+    
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last one is +Inf
+        self.total = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+    
+    def observe(self, value: float):
+        position = bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[position] += 1
+            self.total += value
+            self.count += 1
+
+class Histogram(_Metric):
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def _new_series(self):
+        return _Buckets(self.buckets)
+    
+    def _render_series(self, values, series):
+        with series.lock:
+            counts = list(series.counts)
+            total, count = series.total, series.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_number(float(bound))}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class MetricsRegistry:
+    """The metrics of this process, rendered together for a scrape"""
+    
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+    
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+    
+    def counter(self, *args, **kwargs) -> Counter:
+        return self.register(Counter(*args, **kwargs))
+    
+    def gauge(self, *args, **kwargs) -> Gauge:
+        return self.register(Gauge(*args, **kwargs))
+    
+    def histogram(self, *args, **kwargs) -> Histogram:
+        return self.register(Histogram(*args, **kwargs))
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status code", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Time until the response headers were ready", ("method", "route")
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress", "Requests currently being handled", ("method",)
+)
+db_queries_per_request = registry.histogram(
+    "db_queries_per_request", "SQL statements run per request", ("route",), buckets=QUERY_COUNT_BUCKETS
+)
+db_query_time_per_request = registry.histogram(
+    "db_query_seconds_per_request", "Time spent executing SQL per request", ("route",)
+)
+engine_span_duration = registry.histogram(
+    "engine_span_duration_seconds", "Time spent in scheduling engine calls", ("span",)
+)
+
+@contextmanager
+def span(name: str):
+    """Record how long the block takes under engine_span_duration_seconds{span=name}"""
+    series = engine_span_duration.labels(name)
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        series.observe(time.perf_counter() - began)
+
+def timed(name: Optional[str] = None):
+    """Decorator recording each call of the function as a span"""
+    def decorate(func):
+        series = engine_span_duration.labels(name or func.__name__)
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            began = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                series.observe(time.perf_counter() - began)
+        
+        return wrapper
+    return decorate
@@ -0,0 +1,80 @@
+"""
+Per-request SQL query counting and query budgets
+"""
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from fastapi import Request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+import time
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block of code runs more queries than it is allowed"""
+
+class QueryCounter:
+    """Counts SQL statements executed while it is active, and the time they took"""
+    
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0  # seconds
+        self.budget: Optional[int] = None
+    
+    def exceeded(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+_current_counter: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    """Attribute every statement to the active counter, if any"""
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.count += 1
+        context._query_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _time_query(conn, cursor, statement, parameters, context, executemany):
+    """Add the statement's execution time to the active counter"""
+    counter = _current_counter.get()
+    started = getattr(context, "_query_started", None)
+    if counter is not None and started is not None:
+        counter.elapsed += time.perf_counter() - started
+
+def start_counting() -> QueryCounter:
+    """Start counting queries in the current context (and tasks/threads spawned from it)"""
+    counter = QueryCounter()
+    _current_counter.set(counter)
+    return counter
+
+@contextmanager
+def count_queries():
+    """Count the queries run inside the block"""
+    counter = QueryCounter()
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Fail if the block runs more than `limit` queries; for tests"""
+    with count_queries() as counter:
+        yield counter
+    if counter.count > limit:
+        raise QueryBudgetExceeded(f"Expected at most {limit} queries, ran {counter.count}")
+
+def query_budget(limit: int):
+    """
+    Route dependency declaring how many queries a request may run, including
+    the authentication lookup. Only enforced when the query budget middleware
+    is installed (debug mode).
+    """
+    def set_budget(request: Request):
+        counter = getattr(request.state, "query_counter", None)
+        if counter is not None:
+            counter.budget = limit
+    
+    return set_budget
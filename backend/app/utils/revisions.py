@@ -0,0 +1,120 @@
+"""
+Per-owner calendar revisions shared between worker processes
+"""
+
+from sqlalchemy import select, update, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.database import CalendarRevision
+from datetime import datetime
+from typing import Dict, Iterable
+import os
+import threading
+
+# "database" shares revisions between workers through the calendar_revisions
+# table; "memory" is a process-local stand-in for single-worker deployments
+CALENDAR_REVISION_BACKEND = os.getenv("CALENDAR_REVISION_BACKEND", "database").lower()
+
+class RevisionBackend:
+    """
+    Source of each owner's calendar revision.
+    
+    Caches tag what they build with the revision they read first and treat
+    the entry as stale once the revision moves on. Transactional backends
+    bump inside the writing transaction, so a new revision becomes visible
+    exactly when the change does; the others bump after the commit.
+    """
+    
+    transactional = False
+    
+    def current(self, owner_id: int, db: Session) -> int:
+        raise NotImplementedError
+    
+    def current_many(self, owner_ids: Iterable[int], db: Session) -> Dict[int, int]:
+        """Revisions of several owners"""
+        return {owner_id: self.current(owner_id, db) for owner_id in owner_ids}
+    
+    def bump(self, owner_ids: Iterable[int], db: Session = None) -> Dict[int, int]:
+        """Advance the owners' revisions by one; returns the new revisions"""
+        raise NotImplementedError
+
+class MemoryRevisionBackend(RevisionBackend):
+    """Revisions in a dict; only coherent within a single process"""
+    
+    def __init__(self):
+        self._revisions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+    
+    def current(self, owner_id: int, db: Session = None) -> int:
+        return self._revisions.get(owner_id, 0)
+    
+    def bump(self, owner_ids: Iterable[int], db: Session = None) -> Dict[int, int]:
+        with self._lock:
+            for owner_id in owner_ids:
+                self._revisions[owner_id] = self._revisions.get(owner_id, 0) + 1
+            return {owner_id: self._revisions[owner_id] for owner_id in owner_ids}
+
+class DatabaseRevisionBackend(RevisionBackend):
+    """Revisions in the calendar_revisions table: one primary key lookup per check"""
+    
+    transactional = True
+    
+    def current(self, owner_id: int, db: Session) -> int:
+        revision = db.connection().execute(
+            select(CalendarRevision.revision).where(CalendarRevision.owner_id == owner_id)
+        ).scalar()
+        return revision or 0
+    
+    def current_many(self, owner_ids: Iterable[int], db: Session) -> Dict[int, int]:
+        owner_ids = list(owner_ids)
+        revisions = dict.fromkeys(owner_ids, 0)
+        connection = db.connection()
+        for offset in range(0, len(owner_ids), 500):
+            revisions.update(connection.execute(
+                select(CalendarRevision.owner_id, CalendarRevision.revision).where(
+                    CalendarRevision.owner_id.in_(owner_ids[offset:offset + 500])
+                )
+            ).all())
+        return revisions
+    
+    def bump(self, owner_ids: Iterable[int], db: Session = None) -> Dict[int, int]:
+        # Core statements on the session's connection: bumps run from flush hooks
+        connection = db.connection()
+        table = CalendarRevision.__table__
+        now = datetime.utcnow()
+        dialect = connection.dialect.name
+        
+        revisions = {}
+        # A fixed lock order keeps concurrent multi-owner bumps from deadlocking
+        for owner_id in sorted(set(owner_ids)):
+            if dialect in ("sqlite", "postgresql"):
+                upsert = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(table).values(
+                    owner_id=owner_id, revision=1, updated_at=now
+                )
+                revisions[owner_id] = connection.execute(
+                    upsert.on_conflict_do_update(
+                        index_elements=[table.c.owner_id],
+                        set_={"revision": table.c.revision + 1, "updated_at": now}
+                    ).returning(table.c.revision)
+                ).scalar()
+                continue
+            
+            updated = connection.execute(
+                update(table).where(table.c.owner_id == owner_id).values(
+                    revision=table.c.revision + 1, updated_at=now
+                )
+            )
+            if updated.rowcount == 0:
+                connection.execute(insert(table).values(owner_id=owner_id, revision=1, updated_at=now))
+            revisions[owner_id] = self.current(owner_id, db)
+        return revisions
+
+def create_revision_backend(name: str = CALENDAR_REVISION_BACKEND) -> RevisionBackend:
+    """Backend by name, as configured with CALENDAR_REVISION_BACKEND"""
+    if name == "memory":
+        return MemoryRevisionBackend()
+    if name == "database":
+        return DatabaseRevisionBackend()
+    raise ValueError(f"Unknown calendar revision backend {name}")
+
+revision_backend = create_revision_backend()
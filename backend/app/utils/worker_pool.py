@@ -0,0 +1,87 @@
+"""
+Bounded worker pool for CPU-heavy calls made from async routes
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from typing import Callable, Dict
+import asyncio
+import threading
+import time
+
+class BoundedWorkerPool:
+    """
+    Thread pool with a cap on queued work.
+    
+    Calls beyond max_workers running plus max_queue waiting are rejected
+    immediately with a 503 instead of piling up behind a saturated pool.
+    """
+    
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+    
+    async def run(self, func: Callable, *args):
+        """Run func(*args) on the pool without blocking the event loop"""
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server busy, please retry",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+        
+        submitted = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._timed, func, args, submitted
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+    
+    def _timed(self, func: Callable, args: tuple, submitted: float):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            self._wait_seconds += started - submitted
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._run_seconds += time.perf_counter() - started
+    
+    def stats(self) -> Dict:
+        """Saturation and latency counters"""
+        with self._lock:
+            completed = self._completed
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": max(self._pending - self._running, 0),
+                "peak_pending": self._peak_pending,
+                "utilization": round(self._running / self.max_workers, 3),
+                "completed": completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_seconds / completed * 1000, 2) if completed else 0.0,
+                "avg_run_ms": round(self._run_seconds / completed * 1000, 2) if completed else 0.0
+            }
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
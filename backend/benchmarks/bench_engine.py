@@ -0,0 +1,239 @@
+"""
+Micro-benchmarks for scheduler_core and constraint_engine
+
+Run from the backend directory:
+    python -m benchmarks.bench_engine [--sizes 1000,10000,100000] [--output results.json]
+    python -m benchmarks.bench_engine --baseline results.json [--threshold 0.35]
+
+Each calendar pattern and size is loaded into a fresh in-memory SQLite
+database. With --baseline the run is compared against an earlier JSON result
+and the exit status is 1 if any benchmark got slower than the threshold and
+its measured noise allow.
+
+The default sizes stop at 100k events to keep local runs short. CI must
+cover the 1M calendars too, with both the baseline and the checked run using:
+    python -m benchmarks.bench_engine --sizes 1000,10000,100000,1000000 --runs 50
+"""
+
+from app.engine import scheduler_core
+from app.engine.interval_index import interval_indexes
+from app.engine.constraint_engine import ConstraintValidator
+from app.models.database import Event
+from benchmarks.calendars import PATTERNS, generate_calendar, calendar_span, load_database
+from datetime import datetime, timedelta
+from typing import Optional
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+# The machine's speed drifts by up to 2x between and within runs on shared
+# hardware, so every sample is paired with a fixed reference workload and
+# benchmarks are compared by their median relative to it. On six identical
+# 50-run passes that cut the median spread between runs from 65% to 30%.
+# Pairs of identical passes still differ by up to 34% relative, hence the
+# default threshold. A benchmark also only counts as slower when its median
+# moved by more than NOISE_FLOOR_MS and NOISE_MADS times the two runs' median
+# absolute deviations.
+DEFAULT_THRESHOLD = 0.35
+NOISE_FLOOR_MS = 0.05
+NOISE_MADS = 3
+# Fewest timed calls for the slower benchmarks, and fewest --runs accepted with
+# --baseline, for a median that holds still between identical runs
+MIN_SAMPLES = 15
+MIN_COMPARE_RUNS = 30
+BUILD_SAMPLES = 5
+# Suspected regressions are measured again this many times, keeping the
+# fastest measurement, and only count if they survive every attempt
+CONFIRM_ATTEMPTS = 2
+
+def _probes(entries, count: int, seed: int = 11):
+    """New, unsaved events shaped like the calendar's own, at random places in it"""
+    rng = random.Random(seed)
+    samples = rng.sample(entries, min(count, len(entries)))
+    shift = timedelta(minutes=15 * rng.randint(-8, 8))
+    return [
+        Event(owner_id=1, start_time=entry.start_time + shift, end_time=entry.end_time + shift)
+        for entry in samples
+    ]
+
+_REFERENCE_DATA = [random.Random(3).random() for _ in range(2000)]
+
+def _reference_work():
+    """Fixed pure Python work timed next to every sample, to factor out how busy the machine is"""
+    return {value: position for position, value in enumerate(sorted(_REFERENCE_DATA))}
+
+def bench_calendar(pattern: str, size: int, runs: int) -> dict:
+    """Time the engine entry points on one calendar; returns {benchmark: {median_ms, p95_ms, mad_ms, samples, relative}}"""
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    entries = generate_calendar(pattern, size, now - timedelta(days=max(size // 32, 1)))
+    db = load_database(entries)
+    probes = _probes(entries, 64)
+    results = {}
+    
+    def record(name, fn, repeat=runs):
+        # One untimed call first, so lazily built caches do not land in the samples
+        fn()
+        samples, reference = [], []
+        for _ in range(repeat):
+            began = time.perf_counter()
+            fn()
+            middle = time.perf_counter()
+            _reference_work()
+            samples.append((middle - began) * 1000)
+            reference.append((time.perf_counter() - middle) * 1000)
+        samples.sort()
+        median = statistics.median(samples)
+        results[name] = {
+            "median_ms": round(median, 4),
+            "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 4),
+            "mad_ms": round(statistics.median(abs(sample - median) for sample in samples), 4),
+            "samples": len(samples),
+            "relative": round(median / statistics.median(reference), 4)
+        }
+    
+    cycle = iter(range(10 ** 9))
+    
+    def next_probe():
+        return probes[next(cycle) % len(probes)]
+    
+    def rebuild():
+        interval_indexes.invalidate()
+        return interval_indexes.get(1, db)
+    
+    record("interval_index_build", rebuild, repeat=BUILD_SAMPLES)
+    index = interval_indexes.get(1, db)
+    
+    scheduler_core.USE_INTERVAL_INDEX = True
+    record("check_conflicts[index]", lambda: scheduler_core.check_conflicts(next_probe(), db))
+    scheduler_core.USE_INTERVAL_INDEX = False
+    record("check_conflicts[sql]", lambda: scheduler_core.check_conflicts(next_probe(), db))
+    scheduler_core.USE_INTERVAL_INDEX = True
+    
+    # The naive linear scan the interval index replaced, kept as a reference point
+    def overlap_scan():
+        probe = next_probe()
+        return sum(1 for other in entries if scheduler_core.has_time_overlap(probe, other))
+    
+    record("has_time_overlap_scan", overlap_scan, repeat=max(runs // 10, MIN_SAMPLES))
+    
+    pairs = list(zip(entries, entries[1:]))[:10000]
+    record(
+        "calculate_conflict_severity_x10k",
+        lambda: [scheduler_core.calculate_conflict_severity(first, second) for first, second in pairs],
+        repeat=max(runs // 10, MIN_SAMPLES)
+    )
+    
+    record("find_optimal_time_slot", lambda: scheduler_core.find_optimal_time_slot(next_probe(), db))
+    
+    validator = ConstraintValidator()
+    validator.add_constraint("duration", {"min_minutes": 15, "max_minutes": 240})
+    validator.add_constraint("time_window", {"start_hour": 8, "end_hour": 20})
+    validator.add_constraint("no_conflicts", {"index": index})
+    record("validate_event", lambda: validator.validate_event(next_probe()))
+    record("validate_many_x64", lambda: validator.validate_many(probes), repeat=max(runs // 10, MIN_SAMPLES))
+    
+    first, last = calendar_span(entries)
+    results["calendar"] = {"events": size, "days": (last - first).days + 1}
+    db.close()
+    return results
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Benchmarks that got slower by more than the threshold fraction and the noise, as (key, before, after, change).
+    
+    change is the growth of the median relative to the reference workload;
+    results written before that was recorded are compared by raw median.
+    """
+    regressions = []
+    for key, result in current.items():
+        earlier = baseline.get(key, {})
+        before = earlier.get("median_ms")
+        after = result.get("median_ms")
+        if before is None or after is None:
+            continue
+        if "relative" in earlier and "relative" in result:
+            change = result["relative"] / earlier["relative"] - 1
+        else:
+            change = after / before - 1
+        noise = max(NOISE_FLOOR_MS, NOISE_MADS * (earlier.get("mad_ms", 0) + result.get("mad_ms", 0)))
+        if change > threshold and after - before > noise:
+            regressions.append((key, before, after, change))
+    return regressions
+
+def run_suite(patterns: list, sizes: list, runs: int, only: Optional[set] = None) -> dict:
+    """Results of every pattern and size, or only the (pattern, size) pairs given, keyed pattern/size/benchmark"""
+    flat = {}
+    for pattern in patterns:
+        for size in sizes:
+            if only is not None and (pattern, str(size)) not in only:
+                continue
+            print(f"{pattern}, {size} events")
+            for name, result in bench_calendar(pattern, size, runs).items():
+                flat[f"{pattern}/{size}/{name}"] = result
+                if "median_ms" in result:
+                    p95 = f"   p95 {result['p95_ms']:10.3f} ms" if "p95_ms" in result else ""
+                    print(f"  {name:<34} median {result['median_ms']:10.3f} ms{p95}")
+    return flat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma separated; up to 1000000")
+    parser.add_argument("--patterns", default=",".join(PATTERNS))
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, as a fraction")
+    args = parser.parse_args()
+    if args.baseline and args.runs < MIN_COMPARE_RUNS:
+        parser.error(f"--baseline needs --runs {MIN_COMPARE_RUNS} or more for stable medians")
+    
+    sizes = [int(size) for size in args.sizes.split(",")]
+    patterns = args.patterns.split(",")
+    
+    flat = run_suite(patterns, sizes, args.runs)
+    
+    report = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": args.runs
+        },
+        "results": flat
+    }
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Results written to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)["results"]
+        regressions = compare(flat, baseline, args.threshold)
+        for _ in range(CONFIRM_ATTEMPTS):
+            if not regressions:
+                break
+            suspects = sorted({tuple(key.split("/")[:2]) for key, *_ in regressions})
+            print(f"Measuring {len(suspects)} calendars again to confirm {len(regressions)} suspected regressions")
+            for key, result in run_suite(
+                list(dict.fromkeys(pattern for pattern, _ in suspects)),
+                sorted({int(size) for _, size in suspects}),
+                args.runs,
+                only=set(suspects)
+            ).items():
+                # The faster of the measurements is the one least disturbed by other load
+                if "relative" in result and result["relative"] < flat[key]["relative"]:
+                    flat[key] = result
+            regressions = compare(flat, baseline, args.threshold)
+        for key, before, after, change in regressions:
+            print(f"REGRESSION {key}: {before:.3f} ms -> {after:.3f} ms ({change:+.0%} against the reference workload)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark for the /api/events/list response: ORM objects and the response model against fast=true
+
+Run from the backend directory:
+    python -m benchmarks.bench_serialization [--sizes 1000,10000,100000] [--runs 5]
+
+Each size is one page holding the whole calendar, with a conflict stored for
+every overlapping pair of neighbours. The standard path is what FastAPI does
+for the route: load Event objects with their conflicts, validate them against
+List[EventWithConflicts] and encode the result with JSONResponse.
+"""
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import insert
+from app.models.database import Conflict
+from app.models.schemas import EventWithConflicts
+from app.routes.events import _list_events_query, _fast_event_page
+from app.utils import fast_json
+from benchmarks.calendars import generate_calendar, load_database
+from benchmarks.bench_slot_finder import time_call
+from datetime import datetime, timedelta
+from typing import List
+import argparse
+import asyncio
+
+def _store_conflicts(db, entries) -> int:
+    """Conflict rows for neighbouring events that overlap, as sync_event_conflicts would store them"""
+    ordered = sorted(entries, key=lambda entry: entry.start_time)
+    rows = [
+        {
+            "event_id": first.id,
+            "conflict_with_event_id": second.id,
+            "conflict_type": "time_overlap",
+            "severity": "medium",
+            "created_at": datetime(2026, 1, 1)
+        }
+        for first, second in zip(ordered, ordered[1:])
+        if second.start_time < first.end_time
+    ]
+    if rows:
+        db.execute(insert(Conflict), rows)
+        db.commit()
+    return len(rows)
+
+def bench_size(size: int, runs: int) -> dict:
+    entries = generate_calendar("uniform", size, datetime(2026, 1, 5, 8, 0) - timedelta(days=size // 32))
+    db = load_database(entries)
+    conflicts = _store_conflicts(db, entries)
+    field = create_response_field(name="Response_list_events", type_=List[EventWithConflicts])
+    
+    def standard():
+        db.expunge_all()
+        events = db.scalars(_list_events_query(1, None, None, None).limit(size + 1)).all()
+        content = asyncio.run(serialize_response(field=field, response_content=events))
+        return JSONResponse(content).body
+    
+    def fast():
+        rows = _fast_event_page(db, 1, None, None, None, size)
+        return fast_json.FastJSONResponse(rows).body
+    
+    def standard_query():
+        db.expunge_all()
+        return db.scalars(_list_events_query(1, None, None, None).limit(size + 1)).all()
+    
+    assert standard() == fast(), "fast path output differs from the response model's"
+    results = {"conflicts": conflicts}
+    for name, fn in (
+        ("standard", standard), ("fast", fast),
+        ("standard_query_only", standard_query), ("fast_query_only", lambda: _fast_event_page(db, 1, None, None, None, size))
+    ):
+        results[name] = time_call(fn, runs)
+    db.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    
+    encoder = "orjson" if fast_json.orjson is not None else "json (orjson not installed)"
+    print(f"Fast path encoder: {encoder}, {args.runs} runs")
+    for size in (int(size) for size in args.sizes.split(",")):
+        results = bench_size(size, args.runs)
+        print(f"{size} events, {results['conflicts']} conflicts")
+        for name in ("standard", "fast", "standard_query_only", "fast_query_only"):
+            median, p95 = results[name]
+            print(f"  {name:<20} median {median:10.3f} ms   p95 {p95:10.3f} ms")
+        print(f"  speedup {results['standard'][0] / results['fast'][0]:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark for the bitset session and room solver
+
+Run from the backend directory:
+    python -m benchmarks.bench_session_solver [--sessions 1000] [--rooms 50]
+"""
+
+from app.engine.session_solver import SessionSpec, RoomSpec, solve_sessions
+from datetime import datetime, timedelta
+import argparse
+import random
+import time
+
+def generate_conference(sessions: int, rooms: int, seed: int = 7):
+    """Sessions of 30 to 120 minutes with priorities 1-3 and audiences sized to a mix of rooms"""
+    rng = random.Random(seed)
+    room_specs = [RoomSpec(room_id, rng.choice([30, 60, 120, 300, 1000])) for room_id in range(rooms)]
+    session_specs = [
+        SessionSpec(
+            session_id,
+            rng.choice([30, 45, 60, 90, 120]),
+            rng.randint(1, 3),
+            rng.choice([None, 20, 50, 100, 250])
+        )
+        for session_id in range(sessions)
+    ]
+    return session_specs, room_specs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--slot-minutes", type=int, default=15)
+    args = parser.parse_args()
+    
+    sessions, rooms = generate_conference(args.sessions, args.rooms)
+    start = datetime(2026, 6, 1)
+    end = start + timedelta(days=args.days)
+    
+    print(f"{args.sessions} sessions, {args.rooms} rooms, {args.days} days of {args.slot_minutes} minute slots")
+    for label, hours in (("09:00-18:00 daily", (9, 18)), ("round the clock", (None, None))):
+        began = time.perf_counter()
+        placements, unscheduled = solve_sessions(
+            sessions, rooms, start, end, args.slot_minutes, work_start_hour=hours[0], work_end_hour=hours[1]
+        )
+        elapsed = (time.perf_counter() - began) * 1000
+        print(f"  {label:<20} {elapsed:8.1f} ms   {len(placements)} placed, {len(unscheduled)} unscheduled")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark for the sweep-line free slot finder
+
+Run from the backend directory:
+    python -m benchmarks.bench_slot_finder [--events 50000]
+"""
+
+from app.engine.interval_index import IntervalTree, IntervalEntry
+from app.engine.slot_finder import find_free_slots
+from datetime import datetime, timedelta
+import argparse
+import random
+import statistics
+import time
+
+def generate_calendar(count: int, start: datetime, days: int, seed: int = 7) -> IntervalTree:
+    """Random events of 15 to 60 minutes between 6 AM and 10 PM spread over `days` days"""
+    rng = random.Random(seed)
+    entries = []
+    for event_id in range(count):
+        day = start + timedelta(days=rng.randrange(days))
+        begin = day.replace(hour=6, minute=0) + timedelta(minutes=15 * rng.randrange(64))
+        entries.append(IntervalEntry(event_id, begin, begin + timedelta(minutes=15 * rng.randint(1, 4))))
+    return IntervalTree(entries)
+
+def time_call(fn, runs: int):
+    """Return (median, p95) wall time in milliseconds"""
+    samples = []
+    for _ in range(runs):
+        began = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - began) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--history-days", type=int, default=10 * 365)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    
+    now = datetime(2026, 1, 5, 8, 0)
+    # Mostly history, with the last 60 days of the range in the future
+    tree = generate_calendar(args.events, now - timedelta(days=args.history_days - 60), args.history_days)
+    horizon_end = now + timedelta(days=30)
+    
+    scenarios = {
+        "earliest 5 slots": dict(limit=5),
+        "earliest 5 slots, 10 min buffer": dict(limit=5, buffer_minutes=10),
+        "top 10 near preferred start (+7d)": dict(limit=10, preferred_start=now + timedelta(days=7, hours=3)),
+        "full horizon scan (limit 10000)": dict(limit=10000, granularity_minutes=5),
+    }
+    
+    print(f"{args.events} events over {args.history_days} days, 30 day horizon, {args.runs} runs")
+    for name, options in scenarios.items():
+        def run():
+            busy = tree.overlapping(now - timedelta(hours=1), horizon_end + timedelta(hours=1))
+            return find_free_slots(busy, now, horizon_end, duration_minutes=60, **options)
+        
+        median, p95 = time_call(run, args.runs)
+        print(f"  {name:<36} median {median:7.3f} ms   p95 {p95:7.3f} ms   ({len(run())} slots)")
+
+if __name__ == "__main__":
+    main()
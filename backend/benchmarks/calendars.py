@@ -0,0 +1,72 @@
+"""
+Synthetic calendars for benchmarks, and in-memory SQLite databases holding them
+"""
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.models.database import Base, Event, User
+from app.engine.interval_index import IntervalEntry
+from datetime import datetime, timedelta
+from typing import List
+import random
+
+PATTERNS = ("uniform", "bursty", "overlapping")
+
+def generate_calendar(pattern: str, count: int, start: datetime, seed: int = 7) -> List[IntervalEntry]:
+    """
+    Events with ids 1..count from start onwards.
+    
+    uniform: about 16 events of 15 to 90 minutes a day between 6 AM and 10 PM
+    bursty: the same volume, but 80% of it packed into office hours of one day in twenty
+    overlapping: about 64 events of 1 to 8 hours a day, most of them overlapping several others
+    """
+    rng = random.Random(seed)
+    entries = []
+    if pattern == "overlapping":
+        days = max(count // 64, 1)
+        for event_id in range(1, count + 1):
+            begin = start + timedelta(days=rng.randrange(days), minutes=15 * rng.randrange(96))
+            entries.append(IntervalEntry(event_id, begin, begin + timedelta(minutes=60 * rng.randint(1, 8))))
+        return entries
+    
+    days = max(count // 16, 1)
+    burst_days = [day for day in range(days) if day % 20 == 0]
+    for event_id in range(1, count + 1):
+        if pattern == "bursty" and rng.random() < 0.8:
+            day = rng.choice(burst_days)
+            begin = start + timedelta(days=day, hours=9, minutes=15 * rng.randrange(32))
+        elif pattern in ("uniform", "bursty"):
+            begin = start + timedelta(days=rng.randrange(days), hours=6, minutes=15 * rng.randrange(64))
+        else:
+            raise ValueError(f"Unknown calendar pattern {pattern}")
+        entries.append(IntervalEntry(event_id, begin, begin + timedelta(minutes=15 * rng.randint(1, 6))))
+    return entries
+
+def calendar_span(entries: List[IntervalEntry]) -> tuple:
+    return min(entry.start_time for entry in entries), max(entry.end_time for entry in entries)
+
+def load_database(entries: List[IntervalEntry], owner_id: int = 1, batch_size: int = 10000) -> Session:
+    """Fresh in-memory SQLite database holding the calendar for one owner; returns an open session"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    
+    with engine.begin() as connection:
+        connection.execute(insert(User).values(
+            id=owner_id, email=f"bench{owner_id}@example.com", username=f"bench{owner_id}", hashed_password="-"
+        ))
+        for offset in range(0, len(entries), batch_size):
+            connection.execute(insert(Event), [
+                {
+                    "id": entry.id,
+                    "title": f"Event {entry.id}",
+                    "start_time": entry.start_time,
+                    "end_time": entry.end_time,
+                    "event_type": "workshop",
+                    "owner_id": owner_id,
+                    "is_tentative": False
+                }
+                for entry in entries[offset:offset + batch_size]
+            ])
+    
+    return sessionmaker(bind=engine, autoflush=False)()
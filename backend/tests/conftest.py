@@ -0,0 +1,71 @@
+"""
+Shared fixtures: the app on a throwaway SQLite database, with query budgets enforced
+
+Run from the backend directory:
+    python -m pytest -q tests
+"""
+
+import os
+import tempfile
+
+# Read by app.models.database and app.main at import time
+_database_dir = tempfile.mkdtemp(prefix="chronoai-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_database_dir}/chronoai.db"
+os.environ["DEBUG"] = "true"
+
+from fastapi.testclient import TestClient
+from itertools import count
+import pytest
+
+from app.main import app
+from app.models.database import SessionLocal
+
+_user_numbers = count(1)
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def make_user(client):
+    """Sign up a fresh user; returns (user id, auth headers)"""
+    def make():
+        number = next(_user_numbers)
+        response = client.post("/api/auth/signup", json={
+            "email": f"user{number}@example.com",
+            "username": f"user{number}",
+            "password": "password123",
+            "full_name": f"User {number}"
+        })
+        assert response.status_code == 200, response.text
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        # Warm the principal cache so budgets measure the route alone
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+        return response.json()["user"]["id"], headers
+    
+    return make
+
+@pytest.fixture
+def create_event(client):
+    """Create an event from ISO strings; returns the response body"""
+    def create(headers, title, start_time, end_time, **fields):
+        response = client.post("/api/events/create", headers=headers, json={
+            "title": title,
+            "start_time": start_time,
+            "end_time": end_time,
+            "event_type": "meeting",
+            **fields
+        })
+        assert response.status_code == 200, response.text
+        return response.json()
+    
+    return create
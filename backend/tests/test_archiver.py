@@ -0,0 +1,68 @@
+"""
+Archiving past events, including recurring series that have ended
+"""
+
+from sqlalchemy import select
+from app.engine.archiver import archive_events
+from app.models.database import Event
+from datetime import datetime
+
+NOW = datetime(2026, 6, 1)
+
+def _archive(db, owner_id):
+    return archive_events(db, older_than_days=30, owner_id=owner_id, now=NOW)
+
+def _hot_titles(db, owner_id):
+    return db.scalars(select(Event.title).where(Event.owner_id == owner_id).order_by(Event.title)).all()
+
+def test_finished_series_is_archived_with_its_exceptions(client, db, make_user, create_event):
+    owner_id, headers = make_user()
+    series = create_event(
+        headers, "Standup", "2026-03-02T09:00:00", "2026-03-02T09:15:00",
+        recurrence_rule="FREQ=WEEKLY;COUNT=4"
+    )
+    cancelled = client.post(f"/api/events/{series['id']}/exceptions", headers=headers, json={
+        "original_start": "2026-03-09T09:00:00", "is_cancelled": True
+    })
+    assert cancelled.status_code == 200, cancelled.text
+    create_event(headers, "Weekly", "2026-03-02T10:00:00", "2026-03-02T11:00:00", recurrence_rule="FREQ=WEEKLY")
+    create_event(
+        headers, "Still running", "2026-03-02T12:00:00", "2026-03-02T13:00:00",
+        recurrence_rule="FREQ=WEEKLY;UNTIL=20260520T000000Z"
+    )
+    
+    # Warm the cached series so the archiver has to invalidate them
+    busy = client.get("/api/events/freebusy", headers=headers, params={
+        "from": "2026-03-16T09:00:00", "to": "2026-03-16T10:00:00", "slot_minutes": 60
+    })
+    assert busy.json()["busy"] == "gA=="
+    
+    result = _archive(db, owner_id)
+    assert result["events"] == 1
+    assert _hot_titles(db, owner_id) == ["Still running", "Weekly"]
+    
+    archived, = client.get("/api/events/archive", headers=headers, params={"from": "2026-03-20T00:00:00"}).json()
+    assert archived["title"] == "Standup"
+    assert [(exception["original_start"], exception["is_cancelled"]) for exception in archived["exceptions"]] == [
+        ("2026-03-09T09:00:00", True)
+    ]
+    assert client.get(f"/api/events/{series['id']}/exceptions", headers=headers).status_code == 404
+    
+    busy = client.get("/api/events/freebusy", headers=headers, params={
+        "from": "2026-03-16T09:00:00", "to": "2026-03-16T10:00:00", "slot_minutes": 60
+    })
+    assert busy.json()["busy"] == "AA=="
+
+def test_series_with_a_moved_occurrence_after_the_cutoff_stays(client, db, make_user, create_event):
+    owner_id, headers = make_user()
+    series = create_event(
+        headers, "Review", "2026-03-02T09:00:00", "2026-03-02T10:00:00",
+        recurrence_rule="FREQ=WEEKLY;COUNT=2"
+    )
+    moved = client.post(f"/api/events/{series['id']}/exceptions", headers=headers, json={
+        "original_start": "2026-03-09T09:00:00", "start_time": "2026-05-25T09:00:00", "end_time": "2026-05-25T10:00:00"
+    })
+    assert moved.status_code == 200, moved.text
+    
+    assert _archive(db, owner_id)["events"] == 0
+    assert _hot_titles(db, owner_id) == ["Review"]
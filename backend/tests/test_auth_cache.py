@@ -0,0 +1,27 @@
+"""
+Principal cache: how long a deactivated user keeps authenticating
+"""
+
+from sqlalchemy import update
+from app.models.database import User, engine
+from app.utils import auth, cache
+
+def test_orm_deactivation_evicts_at_once(client, db, make_user):
+    user_id, headers = make_user()
+    
+    db.get(User, user_id).is_active = False
+    db.commit()
+    
+    assert client.get("/api/auth/me", headers=headers).status_code == 403
+
+def test_deactivation_elsewhere_expires_with_the_ttl(client, make_user, monkeypatch):
+    user_id, headers = make_user()
+    
+    # Another worker's change: no ORM hook runs in this process
+    with engine.begin() as connection:
+        connection.execute(update(User).where(User.id == user_id).values(is_active=False))
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    
+    now = cache.time.monotonic()
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now + auth.AUTH_CACHE_TTL_SECONDS + 1)
+    assert client.get("/api/auth/me", headers=headers).status_code == 403
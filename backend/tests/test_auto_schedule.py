@@ -0,0 +1,36 @@
+"""
+Auto-scheduling tentative events around fixed ones
+"""
+
+def test_plan_and_apply(client, make_user, create_event):
+    _, headers = make_user()
+    fixed = create_event(headers, "Board meeting", "2030-03-04T10:00:00", "2030-03-04T11:00:00")
+    clash = create_event(headers, "Review", "2030-03-04T10:30:00", "2030-03-04T11:30:00")
+    assert clash["is_tentative"] and not fixed["is_tentative"]
+    
+    response = client.post("/api/events/auto-schedule", headers=headers, json={})
+    assert response.status_code == 200, response.text
+    plan = response.json()
+    assert plan["summary"]["scheduled"] == plan["summary"]["moved"] == 1
+    assignment, = plan["assignments"]
+    # The closest free slot after the fixed event, which stays put
+    assert (assignment["event_id"], assignment["start_time"], assignment["end_time"]) == (
+        clash["id"], "2030-03-04T11:00:00", "2030-03-04T12:00:00"
+    )
+    assert assignment["displacement_minutes"] == 30
+    
+    # Planning alone writes nothing
+    events = {event["id"]: event for event in client.get("/api/events/list", headers=headers).json()}
+    assert events[clash["id"]]["start_time"] == "2030-03-04T10:30:00"
+    
+    response = client.post("/api/events/auto-schedule", headers=headers, json={"apply": True})
+    assert response.status_code == 200, response.text
+    events = {event["id"]: event for event in client.get("/api/events/list", headers=headers).json()}
+    assert events[fixed["id"]]["start_time"] == "2030-03-04T10:00:00"
+    assert (events[clash["id"]]["start_time"], events[clash["id"]]["is_tentative"]) == ("2030-03-04T11:00:00", False)
+    assert not events[clash["id"]]["conflicts"] and not events[fixed["id"]]["conflicts"]
+
+def test_time_budget_is_capped(client, make_user):
+    _, headers = make_user()
+    response = client.post("/api/events/auto-schedule", headers=headers, json={"time_budget_ms": 30000})
+    assert response.status_code == 422
@@ -0,0 +1,26 @@
+"""
+Regression checks of the engine benchmark suite
+"""
+
+from benchmarks.bench_engine import compare
+
+def _result(median_ms: float, relative: float, mad_ms: float = 0.001) -> dict:
+    return {"median_ms": median_ms, "mad_ms": mad_ms, "relative": relative}
+
+def test_slowdown_against_the_reference_is_flagged():
+    regressions = compare({"a": _result(2.0, 8.0)}, {"a": _result(1.0, 4.0)}, 0.35)
+    assert [(key, change) for key, _, _, change in regressions] == [("a", 1.0)]
+
+def test_machine_wide_slowdown_is_not_flagged():
+    # Twice the wall time, but the reference workload slowed down just as much
+    assert compare({"a": _result(2.0, 4.0)}, {"a": _result(1.0, 4.0)}, 0.35) == []
+
+def test_changes_within_the_noise_are_not_flagged():
+    # Below the absolute floor
+    assert compare({"a": _result(0.03, 0.2)}, {"a": _result(0.01, 0.1)}, 0.35) == []
+    # Within the samples' own spread
+    assert compare({"a": _result(2.0, 8.0, mad_ms=0.5)}, {"a": _result(1.0, 4.0, mad_ms=0.5)}, 0.35) == []
+
+def test_old_baselines_compare_raw_medians():
+    baseline = {"a": {"median_ms": 1.0}, "calendar": {"events": 10}}
+    assert [key for key, *_ in compare({"a": _result(2.0, 8.0)}, baseline, 0.35)] == ["a"]
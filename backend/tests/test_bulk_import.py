@@ -0,0 +1,98 @@
+"""
+Bulk imports parsed from the request stream as it arrives
+"""
+
+from app.main import app
+from app.utils.importers import iter_lines
+import anyio
+import json
+
+def _messages(response):
+    assert response.status_code == 200, response.text
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_lines_split_across_chunks():
+    chunks = [b'{"title": "Caf', b'\xc3', b'\xa9"}\r\n', b"\n{}", b""]
+    assert list(iter_lines(chunks)) == ['{"title": "Café"}\r\n', "\n", "{}"]
+
+def test_ndjson_import_in_chunks(client, make_user):
+    _, headers = make_user()
+    body = (
+        b'{"title": "Planning", "start_time": "2026-05-04T09:00:00", "end_time": "2026-05-04T10:00:00", "event_type": "meeting"}\n'
+        b"not json\n"
+        b'{"title": "Review", "start_time": "2026-05-04T09:30:00", "end_time": "2026-05-04T10:30:00", "event_type": "meeting"}'
+    )
+    # Cut mid-record so lines have to be stitched back together
+    chunks = (body[offset:offset + 7] for offset in range(0, len(body), 7))
+    
+    messages = _messages(client.post("/api/events/bulk", headers=headers, content=chunks))
+    assert messages[0] == {"type": "error", "line": 2, "detail": messages[0]["detail"]}
+    summary = messages[-1]
+    assert (summary["type"], summary["processed"], summary["inserted"], summary["errors"]) == ("summary", 3, 2, 1)
+    assert summary["tentative"] == 2
+    
+    titles = sorted(event["title"] for event in client.get("/api/events/list", headers=headers).json())
+    assert titles == ["Planning", "Review"]
+
+def test_ics_import(client, make_user):
+    _, headers = make_user()
+    body = (
+        "BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nSUMMARY:Offsite \r\n planning\r\n"
+        "DTSTART:20260504T090000Z\r\nDURATION:PT2H\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"
+    )
+    response = client.post(
+        "/api/events/bulk", headers={**headers, "Content-Type": "text/calendar"}, content=body.encode()
+    )
+    assert _messages(response)[-1]["inserted"] == 1
+    
+    event, = client.get("/api/events/list", headers=headers).json()
+    assert (event["title"], event["start_time"], event["end_time"]) == (
+        "Offsite planning", "2026-05-04T09:00:00", "2026-05-04T11:00:00"
+    )
+
+def test_progress_streams_while_uploading(client, make_user):
+    _, headers = make_user()
+    records = [
+        json.dumps({
+            "title": f"Event {day}", "start_time": f"2026-06-0{day}T09:00:00",
+            "end_time": f"2026-06-0{day}T10:00:00", "event_type": "meeting"
+        }).encode() + b"\n"
+        for day in range(1, 4)
+    ]
+    received = []
+    progress = []
+    finished = None
+    
+    async def receive():
+        if len(received) == len(records):
+            await finished.wait()
+            return {"type": "http.disconnect"}
+        # Each record is only sent once the previous one was reported back
+        with anyio.fail_after(5):
+            while len(progress) < len(received):
+                await anyio.sleep(0.01)
+        received.append(records[len(received)])
+        return {"type": "http.request", "body": received[-1], "more_body": len(received) < len(records)}
+    
+    async def send(message):
+        if message["type"] == "http.response.body":
+            progress.extend(
+                json.loads(line) for line in message["body"].decode().splitlines() if '"progress"' in line
+            )
+            if not message.get("more_body"):
+                finished.set()
+    
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+        "path": "/api/events/bulk", "raw_path": b"/api/events/bulk", "root_path": "",
+        "query_string": b"batch_size=1", "server": ("testserver", 80), "client": ("testclient", 50000),
+        "headers": [(b"authorization", headers["Authorization"].encode()), (b"content-type", b"application/x-ndjson")]
+    }
+    
+    async def upload():
+        nonlocal finished
+        finished = anyio.Event()
+        await app(scope, receive, send)
+    
+    anyio.run(upload)
+    assert [message["inserted"] for message in progress] == [1, 2, 3]
@@ -0,0 +1,64 @@
+"""
+Batch constraint validation against the per-event path
+"""
+
+from app.engine.constraint_engine import ConstraintValidator
+from app.engine.interval_index import IntervalEntry, IntervalTree
+from datetime import datetime, timedelta
+import random
+
+def _calendar(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    base = datetime(2026, 3, 2)
+    entries = []
+    for event_id in range(1, count + 1):
+        start = base + timedelta(minutes=15 * rng.randrange(0, 4 * 24 * 60))
+        entries.append(IntervalEntry(event_id, start, start + timedelta(minutes=15 * rng.randrange(1, 12))))
+    return entries
+
+def _validator(index) -> ConstraintValidator:
+    validator = ConstraintValidator()
+    validator.add_constraint("duration", {"min_minutes": 30, "max_minutes": 120})
+    validator.add_constraint("time_window", {"start_hour": 8, "end_hour": 20})
+    validator.add_constraint("no_conflicts", {"index": index})
+    return validator
+
+def test_validate_many_matches_validate_event():
+    entries = _calendar(500)
+    index = IntervalTree(entries)
+    validator = _validator(index)
+    # Moves of existing events, which must not conflict with themselves, and new events
+    probes = _calendar(64, seed=11)
+    probes = entries[:32] + [IntervalEntry(None, probe.start_time, probe.end_time) for probe in probes]
+    
+    assert validator.validate_many(probes) == [validator.validate_event(probe) for probe in probes]
+
+def test_validate_many_sees_index_changes():
+    index = IntervalTree([IntervalEntry(1, datetime(2026, 3, 2, 9), datetime(2026, 3, 2, 10))])
+    validator = _validator(index)
+    probe = IntervalEntry(None, datetime(2026, 3, 2, 11), datetime(2026, 3, 2, 12))
+    assert validator.validate_many([probe]) == [[]]
+    
+    index.insert(IntervalEntry(2, datetime(2026, 3, 2, 11, 30), datetime(2026, 3, 2, 12, 30)))
+    assert [violation["constraint"] for violation in validator.validate_many([probe])[0]] == ["no_conflicts"]
+    
+    index.remove(2)
+    assert validator.validate_many([probe]) == [[]]
+
+def test_validate_many_with_existing_events():
+    validator = ConstraintValidator()
+    validator.add_constraint("no_conflicts", {"existing_events": _calendar(200)})
+    probes = [IntervalEntry(None, probe.start_time, probe.end_time) for probe in _calendar(64, seed=3)]
+    
+    assert validator.validate_many(probes) == [validator.validate_event(probe) for probe in probes]
+
+def test_validate_many_sees_existing_events_changes():
+    existing = [IntervalEntry(1, datetime(2026, 3, 2, 9), datetime(2026, 3, 2, 10))]
+    validator = ConstraintValidator()
+    validator.add_constraint("no_conflicts", {"existing_events": existing})
+    probe = IntervalEntry(None, datetime(2026, 3, 2, 11), datetime(2026, 3, 2, 12))
+    assert validator.validate_many([probe]) == [[]]
+    
+    # Same list, same length, different interval
+    existing[0] = IntervalEntry(1, datetime(2026, 3, 2, 11, 30), datetime(2026, 3, 2, 12, 30))
+    assert [violation["constraint"] for violation in validator.validate_many([probe])[0]] == ["no_conflicts"]
@@ -0,0 +1,85 @@
+"""
+Conflict explanations, including conflicts with recurring events
+"""
+
+from app.engine.explainer import generate_explanation, generate_explanations
+from app.models.database import Conflict, Event
+from app.utils.metrics import engine_span_duration
+
+def _explanations(client, headers, event_id):
+    response = client.get(f"/api/events/{event_id}/explanations", headers=headers)
+    assert response.status_code == 200, response.text
+    return [item["explanation"] for item in response.json()]
+
+def test_overlap_of_single_events(client, make_user, create_event):
+    _, headers = make_user()
+    create_event(headers, "Planning", "2026-03-02T09:00:00", "2026-03-02T10:00:00")
+    review = create_event(headers, "Review", "2026-03-02T09:30:00", "2026-03-02T11:00:00")
+    
+    explanation, = _explanations(client, headers, review["id"])
+    assert explanation["overlap_details"]["overlap_duration_hours"] == 0.5
+
+def test_overlap_with_a_series_uses_the_overlapping_occurrence(client, make_user, create_event):
+    _, headers = make_user()
+    series = create_event(
+        headers, "Standup", "2026-01-05T09:00:00", "2026-01-05T09:30:00",
+        recurrence_rule="FREQ=DAILY"
+    )
+    review = create_event(headers, "Review", "2026-03-04T09:15:00", "2026-03-04T10:00:00")
+    
+    explanation, = _explanations(client, headers, review["id"])
+    assert explanation["conflicting_event"]["start_time"] == "2026-03-04T09:00:00"
+    assert explanation["conflicting_event"]["recurrence_id"] == "2026-03-04T09:00:00"
+    assert explanation["overlap_details"] == {
+        "overlap_start": "2026-03-04T09:15:00",
+        "overlap_end": "2026-03-04T09:30:00",
+        "overlap_duration_hours": 0.25
+    }
+    
+    # And the same overlap seen from the series
+    explanation, = _explanations(client, headers, series["id"])
+    assert explanation["overlap_details"]["overlap_duration_hours"] == 0.25
+    assert explanation["conflicting_event"]["start_time"] == "2026-03-04T09:15:00"
+
+def test_overlap_between_two_series(client, make_user, create_event):
+    _, headers = make_user()
+    create_event(
+        headers, "Standup", "2026-03-02T09:00:00", "2026-03-02T09:30:00",
+        recurrence_rule="FREQ=DAILY;COUNT=30"
+    )
+    weekly = create_event(
+        headers, "Sync", "2026-03-06T09:20:00", "2026-03-06T10:00:00",
+        recurrence_rule="FREQ=WEEKLY"
+    )
+    
+    explanation, = _explanations(client, headers, weekly["id"])
+    assert explanation["conflicting_event"]["start_time"] == "2026-03-06T09:00:00"
+    assert explanation["overlap_details"]["overlap_duration_hours"] == round(10 / 60, 2)
+
+def test_stale_conflict_has_no_negative_overlap(db, make_user, create_event):
+    _, headers = make_user()
+    series = create_event(
+        headers, "Standup", "2026-03-02T09:00:00", "2026-03-02T09:30:00",
+        recurrence_rule="FREQ=DAILY;COUNT=5"
+    )
+    later = create_event(headers, "Review", "2026-04-01T09:00:00", "2026-04-01T10:00:00")
+    stale = Conflict(
+        event_id=later["id"], conflict_with_event_id=series["id"],
+        conflict_type="time_overlap", severity="low"
+    )
+    
+    explanation, = generate_explanations([stale], db)
+    assert explanation["overlap_details"]["overlap_duration_hours"] == 0
+
+def test_each_call_is_one_span(db, make_user, create_event):
+    _, headers = make_user()
+    create_event(headers, "Planning", "2026-03-02T09:00:00", "2026-03-02T10:00:00")
+    review = create_event(headers, "Review", "2026-03-02T09:30:00", "2026-03-02T11:00:00")
+    conflict = db.query(Conflict).filter(Conflict.event_id == review["id"]).one()
+    single = engine_span_duration.labels("generate_explanation")
+    batch = engine_span_duration.labels("generate_explanations")
+    before = (single.count, batch.count)
+    
+    generate_explanation(db.get(Event, review["id"]), conflict, db)
+    generate_explanations([conflict, conflict], db)
+    assert (single.count, batch.count) == (before[0] + 1, before[1] + 1)
@@ -0,0 +1,45 @@
+"""
+Free slots across several users' calendars
+"""
+
+from datetime import datetime, timedelta
+
+def _tomorrow(hour: int) -> str:
+    day = datetime.utcnow().date() + timedelta(days=1)
+    return datetime(day.year, day.month, day.day, hour).isoformat()
+
+def test_unrelated_user_is_refused(client, make_user):
+    owner_id, _ = make_user()
+    _, stranger_headers = make_user()
+    
+    response = client.get("/api/events/free-slots", headers=stranger_headers, params={"user_ids": owner_id})
+    assert response.status_code == 403
+    unknown = client.get("/api/events/free-slots", headers=stranger_headers, params={"user_ids": owner_id + 10_000})
+    assert unknown.status_code == 403
+
+def test_common_slots_of_shared_calendars(client, make_user, create_event):
+    owner_id, owner_headers = make_user()
+    viewer_id, viewer_headers = make_user()
+    now = datetime.utcnow().replace(microsecond=0)
+    create_event(owner_headers, "Offsite", now.isoformat(), _tomorrow(12))
+    create_event(viewer_headers, "Review", _tomorrow(12), _tomorrow(14))
+    viewer_email = client.get("/api/auth/me", headers=viewer_headers).json()["email"]
+    assert client.post("/api/events/shares", headers=owner_headers, json={"email": viewer_email}).status_code == 200
+    
+    response = client.get("/api/events/free-slots", headers=viewer_headers, params={
+        "user_ids": [owner_id, viewer_id], "duration_minutes": 60, "limit": 1
+    })
+    assert response.status_code == 200, response.text
+    assert response.json()[0]["start_time"].startswith(_tomorrow(14))
+
+def test_preferred_start_with_an_offset(client, make_user):
+    _, headers = make_user()
+    params = {"duration_minutes": 60, "limit": 3}
+    
+    aware = client.get("/api/events/free-slots", headers=headers, params={
+        **params, "preferred_start": _tomorrow(13) + "+02:00"
+    })
+    assert aware.status_code == 200, aware.text
+    naive = client.get("/api/events/free-slots", headers=headers, params={**params, "preferred_start": _tomorrow(11)})
+    assert aware.json() == naive.json()
+    assert aware.json()[0]["start_time"].startswith(_tomorrow(11))
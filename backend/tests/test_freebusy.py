@@ -0,0 +1,64 @@
+"""
+Free/busy bitmaps and who may read them
+"""
+
+import base64
+
+RANGE = {"from": "2026-03-02T08:00:00", "to": "2026-03-02T12:00:00", "slot_minutes": 60}
+
+def _bits(encoded: str, slots: int) -> str:
+    raw = base64.b64decode(encoded)
+    return "".join(f"{byte:08b}" for byte in raw)[:slots]
+
+def test_own_bitmap(client, make_user, create_event):
+    _, headers = make_user()
+    create_event(headers, "Planning", "2026-03-02T09:00:00", "2026-03-02T10:30:00")
+    
+    response = client.get("/api/events/freebusy", headers=headers, params=RANGE)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["slots"] == 4
+    assert _bits(body["busy"], 4) == "0110"
+    assert _bits(body["free"], 4) == "1001"
+
+def test_unrelated_user_is_refused(client, make_user, create_event):
+    owner_id, owner_headers = make_user()
+    _, stranger_headers = make_user()
+    create_event(owner_headers, "Private", "2026-03-02T09:00:00", "2026-03-02T10:00:00")
+    
+    response = client.get("/api/events/freebusy", headers=stranger_headers, params={**RANGE, "user_ids": owner_id})
+    assert response.status_code == 403
+    assert "busy" not in response.json()
+
+def test_unknown_and_unshared_ids_look_alike(client, make_user):
+    owner_id, _ = make_user()
+    _, stranger_headers = make_user()
+    unknown_id = owner_id + 10_000
+    
+    unshared = client.get("/api/events/freebusy", headers=stranger_headers, params={**RANGE, "user_ids": owner_id})
+    unknown = client.get("/api/events/freebusy", headers=stranger_headers, params={**RANGE, "user_ids": unknown_id})
+    assert unshared.status_code == unknown.status_code == 403
+    assert unshared.json()["detail"].replace(str(owner_id), "?") == unknown.json()["detail"].replace(str(unknown_id), "?")
+
+def test_shared_calendar_is_visible_until_revoked(client, make_user, create_event):
+    owner_id, owner_headers = make_user()
+    viewer_id, viewer_headers = make_user()
+    create_event(owner_headers, "Planning", "2026-03-02T09:00:00", "2026-03-02T10:00:00")
+    create_event(viewer_headers, "Review", "2026-03-02T11:00:00", "2026-03-02T12:00:00")
+    viewer_email = client.get("/api/auth/me", headers=viewer_headers).json()["email"]
+    
+    share = client.post("/api/events/shares", headers=owner_headers, json={"email": viewer_email})
+    assert share.status_code == 200, share.text
+    assert client.get("/api/events/shares", headers=viewer_headers).json()["shared_with_me"][0]["owner_id"] == owner_id
+    
+    params = {**RANGE, "user_ids": [owner_id, viewer_id]}
+    response = client.get("/api/events/freebusy", headers=viewer_headers, params=params)
+    assert response.status_code == 200, response.text
+    assert _bits(response.json()["busy"], 4) == "0101"
+    
+    # Sharing is one way
+    reverse = client.get("/api/events/freebusy", headers=owner_headers, params=params)
+    assert reverse.status_code == 403
+    
+    assert client.delete(f"/api/events/shares/{viewer_id}", headers=owner_headers).status_code == 200
+    assert client.get("/api/events/freebusy", headers=viewer_headers, params=params).status_code == 403
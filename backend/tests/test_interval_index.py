@@ -0,0 +1,80 @@
+"""
+Cached interval trees and recurring series, kept in step with committed changes
+"""
+
+from app.engine.interval_index import interval_indexes
+from app.engine.recurrence import load_occurrences
+from app.engine.scheduler_core import get_busy_intervals, query_overlapping_events
+from app.models.database import SessionLocal
+from app.utils.query_counter import assert_max_queries
+from datetime import datetime
+import heapq
+
+WINDOW = (datetime(2026, 3, 1), datetime(2026, 4, 1))
+
+def _busy(owner_id: int, **options) -> list:
+    db = SessionLocal()
+    try:
+        return [tuple(interval) for interval in get_busy_intervals(owner_id, db, *WINDOW, **options)]
+    finally:
+        db.close()
+
+def _busy_from_sql(owner_id: int, **options) -> list:
+    db = SessionLocal()
+    try:
+        singles = query_overlapping_events(db, owner_id, *WINDOW, options.get("exclude_event_id"))
+        occurrences = load_occurrences(db, owner_id, *WINDOW, **options)
+        merged = heapq.merge(singles, occurrences, key=lambda interval: interval.start_time)
+        return [tuple(interval) for interval in merged]
+    finally:
+        db.close()
+
+def _calendar(make_user, create_event):
+    owner_id, headers = make_user()
+    create_event(headers, "Planning", "2026-03-03T09:00:00", "2026-03-03T10:00:00")
+    series = create_event(
+        headers, "Standup", "2026-03-02T09:00:00", "2026-03-02T09:15:00",
+        recurrence_rule="FREQ=WEEKLY;BYDAY=MO,WE"
+    )
+    return owner_id, headers, series
+
+def test_warm_busy_intervals_only_read_the_revision(make_user, create_event):
+    owner_id, _, series = _calendar(make_user, create_event)
+    expected = _busy_from_sql(owner_id)
+    assert _busy(owner_id) == expected
+    assert len(expected) == 10  # one event and nine standups
+    
+    db = SessionLocal()
+    try:
+        with assert_max_queries(1):
+            get_busy_intervals(owner_id, db, *WINDOW)
+    finally:
+        db.close()
+    assert _busy(owner_id, exclude_event_id=series["id"]) == _busy_from_sql(owner_id, exclude_event_id=series["id"])
+
+def test_cached_series_follow_committed_changes(client, make_user, create_event):
+    owner_id, headers, series = _calendar(make_user, create_event)
+    assert _busy(owner_id) == _busy_from_sql(owner_id)
+    
+    # An exception
+    response = client.post(f"/api/events/{series['id']}/exceptions", headers=headers, json={
+        "original_start": "2026-03-04T09:00:00", "is_cancelled": True
+    })
+    assert response.status_code == 200, response.text
+    assert (series["id"], datetime(2026, 3, 4, 9), datetime(2026, 3, 4, 9, 15), datetime(2026, 3, 4, 9)) not in _busy(owner_id)
+    assert _busy(owner_id) == _busy_from_sql(owner_id)
+    
+    # A new series, a changed rule and a series that stops recurring
+    weekly = create_event(
+        headers, "Sync", "2026-03-06T14:00:00", "2026-03-06T15:00:00", recurrence_rule="FREQ=WEEKLY"
+    )
+    assert _busy(owner_id) == _busy_from_sql(owner_id)
+    assert client.put(f"/api/events/{series['id']}", headers=headers, json={"recurrence_rule": "FREQ=DAILY;COUNT=3"}).status_code == 200
+    assert _busy(owner_id) == _busy_from_sql(owner_id)
+    assert client.put(f"/api/events/{weekly['id']}", headers=headers, json={"recurrence_rule": ""}).status_code == 200
+    assert _busy(owner_id) == _busy_from_sql(owner_id)
+    
+    # And a deleted series
+    assert client.delete(f"/api/events/{series['id']}", headers=headers).status_code == 200
+    assert _busy(owner_id) == _busy_from_sql(owner_id)
+    assert interval_indexes.stats()["series_owners"] >= 1
@@ -0,0 +1,95 @@
+"""
+Query budgets of the event read paths
+
+The numbers are what the routes run today with the principal cache warm;
+a change that adds a query per request should have to update them here.
+"""
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from app.main import QueryBudgetMiddleware, RequestMetricsMiddleware
+from app.models.database import Event, SessionLocal
+from app.routes.events import _fast_event_page
+from app.utils.query_counter import QueryBudgetExceeded, assert_max_queries, query_budget
+import pytest
+
+LIST_QUERIES = 2  # events, then their conflicts
+GET_QUERIES = 2
+EXPAND_QUERIES = 5  # singles and series, each with their conflicts, then exceptions
+FAST_QUERIES = 2
+
+@pytest.fixture
+def calendar(make_user, create_event):
+    """A user with two overlapping events and a weekly series"""
+    user_id, headers = make_user()
+    first = create_event(headers, "Planning", "2026-03-02T09:00:00", "2026-03-02T10:00:00")
+    create_event(headers, "Review", "2026-03-02T09:30:00", "2026-03-02T11:00:00")
+    create_event(
+        headers, "Standup", "2026-03-02T08:00:00", "2026-03-02T08:15:00",
+        recurrence_rule="FREQ=WEEKLY;COUNT=4"
+    )
+    return user_id, headers, first
+
+def _query_count(response) -> int:
+    assert response.status_code == 200, response.text
+    return int(response.headers["X-Query-Count"])
+
+def test_list_budget(client, calendar):
+    _, headers, _ = calendar
+    response = client.get("/api/events/list", headers=headers)
+    assert len(response.json()) == 3
+    assert any(event["conflicts"] for event in response.json())
+    assert _query_count(response) <= LIST_QUERIES
+
+def test_get_budget(client, calendar):
+    _, headers, first = calendar
+    response = client.get(f"/api/events/{first['id']}", headers=headers)
+    assert response.json()["conflicts"]
+    assert _query_count(response) <= GET_QUERIES
+
+def test_expand_budget(client, calendar):
+    _, headers, _ = calendar
+    response = client.get("/api/events/list", headers=headers, params={
+        "from": "2026-03-01T00:00:00", "to": "2026-04-01T00:00:00", "expand": "true"
+    })
+    # Two single events and four weekly occurrences
+    assert len(response.json()) == 6
+    assert _query_count(response) <= EXPAND_QUERIES
+
+def test_fast_budget(client, calendar):
+    _, headers, _ = calendar
+    standard = client.get("/api/events/list", headers=headers)
+    response = client.get("/api/events/list", headers=headers, params={"fast": "true"})
+    assert response.json() == standard.json()
+    assert _query_count(response) <= FAST_QUERIES
+
+def test_fast_page_budget_in_process(db, calendar):
+    user_id, _, _ = calendar
+    with assert_max_queries(FAST_QUERIES) as counter:
+        rows = _fast_event_page(db, user_id, None, None, None, 100)
+    assert len(rows) == 3
+    assert counter.count == FAST_QUERIES
+
+def test_assert_max_queries_fails_over_budget(db):
+    with pytest.raises(QueryBudgetExceeded):
+        with assert_max_queries(1):
+            db.scalars(select(Event.id)).all()
+            db.scalars(select(Event.id)).all()
+
+def test_middleware_replaces_over_budget_responses():
+    app = FastAPI()
+    
+    @app.get("/two-queries", dependencies=[Depends(query_budget(1))])
+    def two_queries():
+        with SessionLocal() as session:
+            session.scalars(select(Event.id)).all()
+            session.scalars(select(Event.id)).all()
+        return {"ok": True}
+    
+    app.add_middleware(QueryBudgetMiddleware)
+    app.add_middleware(RequestMetricsMiddleware)
+    response = TestClient(app).get("/two-queries")
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Query budget exceeded: 2 > 1"}
+    assert response.headers["X-Query-Count"] == "2"
@@ -0,0 +1,50 @@
+"""
+Conflicts with endless recurring series far beyond today
+"""
+
+def _conflict_ids(client, headers):
+    events = client.get("/api/events/list", headers=headers).json()
+    return {
+        event["title"]: (event["is_tentative"], sorted(conflict["conflict_with_event_id"] for conflict in event["conflicts"]))
+        for event in events
+    }
+
+def test_series_starting_years_ahead_meets_a_single_event(client, make_user, create_event):
+    _, headers = make_user()
+    series = create_event(
+        headers, "Weekly", "2028-12-04T09:00:00", "2028-12-04T10:00:00", recurrence_rule="FREQ=WEEKLY"
+    )
+    single = create_event(headers, "Offsite", "2028-12-04T09:30:00", "2028-12-04T10:30:00")
+    
+    conflicts = _conflict_ids(client, headers)
+    assert conflicts["Offsite"] == (True, [series["id"]])
+    assert conflicts["Weekly"][1] == [single["id"]]
+
+def test_single_event_years_into_an_endless_series(client, make_user, create_event):
+    _, headers = make_user()
+    series = create_event(
+        headers, "Daily", "2026-10-19T09:00:00", "2026-10-19T10:00:00", recurrence_rule="FREQ=DAILY"
+    )
+    single = create_event(headers, "Review", "2028-06-01T09:15:00", "2028-06-01T09:45:00")
+    assert _conflict_ids(client, headers)["Review"] == (True, [series["id"]])
+    
+    # The other way round, the series is expanded far enough to reach the event
+    _, headers = make_user()
+    single = create_event(headers, "Review", "2028-06-01T09:15:00", "2028-06-01T09:45:00")
+    series = create_event(
+        headers, "Daily", "2026-10-19T09:00:00", "2026-10-19T10:00:00", recurrence_rule="FREQ=DAILY"
+    )
+    assert _conflict_ids(client, headers)["Daily"] == (True, [single["id"]])
+
+def test_scan_keeps_conflicts_of_a_far_future_series(client, make_user, create_event):
+    _, headers = make_user()
+    create_event(headers, "Kickoff", "2030-01-07T09:30:00", "2030-01-07T10:30:00")
+    create_event(headers, "Weekly", "2030-01-07T09:00:00", "2030-01-07T10:00:00", recurrence_rule="FREQ=WEEKLY")
+    before = _conflict_ids(client, headers)
+    
+    response = client.post("/api/events/conflicts/scan", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["conflicts_removed"] == 0
+    assert _conflict_ids(client, headers) == before
+    assert before["Weekly"][0] is True
+    assert before["Kickoff"][1]
@@ -0,0 +1,40 @@
+"""
+Resolving a conflict by moving one of its events
+"""
+
+def _conflict(client, headers, event_id):
+    response = client.get(f"/api/events/{event_id}", headers=headers)
+    assert response.status_code == 200, response.text
+    conflict, = response.json()["conflicts"]
+    return conflict
+
+def test_resolve_with_utc_offsets(client, make_user, create_event):
+    _, headers = make_user()
+    create_event(headers, "Planning", "2030-03-04T09:00:00", "2030-03-04T10:00:00")
+    review = create_event(headers, "Review", "2030-03-04T09:30:00", "2030-03-04T10:30:00")
+    conflict = _conflict(client, headers, review["id"])
+    
+    response = client.post(f"/api/events/{review['id']}/resolve-conflict", headers=headers, params={
+        "conflict_id": conflict["id"],
+        "new_start_time": "2030-03-04T12:00:00+02:00",
+        "new_end_time": "2030-03-04T11:00:00Z"
+    })
+    assert response.status_code == 200, response.text
+    
+    moved = client.get(f"/api/events/{review['id']}", headers=headers).json()
+    assert (moved["start_time"], moved["end_time"], moved["conflicts"]) == ("2030-03-04T10:00:00", "2030-03-04T11:00:00", [])
+
+def test_resolve_rejects_an_empty_range(client, make_user, create_event):
+    _, headers = make_user()
+    create_event(headers, "Planning", "2030-03-04T09:00:00", "2030-03-04T10:00:00")
+    review = create_event(headers, "Review", "2030-03-04T09:30:00", "2030-03-04T10:30:00")
+    conflict = _conflict(client, headers, review["id"])
+    
+    response = client.post(f"/api/events/{review['id']}/resolve-conflict", headers=headers, params={
+        "conflict_id": conflict["id"],
+        "new_start_time": "2030-03-04T11:00:00",
+        "new_end_time": "2030-03-04T11:00:00"
+    })
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Start time must be before end time"
+    assert client.get(f"/api/events/{review['id']}", headers=headers).json()["start_time"] == "2030-03-04T09:30:00"
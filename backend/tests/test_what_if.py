@@ -0,0 +1,65 @@
+"""
+What-if evaluation of reschedules
+"""
+
+from app.engine.interval_index import interval_indexes
+from app.engine.simulator import CalendarSnapshot
+from app.utils.query_counter import assert_max_queries
+from datetime import datetime
+
+def test_recurring_target_is_rejected(client, make_user, create_event):
+    _, headers = make_user()
+    series = create_event(
+        headers, "Standup", "2026-03-02T09:00:00", "2026-03-02T09:15:00",
+        recurrence_rule="FREQ=DAILY;COUNT=5"
+    )
+    
+    response = client.post("/api/events/what-if", headers=headers, json={
+        "event_id": series["id"],
+        "candidates": [{"start_time": "2026-03-02T10:00:00", "end_time": "2026-03-02T10:15:00"}]
+    })
+    assert response.status_code == 400
+
+def test_occurrences_count_as_conflicts(client, make_user, create_event):
+    _, headers = make_user()
+    series = create_event(
+        headers, "Standup", "2026-03-02T09:00:00", "2026-03-02T09:30:00",
+        recurrence_rule="FREQ=DAILY;COUNT=5"
+    )
+    meeting = create_event(headers, "Review", "2026-03-03T14:00:00", "2026-03-03T15:00:00")
+    
+    response = client.post("/api/events/what-if", headers=headers, json={
+        "event_id": meeting["id"],
+        "candidates": [
+            {"start_time": "2026-03-04T09:00:00", "end_time": "2026-03-04T10:00:00"},
+            {"start_time": "2026-03-04T10:00:00", "end_time": "2026-03-04T11:00:00"}
+        ]
+    })
+    assert response.status_code == 200, response.text
+    best, clashing = response.json()["results"]
+    assert best["candidate"] == 1 and best["conflicts"] == []
+    assert clashing["new_conflicts"] == 1
+    conflict, = clashing["conflicts"]
+    assert conflict["event_id"] == series["id"]
+    assert conflict["recurrence_id"] == "2026-03-04T09:00:00"
+
+def test_snapshot_reuses_the_interval_index(db, make_user, create_event):
+    owner_id, headers = make_user()
+    create_event(
+        headers, "Standup", "2026-03-02T09:00:00", "2026-03-02T09:30:00",
+        recurrence_rule="FREQ=DAILY;COUNT=5"
+    )
+    meeting = create_event(headers, "Review", "2026-03-03T14:00:00", "2026-03-03T15:00:00")
+    window = (datetime(2026, 3, 3), datetime(2026, 3, 5))
+    CalendarSnapshot.load(owner_id, db, *window)
+    
+    # Warm, loading is a revision check against the cached tree and series
+    with assert_max_queries(1):
+        snapshot = CalendarSnapshot.load(owner_id, db, *window)
+    assert snapshot.tree is interval_indexes.get(owner_id, db)
+    assert [occurrence.start_time.day for occurrence in snapshot.occurrences] == [3, 4]
+    
+    best = snapshot.evaluate(meeting["id"], [(datetime(2026, 3, 4, 9), datetime(2026, 3, 4, 10))])[0]
+    assert best["new_conflicts"] == 1
+    # Evaluating moves leaves the shared tree alone
+    assert snapshot.tree.get(meeting["id"]).start_time == datetime(2026, 3, 3, 14)